@@ -0,0 +1,251 @@
+"""Пакетный перевод файла или stdin без трея и горячих клавиш.
+
+Вход читается потоком и делится на строки или абзацы (разделённые пустой строкой). Одновременно
+переводится не больше --window единиц; следующая единица читается, только когда освобождается место
+в окне, а результаты пишутся в исходном порядке по мере готовности. Пустые строки и пробелы между
+единицами сохраняются как есть.
+
+При выводе в файл рядом с ним ведётся контрольная точка <output>.checkpoint: после сбоя или Ctrl+C
+повторный запуск с --resume продолжает с первой незаписанной единицы.
+
+Примеры:
+    python batch_translate.py book.txt -o book.ru.txt --lang ru
+    type notes.txt | python batch_translate.py - --mode paragraph --translator deepl > notes.en.txt
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging import getLogger
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, Optional, TextIO, Tuple
+from config_manager import ConfigurationManager
+from module.segmenter import Chunk
+from translation_client import TranslationClient, TranslationError
+
+
+CHECKPOINT_SUFFIX = ".checkpoint"
+CHECKPOINT_INTERVAL = 1.0  # Как часто сохраняется контрольная точка, секунды
+
+logger = getLogger(__name__)
+
+
+class BatchError(Exception):
+    pass
+
+
+def read_lines(stream: TextIO) -> Iterator[Chunk]:
+    for line in stream:
+        text = line.rstrip("\r\n")
+        yield Chunk("", text, line[len(text):])
+
+
+def read_paragraphs(stream: TextIO) -> Iterator[Chunk]:
+    """Абзац — подряд идущие непустые строки; следующие за ним пустые строки входят в его suffix."""
+    text_lines: List[str] = []
+    blank_lines: List[str] = []
+
+    def make_paragraph() -> Chunk:
+        joined = "".join(text_lines)
+        text = joined.rstrip("\r\n")
+        return Chunk("", text, joined[len(text):] + "".join(blank_lines))
+
+    for line in stream:
+        if line.strip():
+            if blank_lines:
+                yield make_paragraph()
+                text_lines, blank_lines = [], []
+            text_lines.append(line)
+        else:
+            blank_lines.append(line)
+
+    if text_lines or blank_lines:
+        yield make_paragraph()
+
+
+class Checkpoint:
+    """Сколько единиц входа уже записано и сколько байт вывода им соответствует."""
+
+    def __init__(self, path: str, params: Dict[str, Any]):
+        self.__path = path
+        self.__params = params
+        self.units = 0
+        self.output_bytes = 0
+        self.__saved_at = 0.0
+
+    def load(self) -> bool:
+        if not os.path.isfile(self.__path):
+            return False
+        with open(self.__path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("params") != self.__params:
+            raise BatchError(
+                f"Контрольная точка {self.__path} создана с другими параметрами: {data.get('params')}"
+            )
+        self.units, self.output_bytes = data["units"], data["output_bytes"]
+        return True
+
+    def advance(self, output_bytes: int) -> None:
+        self.units += 1
+        self.output_bytes = output_bytes
+        if time.monotonic() - self.__saved_at >= CHECKPOINT_INTERVAL:
+            self.save()
+
+    def save(self) -> None:
+        tmp_path = f"{self.__path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"params": self.__params, "units": self.units, "output_bytes": self.output_bytes}, f)
+        os.replace(tmp_path, self.__path)
+        self.__saved_at = time.monotonic()
+
+    def remove(self) -> None:
+        if os.path.isfile(self.__path):
+            os.remove(self.__path)
+
+
+class BatchTranslator:
+    """Переводит поток единиц через TranslationClient с окном параллельности и упорядоченным выводом."""
+
+    def __init__(self, client: TranslationClient, translator_code: str, target_lang: str, window: int):
+        self.__client = client
+        self.__translator_code = translator_code
+        self.__target_lang = target_lang
+        self.__window = window
+        self.__executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix="batch")
+
+    def __translate(self, unit: Chunk) -> str:
+        if not unit.text.strip():
+            return unit.prefix + unit.text + unit.suffix
+        return unit.prefix + self.__client.translate_text(unit.text, self.__translator_code, self.__target_lang) + unit.suffix
+
+    def run(self, units: Iterator[Chunk], output: BinaryIO, checkpoint: Optional[Checkpoint]) -> int:
+        """Возвращает количество переведённых единиц. Вход не читается дальше, чем на окно вперёд."""
+        window: Deque[Future] = deque()
+        done = 0
+        started = time.perf_counter()
+
+        def write_head() -> None:
+            nonlocal done
+            output.write(window.popleft().result().encode("utf-8"))
+            output.flush()
+            done += 1
+            if checkpoint:
+                checkpoint.advance(output.tell())
+            if done % 100 == 0:
+                logger.info(f"Переведено {done} единиц, {done / (time.perf_counter() - started):.1f} в секунду")
+
+        try:
+            for unit in units:
+                if len(window) >= self.__window:
+                    write_head()
+                window.append(self.__executor.submit(self.__translate, unit))
+            while window:
+                write_head()
+        finally:
+            for future in window:
+                future.cancel()
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            if checkpoint:
+                checkpoint.save()
+        return done
+
+
+def open_input(path: str) -> TextIO:
+    # newline="" сохраняет исходные переводы строк, в том числе \r\n
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def skip(units: Iterator[Chunk], count: int) -> Iterator[Chunk]:
+    for index, unit in enumerate(units):
+        if index >= count:
+            yield unit
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Входной файл в UTF-8 или - для stdin")
+    parser.add_argument("-o", "--output", help="Файл результата; по умолчанию stdout")
+    parser.add_argument("--mode", choices=("line", "paragraph"), default="line", help="Единица перевода")
+    parser.add_argument("--translator", help="Код переводчика; по умолчанию selected_translator из user_config")
+    parser.add_argument("--lang", help="Код языка перевода; по умолчанию selected_language из user_config")
+    parser.add_argument("--window", type=int, help="Сколько единиц переводится одновременно; по умолчанию batch_window")
+    parser.add_argument("--resume", action="store_true", help="Продолжить с контрольной точки <output>.checkpoint")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Подробный лог в stderr")
+    return parser.parse_args()
+
+
+def resolve_target(config: ConfigurationManager, args: argparse.Namespace) -> Tuple[str, str]:
+    translator_code = args.translator or config.user.selected_translator
+    target_lang = args.lang or config.user.selected_language
+    if translator_code not in config.translators:
+        raise BatchError(f'Неизвестный переводчик "{translator_code}"')
+    if target_lang not in config.languages:
+        raise BatchError(f'Неизвестный язык "{target_lang}"')
+    return translator_code, target_lang
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
+        stream=sys.stderr
+    )
+    if args.resume and not args.output:
+        logger.error("--resume работает только с выводом в файл (-o)")
+        return 2
+
+    config = ConfigurationManager()
+    client = TranslationClient(config)
+    client.start()
+    try:
+        translator_code, target_lang = resolve_target(config, args)
+        checkpoint = None
+        if args.output:
+            checkpoint = Checkpoint(f"{args.output}{CHECKPOINT_SUFFIX}", {
+                "input": os.path.abspath(args.input) if args.input != "-" else "-",
+                "mode": args.mode,
+                "translator": translator_code,
+                "lang": target_lang,
+            })
+            if args.resume and checkpoint.load():
+                if not os.path.isfile(args.output):
+                    raise BatchError(f"Есть контрольная точка, но нет файла результата {args.output}")
+                logger.info(f"Продолжение с единицы {checkpoint.units + 1}")
+
+        with open_input(args.input) as stream:
+            units = read_lines(stream) if args.mode == "line" else read_paragraphs(stream)
+            batch = BatchTranslator(client, translator_code, target_lang, args.window or config.server.batch_window)
+            if args.output:
+                with open(args.output, "r+b" if checkpoint.units else "wb") as output:
+                    output.seek(checkpoint.output_bytes)
+                    output.truncate()
+                    done = batch.run(skip(units, checkpoint.units), output, checkpoint)
+                checkpoint.remove()
+            else:
+                done = batch.run(units, sys.stdout.buffer, None)
+        logger.info(f"Готово: переведено {done} единиц")
+        return 0
+    except BatchError as e:
+        logger.error(str(e))
+        return 1
+    except TranslationError as e:
+        hint = " Запустите снова с --resume, чтобы продолжить." if args.output else ""
+        logger.error(f"{e}. Перевод остановлен.{hint}")
+        return 1
+    except KeyboardInterrupt:
+        logger.warning("Перевод прерван." + (" Запустите снова с --resume, чтобы продолжить." if args.output else ""))
+        return 130
+    finally:
+        client.stop()
+        config.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
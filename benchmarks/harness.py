@@ -0,0 +1,135 @@
+"""Запуск настоящего клиента без трея, клавиатуры и системного буфера обмена.
+
+Каталог конфигурации подменяется временным (через AI_TRANSLATE_HUB_CONFIG_DIR) и указывает на
+локальный сервер, а модули keyboard и pyperclip заменяются заглушками до импорта клиента.
+"""
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import types
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from module.utils import CONFIG_DIR_ENV
+
+
+class FakeClipboard:
+    def __init__(self):
+        self.__text = ""
+        self.__lock = Lock()
+        self.copies = 0
+
+    def paste(self) -> str:
+        return self.__text
+
+    def copy(self, text: str) -> None:
+        with self.__lock:
+            self.__text = text
+            self.copies += 1
+
+    def set(self, text: str) -> None:
+        with self.__lock:
+            self.__text = text
+
+
+class FakeKeyboard:
+    def __init__(self):
+        self.__hotkeys: Dict[int, Tuple[str, Callable]] = {}
+
+    def add_hotkey(self, combination: str, callback: Callable) -> int:
+        handle = len(self.__hotkeys) + 1
+        self.__hotkeys[handle] = (combination, callback)
+        return handle
+
+    def remove_hotkey(self, handle: int) -> None:
+        self.__hotkeys.pop(handle, None)
+
+    def unhook_all(self) -> None:
+        self.__hotkeys.clear()
+
+    def press(self) -> Any:
+        """Нажимает первую зарегистрированную комбинацию и возвращает результат обработчика."""
+        for _, callback in list(self.__hotkeys.values()):
+            return callback()
+        raise RuntimeError("Горячая клавиша ещё не зарегистрирована")
+
+    @property
+    def registered(self) -> bool:
+        return bool(self.__hotkeys)
+
+
+def install_stubs() -> Tuple[FakeClipboard, FakeKeyboard]:
+    clipboard, keyboard = FakeClipboard(), FakeKeyboard()
+
+    pyperclip_module = types.ModuleType("pyperclip")
+    pyperclip_module.paste = clipboard.paste
+    pyperclip_module.copy = clipboard.copy
+    keyboard_module = types.ModuleType("keyboard")
+    keyboard_module.add_hotkey = keyboard.add_hotkey
+    keyboard_module.remove_hotkey = keyboard.remove_hotkey
+    keyboard_module.unhook_all = keyboard.unhook_all
+
+    sys.modules["pyperclip"] = pyperclip_module
+    sys.modules["keyboard"] = keyboard_module
+    return clipboard, keyboard
+
+
+@contextmanager
+def headless_client(port: int, server_overrides: Optional[Dict[str, Any]] = None,
+                    user_overrides: Optional[Dict[str, Any]] = None
+                    ) -> Iterator[Tuple[Any, Any, FakeClipboard, FakeKeyboard]]:
+    """Запускает ConfigurationManager и KeyListener против сервера на 127.0.0.1:port.
+
+    Отдаёт кортеж (config_manager, key_listener, clipboard, keyboard).
+    """
+    config_dir = tempfile.mkdtemp(prefix="ai-translate-hub-bench-")
+    server_config = {"server_host": "127.0.0.1", "server_port": str(port), **(server_overrides or {})}
+    user_config = {"cache_enabled": False, "incremental_translation": False, **(user_overrides or {})}
+    for name, data in (("server_config.json", server_config), ("user_config.json", user_config)):
+        with open(os.path.join(config_dir, name), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    previous_config_dir = os.environ.get(CONFIG_DIR_ENV)
+    os.environ[CONFIG_DIR_ENV] = config_dir
+    clipboard, keyboard = install_stubs()
+
+    from config_manager import ConfigurationManager
+    from key_listener import KeyListener
+
+    config = ConfigurationManager()
+    listener = KeyListener(config)
+    listener.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not (keyboard.registered and listener.client.ws.connected):
+            if time.monotonic() > deadline:
+                raise RuntimeError("Клиент не подключился к серверу за 10 секунд")
+            time.sleep(0.01)
+        yield config, listener, clipboard, keyboard
+    finally:
+        listener.stop()
+        config.close()
+        if previous_config_dir is None:
+            os.environ.pop(CONFIG_DIR_ENV, None)
+        else:
+            os.environ[CONFIG_DIR_ENV] = previous_config_dir
+        shutil.rmtree(config_dir, ignore_errors=True)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def describe(samples: List[float]) -> str:
+    if not samples:
+        return "no samples"
+    return (
+        f"p50={percentile(samples, 50):8.2f} ms  p95={percentile(samples, 95):8.2f} ms  "
+        f"p99={percentile(samples, 99):8.2f} ms  mean={statistics.mean(samples):8.2f} ms"
+    )
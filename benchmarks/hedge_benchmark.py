@@ -0,0 +1,71 @@
+"""Бенчмарк дублирования медленных запросов на запасной переводчик.
+
+Сервер-заглушка отвечает за переводчика yandex с «хвостом»: доля --tail-rate ответов задерживается
+на --tail-latency секунд. Сравнивается p50/p95/p99 нажатия без дублирования и с дублированием
+на google, а также сколько раз дублирование сработало и кто ответил первым. Перед замером
+--warmup нажатий собирают статистику задержек, по которой выучивается срок дублирования.
+
+Запуск из корня репозитория:
+    python -m benchmarks.hedge_benchmark --presses 200 --tail-rate 0.1 --tail-latency 1.0 --deadline 0.15
+"""
+import argparse
+import time
+from typing import List
+from benchmarks.harness import describe, headless_client
+from benchmarks.stand_in_server import StandInServer, fake_translate
+from module.metrics import metrics
+
+
+def measure(server: StandInServer, presses: int, warmup: int, hedge_translator: str, deadline: float) -> None:
+    user = {"selected_translator": "yandex", "selected_language": "ru",
+            "hedge_translator": hedge_translator, "hedge_deadline": deadline}
+    with headless_client(server.port, user_overrides=user) as (config, listener, clipboard, keyboard):
+        for index in range(warmup):
+            clipboard.set(f"Warm-up sentence number {index} for the hedging benchmark.")
+            keyboard.press().result(timeout=30)
+
+        before = metrics.summary()
+        latencies: List[float] = []
+        failures = 0
+        for index in range(presses):
+            text = f"Sample sentence number {index} for the hedging benchmark."
+            expected = {fake_translate(text, "yandex", "ru"), fake_translate(text, hedge_translator or "yandex", "ru")}
+            clipboard.set(text)
+            started = time.perf_counter()
+            keyboard.press().result(timeout=30)
+            if clipboard.paste() in expected:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                failures += 1
+
+        after = metrics.summary()
+        counters = {
+            name: after[name]["value"] - before.get(name, {}).get("value", 0)
+            for name in after if name.startswith("hedge_")
+        }
+        mode = f"hedge->{hedge_translator}" if hedge_translator else "no hedge"
+        print(f"{mode:<16} {describe(latencies)}  failures={failures}")
+        for name, value in sorted(counters.items()):
+            print(f"    {name} = {value:.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--presses", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=40, help="Нажатий до замера, по ним выучивается срок")
+    parser.add_argument("--latency", type=float, default=0.02, help="Обычная задержка перевода, секунды")
+    parser.add_argument("--tail-rate", type=float, default=0.1, help="Доля медленных ответов yandex")
+    parser.add_argument("--tail-latency", type=float, default=1.0, help="Задержка медленных ответов, секунды")
+    parser.add_argument("--deadline", type=float, default=0.0, help="hedge_deadline; 0 — выученный p95")
+    args = parser.parse_args()
+
+    server = StandInServer(latency=args.latency, translator_tail={"yandex": (args.tail_rate, args.tail_latency)}).start()
+    try:
+        for hedge_translator in ("", "google"):
+            measure(server, args.presses, args.warmup, hedge_translator, args.deadline)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Микробенчмарк: новый requests.Session на каждое нажатие против общего HttpClient.
+
+Запуск из корня репозитория:
+    python -m benchmarks.http_pool_benchmark --requests 500
+"""
+import argparse
+import json
+import statistics
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from types import SimpleNamespace
+from typing import Callable, List
+import requests
+from module.http_client import HttpClient
+
+
+class StubTranslateHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"status": "success"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def measure(send: Callable[[], None], count: int) -> List[float]:
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        send()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(name: str, samples: List[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<28} mean={statistics.mean(samples):7.3f} ms  p50={statistics.median(samples):7.3f} ms  p95={p95:7.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTranslateHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/translate"
+    payload = {"method": "translate", "ws_session_id": "bench", "payload": {"text": "Hello", "translator_code": "yandex", "target_lang": "ru"}}
+
+    def fresh_session():
+        requests.Session().post(url, json=payload)
+
+    client = HttpClient(SimpleNamespace(
+        connect_timeout=2, read_timeout=10, retry_total=2, retry_backoff=0.3, pool_maxsize=4,
+        endpoint_addresses=[f"127.0.0.1:{server.server_address[1]}"]
+    ))
+
+    def pooled_client():
+        client.post(url, json=payload)
+
+    report("requests.Session per press", measure(fresh_session, args.requests))
+    report("shared HttpClient", measure(pooled_client, args.requests))
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Бенчмарк повторного перевода отредактированного текста.
+
+Документ из --sentences предложений переводится один раз, затем --edits раз в нём меняется одно
+случайное предложение и текст переводится снова. Сравниваются байты запросов, число запросов и
+задержка на правку без инкрементального перевода и с ним. В приложении инкрементальный перевод
+по умолчанию выключен (incremental_translation), бенчмарк включает его сам.
+
+Запуск из корня репозитория:
+    python -m benchmarks.incremental_benchmark --sentences 40 --edits 50
+"""
+import argparse
+import random
+import time
+from typing import List
+from benchmarks.harness import describe, headless_client
+from benchmarks.stand_in_server import StandInServer
+
+
+def make_document(sentences: int) -> List[str]:
+    return [
+        f"Sentence {index} describes how the application translates text copied to the clipboard."
+        for index in range(sentences)
+    ]
+
+
+def measure(server: StandInServer, sentences: int, edits: int, incremental: bool) -> None:
+    document = make_document(sentences)
+    rng = random.Random(1)
+    with headless_client(server.port, user_overrides={"incremental_translation": incremental}) as (config, listener, *_):
+        listener.client.translate_text(" ".join(document), "yandex", "en")
+        before = dict(server.stats)
+        latencies = []
+        for edit in range(edits):
+            index = rng.randrange(sentences)
+            document[index] = f"Sentence {index} was edited {edit} times before the next translation."
+            started = time.perf_counter()
+            listener.client.translate_text(" ".join(document), "yandex", "en")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        sent = (server.stats["request_bytes"] - before["request_bytes"]) / edits
+        requests = (server.stats["translate_requests"] - before["translate_requests"]) / edits
+        mode = "incremental" if incremental else "full text"
+        print(f"{mode:<12} request={sent:8.0f} B/edit  requests={requests:5.2f}/edit  {describe(latencies)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=40, help="Предложений в документе")
+    parser.add_argument("--edits", type=int, default=50, help="Правок с повторным переводом")
+    parser.add_argument("--latency", type=float, default=0.02, help="Задержка сервера в секундах")
+    args = parser.parse_args()
+
+    server = StandInServer(latency=args.latency).start()
+    try:
+        for incremental in (False, True):
+            measure(server, args.sentences, args.edits, incremental)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
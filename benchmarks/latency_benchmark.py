@@ -0,0 +1,101 @@
+"""Сквозной бенчмарк: задержка от нажатия горячей клавиши до записи перевода в буфер обмена.
+
+Поднимает локальный сервер-заглушку и настоящий KeyListener с заглушками клавиатуры и буфера
+обмена. Для каждого прогона выводит p50/p95/p99 задержки нажатия и пропускную способность
+TranslationClient при заданной параллельности.
+
+Запуск из корня репозитория:
+    python -m benchmarks.latency_benchmark --presses 200 --runs 3 --latency 0.02 --jitter 0.01
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from benchmarks.harness import describe, headless_client
+from benchmarks.stand_in_server import StandInServer, fake_translate
+from module.metrics import metrics
+from module.segmenter import split_into_chunks
+
+
+def make_text(index: int, chars: int) -> str:
+    sentence = f"Sample sentence number {index} for the translation benchmark. "
+    return (sentence * (chars // len(sentence) + 1))[:chars]
+
+
+def expected_translation(text: str, max_chars: int, translator_code: str, target_lang: str) -> str:
+    return "".join(
+        chunk.prefix + fake_translate(chunk.text, translator_code, target_lang) + chunk.suffix
+        for chunk in split_into_chunks(text, max_chars)
+    )
+
+
+def measure_presses(config, clipboard, keyboard, presses: int, chars: int, timeout: float):
+    latencies: List[float] = []
+    failures = 0
+    for index in range(presses):
+        text = make_text(index, chars)
+        expected = expected_translation(
+            text, config.server.chunk_max_chars, config.user.selected_translator, config.user.selected_language
+        )
+        clipboard.set(text)
+        started = time.perf_counter()
+        keyboard.press().result(timeout=timeout)
+        if clipboard.paste() == expected:
+            latencies.append((time.perf_counter() - started) * 1000)
+        else:
+            failures += 1
+    return latencies, failures
+
+
+def measure_throughput(listener, requests: int, chars: int, concurrency: int) -> float:
+    def translate(index: int) -> None:
+        try:
+            listener.client.translate_text(make_text(index, chars), "yandex", "ru")
+        except Exception:
+            pass
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(translate, range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--presses", type=int, default=100, help="Нажатий за прогон")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--chars", type=int, default=200, help="Длина текста в буфере обмена")
+    parser.add_argument("--concurrency", type=int, default=4, help="Параллельность при замере пропускной способности")
+    parser.add_argument("--latency", type=float, default=0.02, help="Задержка сервера в секундах")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Случайная добавка к задержке в секундах")
+    parser.add_argument("--http-error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--read-timeout", type=float, default=2.0, help="read_timeout клиента в секундах")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        latency=args.latency, jitter=args.jitter, http_error_rate=args.http_error_rate,
+        drop_rate=args.drop_rate, disconnect_rate=args.disconnect_rate
+    ).start()
+
+    all_latencies: List[float] = []
+    try:
+        with headless_client(server.port, {"read_timeout": args.read_timeout}) as (config, listener, clipboard, keyboard):
+            for run in range(1, args.runs + 1):
+                latencies, failures = measure_presses(
+                    config, clipboard, keyboard, args.presses, args.chars, args.read_timeout * 3
+                )
+                throughput = measure_throughput(listener, args.presses, args.chars, args.concurrency)
+                all_latencies.extend(latencies)
+                print(f"run {run}: {describe(latencies)}  failures={failures}  throughput={throughput:7.1f} req/s")
+    finally:
+        server.stop()
+
+    print(f"total: {describe(all_latencies)}  server={server.stats}")
+    for name, values in sorted(metrics.summary().items()):
+        print(f"  {name:<45} {values}")
+
+
+if __name__ == "__main__":
+    main()
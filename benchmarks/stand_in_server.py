@@ -0,0 +1,338 @@
+"""Локальный сервер-заглушка с протоколом AI Translate HUB.
+
+Реализует то, на что опираются ConfigurationManager и KeyListener:
+    GET  /api/v1/get_config  — каталог переводчиков и языков (ETag, 304 Not Modified);
+    POST /api/v1/translate   — {"status": "success"}, результат позже приходит в WebSocket;
+    GET  /ws                 — WebSocket: приветствие {"room_id": "room_<id>"}, затем кадры
+                               {"result": {"request_id": ..., "result": {"text": ...}}}.
+
+Результат содержит request_id запроса, и get_config объявляет это полем "echo_request_id": true;
+с --no-echo сервер, как исходный бэкенд, не возвращает request_id и ничего не объявляет.
+
+С --wire сервер предлагает в get_config MessagePack (если установлен msgpack), gzip для тел POST и
+deflate для бинарных кадров результата. С --ws-translate сервер предлагает транспорт "websocket":
+клиент присылает запрос перевода кадром {"method": "translate", "request_id": ..., "payload": ...}
+в ту же сессию, без POST. Задержка, джиттер и внедрение сбоев настраиваются.
+
+Запуск из корня репозитория:
+    python -m benchmarks.stand_in_server --port 8080 --latency 0.05 --jitter 0.02
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import socket
+import struct
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread, Timer
+from typing import Any, Dict, Optional, Tuple
+from uuid import uuid4
+from module import wire
+
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OPCODE_TEXT, OPCODE_BINARY, OPCODE_CLOSE, OPCODE_PING, OPCODE_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+DEFAULT_CATALOG = {
+    "version": "1",
+    "translators": {"yandex": "Яндекс Переводчик", "google": "Google Translate", "deepl": "DeepL"},
+    "languages": {"ru": "Русский", "en": "English", "de": "Deutsch"},
+}
+
+
+def encode_frame(opcode: int, payload: bytes) -> bytes:
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def fake_translate(text: str, translator_code: str, target_lang: str) -> str:
+    # Строки переводятся по отдельности, как у настоящих переводчиков
+    return "\n".join(f"[{translator_code}:{target_lang}] {line}" for line in text.split("\n"))
+
+
+class WebSocketConnection:
+    def __init__(self, handler: BaseHTTPRequestHandler):
+        self.__rfile = handler.rfile
+        self.__wfile = handler.wfile
+        self.socket = handler.request
+        self.__lock = Lock()
+        self.closed = False
+
+    def read_frame(self):
+        head = self.__rfile.read(2)
+        if len(head) < 2:
+            raise EOFError
+        opcode, length = head[0] & 0x0F, head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self.__rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self.__rfile.read(8))[0]
+        mask = self.__rfile.read(4) if head[1] & 0x80 else None
+        payload = self.__rfile.read(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    def send(self, opcode: int, payload: bytes) -> None:
+        with self.__lock:
+            if self.closed:
+                return
+            try:
+                self.__wfile.write(encode_frame(opcode, payload))
+            except OSError:
+                self.closed = True
+
+    def send_json(self, message: Dict[str, Any]) -> None:
+        self.send(OPCODE_TEXT, json.dumps(message, ensure_ascii=False).encode("utf-8"))
+
+    def close(self) -> None:
+        self.send(OPCODE_CLOSE, struct.pack("!H", 1000))
+        self.closed = True
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StandInServer"
+
+    def do_GET(self):
+        if self.path == "/ws":
+            self.__handle_websocket()
+        elif self.path == "/api/v1/get_config":
+            self.__handle_get_config()
+        else:
+            self.__send_json(404, {"status": "error", "message": "not found"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/api/v1/translate":
+            self.__send_json(404, {"status": "error", "message": "not found"})
+            return
+
+        self.server.stats["translate_requests"] += 1
+        self.server.stats["request_bytes"] += len(body)
+        if random.random() < self.server.http_error_rate:
+            self.server.stats["http_errors"] += 1
+            self.__send_json(500, {"status": "error", "message": "injected failure"})
+            return
+
+        request = wire.decode_request(body, self.headers.get("Content-Type"), self.headers.get("Content-Encoding"))
+        connection = self.server.rooms.get(request.get("ws_session_id"))
+        if connection is None:
+            self.__send_json(400, {"status": "error", "message": "unknown ws_session_id"})
+            return
+
+        self.__send_json(200, {"status": "success"})
+        self.server.schedule_result(connection, request)
+
+    def __handle_get_config(self):
+        etag = f'"{self.server.catalog.get("version")}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.__send_json(200, self.server.catalog, {"ETag": etag})
+
+    def __handle_websocket(self):
+        key = self.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+
+        connection = WebSocketConnection(self)
+        session_id = uuid4().hex
+        self.server.rooms[session_id] = connection
+        self.server.stats["ws_sessions"] += 1
+        connection.send_json({"room_id": f"room_{session_id}"})
+
+        try:
+            while not connection.closed:
+                opcode, payload = connection.read_frame()
+                if opcode == OPCODE_PING:
+                    connection.send(OPCODE_PONG, payload)
+                elif opcode == OPCODE_CLOSE:
+                    connection.close()
+                elif opcode == OPCODE_TEXT:
+                    self.server.handle_ws_message(connection, session_id, json.loads(payload), len(payload))
+                elif opcode == OPCODE_BINARY:
+                    self.server.handle_ws_message(connection, session_id, wire.decode_frame(payload), len(payload))
+        except (EOFError, OSError, ValueError):
+            pass
+        finally:
+            connection.closed = True
+            self.server.rooms.pop(session_id, None)
+            self.close_connection = True
+
+    def __send_json(self, status: int, message: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 http_error_rate: float = 0.0, drop_rate: float = 0.0, disconnect_rate: float = 0.0,
+                 offer_wire: bool = False, translator_tail: Optional[Dict[str, Tuple[float, float]]] = None,
+                 offer_ws_translate: bool = False, echo_request_id: bool = True):
+        super().__init__((host, port), StandInHandler)
+        self.latency = latency  # Время «перевода» в секундах
+        self.jitter = jitter  # Случайная добавка к задержке, от 0 до jitter секунд
+        self.http_error_rate = http_error_rate  # Доля запросов перевода с ошибкой: 500 на POST или кадр status=error
+        self.drop_rate = drop_rate  # Доля результатов, которые не отправляются в WebSocket
+        self.disconnect_rate = disconnect_rate  # Доля результатов, вместо которых разрывается WebSocket
+        # {код переводчика: (доля, задержка)} — медленные ответы отдельных переводчиков («хвост» задержки)
+        self.translator_tail = translator_tail or {}
+        self.catalog = dict(DEFAULT_CATALOG)
+        if offer_wire:
+            self.catalog["wire"] = {
+                "encodings": wire.supported_encodings(),
+                "compression": [wire.COMPRESSION_GZIP, wire.COMPRESSION_DEFLATE],
+            }
+        if offer_ws_translate:
+            self.catalog["transports"] = [wire.TRANSPORT_HTTP, wire.TRANSPORT_WEBSOCKET]
+        # Без эха сервер ведёт себя как исходный бэкенд: результат без request_id, возможности не объявлены
+        self.echo_request_id = echo_request_id
+        if echo_request_id:
+            self.catalog["echo_request_id"] = True
+        self.rooms: Dict[str, WebSocketConnection] = {}
+        self.__sockets = set()  # Открытые соединения клиентов, в том числе keep-alive
+        self.stats = {
+            "translate_requests": 0, "http_errors": 0, "dropped": 0, "disconnects": 0, "ws_sessions": 0,
+            "request_bytes": 0, "result_bytes": 0,
+        }
+        self.__thread: Optional[Thread] = None
+
+    def schedule_result(self, connection: WebSocketConnection, request: Dict[str, Any]):
+        delay = self.latency + random.uniform(0, self.jitter)
+        tail_rate, tail_latency = self.translator_tail.get(request.get("payload", {}).get("translator_code"), (0.0, 0.0))
+        if random.random() < tail_rate:
+            delay += tail_latency
+        Timer(delay, self.__deliver_result, (connection, request)).start()
+
+    def handle_ws_message(self, connection: WebSocketConnection, session_id: str, message: Dict[str, Any], size: int):
+        """Кадры клиента, кроме служебных: запрос перевода по транспорту "websocket"."""
+        if message.get("method") != "translate":
+            return
+        self.stats["translate_requests"] += 1
+        self.stats["request_bytes"] += size
+        if random.random() < self.http_error_rate:
+            self.stats["http_errors"] += 1
+            error = {"status": "error", "message": "injected failure"}
+            if self.echo_request_id:
+                error["request_id"] = message.get("request_id")
+            connection.send_json(error)
+            return
+        self.schedule_result(connection, message)
+
+    def __deliver_result(self, connection: WebSocketConnection, request: Dict[str, Any]):
+        roll = random.random()
+        if roll < self.disconnect_rate:
+            self.stats["disconnects"] += 1
+            connection.close()
+            return
+        if roll < self.disconnect_rate + self.drop_rate:
+            self.stats["dropped"] += 1
+            return
+
+        payload = request.get("payload", {})
+        text = fake_translate(payload.get("text", ""), payload.get("translator_code"), payload.get("target_lang"))
+        result = {"result": {"text": text}}
+        if self.echo_request_id:
+            result["request_id"] = request.get("request_id")
+        binary, data = wire.encode_frame({"result": result}, request.get("result_format"))
+        self.stats["result_bytes"] += len(data)
+        connection.send(OPCODE_BINARY if binary else OPCODE_TEXT, data)
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "StandInServer":
+        self.__thread = Thread(target=self.serve_forever, name="stand-in-server", daemon=True)
+        self.__thread.start()
+        return self
+
+    def process_request(self, request, client_address):
+        self.__sockets.add(request)
+        super().process_request(request, client_address)
+
+    def shutdown_request(self, request):
+        self.__sockets.discard(request)
+        super().shutdown_request(request)
+
+    def stop(self, close_sessions: bool = True) -> None:
+        """Останавливает сервер; close_sessions=False — сервер «завис»: сессии не получают кадр close
+        и замолкают, и клиент узнаёт о сбое по отказу запроса или по ping."""
+        for connection in list(self.rooms.values()):
+            if close_sessions:
+                connection.close()
+            else:
+                connection.closed = True
+        self.shutdown()
+        self.server_close()
+        # Остановленный сервер не должен отвечать через keep-alive соединения, как и настоящий
+        session_sockets = set() if close_sessions else {connection.socket for connection in self.rooms.values()}
+        for request in list(self.__sockets - session_sockets):
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--http-error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--wire", action="store_true", help="Предлагать MessagePack и сжатие")
+    parser.add_argument("--ws-translate", action="store_true", help="Предлагать запрос перевода кадром в WebSocket")
+    parser.add_argument("--no-echo", action="store_true", help="Не возвращать request_id в результате, как исходный бэкенд")
+    parser.add_argument("--tail", action="append", default=[], metavar="CODE:RATE:SECONDS",
+                        help="Доля медленных ответов переводчика и их дополнительная задержка")
+    args = parser.parse_args()
+
+    translator_tail = {}
+    for tail in args.tail:
+        code, rate, seconds = tail.split(":")
+        translator_tail[code] = (float(rate), float(seconds))
+    server = StandInServer(
+        args.host, args.port, args.latency, args.jitter, args.http_error_rate, args.drop_rate, args.disconnect_rate,
+        args.wire, translator_tail, args.ws_translate, not args.no_echo
+    )
+    print(f"Stand-in server listening on http://{args.host}:{server.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
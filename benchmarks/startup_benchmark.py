@@ -0,0 +1,85 @@
+"""Бенчмарк запуска клиента: время импорта модулей и время до Icon.run.
+
+Каждый прогон выполняется в отдельном процессе с `python -X importtime`. Icon.run подменяется
+так, чтобы процесс печатал время от старта интерпретатора до появления иконки и завершался.
+Для прогона без ожидания сервера в каталоге config должен лежать catalog_cache.json.
+В списке импортов есть и модули, загружаемые фоновыми потоками (KeyListener, обновление
+каталога): они не задерживают иконку, но конкурируют с основным потоком за блокировку импорта.
+
+Запуск из корня репозитория:
+    python -m benchmarks.startup_benchmark --runs 5 --top 15
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DRIVER = """
+import os, sys, time
+started = time.perf_counter()
+import main
+import tray_app
+
+def report_and_exit(self, *args, **kwargs):
+    print(f"TIME_TO_ICON_RUN {(time.perf_counter() - started) * 1000:.3f}", flush=True)
+    os._exit(0)
+
+tray_app.Icon.run = report_and_exit
+main.main()
+"""
+
+IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+TIME_TO_ICON_RE = re.compile(r"^TIME_TO_ICON_RUN ([\d.]+)", re.M)
+
+
+def run_once() -> Tuple[float, Dict[str, int]]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", DRIVER],
+        cwd=ROOT_DIR, capture_output=True, text=True, timeout=120
+    )
+    match = TIME_TO_ICON_RE.search(process.stdout)
+    if not match:
+        raise RuntimeError(f"Icon.run не был вызван (код {process.returncode}):\n{process.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in process.stderr.splitlines():
+        import_match = IMPORT_TIME_RE.match(line)
+        if import_match:
+            cumulative[import_match.group(3)] = int(import_match.group(2))
+    return float(match.group(1)), cumulative
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Сколько самых медленных модулей показать")
+    args = parser.parse_args()
+
+    times_to_icon: List[float] = []
+    imports: Dict[str, List[int]] = defaultdict(list)
+    for _ in range(args.runs):
+        time_to_icon, cumulative = run_once()
+        times_to_icon.append(time_to_icon)
+        for module, us in cumulative.items():
+            imports[module].append(us)
+
+    print(f"Slowest imports, median cumulative time over {args.runs} runs:")
+    medians = sorted(((statistics.median(v), k) for k, v in imports.items()), reverse=True)
+    for us, module in medians[:args.top]:
+        print(f"  {module:<40} {us / 1000:8.2f} ms")
+
+    print(
+        f"Time to Icon.run: median={statistics.median(times_to_icon):.1f} ms "
+        f"min={min(times_to_icon):.1f} ms max={max(times_to_icon):.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Бенчмарк транспорта запроса перевода: POST + результат в WebSocket против кадра в WebSocket.
+
+Сервер-заглушка предлагает оба транспорта; клиент с transport "http" отправляет запрос POST-ом,
+с "auto" — кадром в уже открытую сессию. Для каждого транспорта выводятся p50/p95/p99 задержки
+TranslationClient.translate, байты запроса и пропускная способность при заданной параллельности.
+
+Запуск из корня репозитория:
+    python -m benchmarks.transport_benchmark --requests 500 --latency 0.0 --concurrency 8
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from benchmarks.harness import describe, headless_client
+from benchmarks.stand_in_server import StandInServer, fake_translate
+from module.wire import TRANSPORT_HTTP, TRANSPORT_WEBSOCKET
+
+
+TRANSPORTS = {TRANSPORT_HTTP: "http", TRANSPORT_WEBSOCKET: "auto"}  # Транспорт -> значение настройки transport
+
+
+def make_text(index: int, chars: int) -> str:
+    sentence = f"Sample sentence number {index} for the transport benchmark. "
+    return (sentence * (chars // len(sentence) + 1))[:chars]
+
+
+def measure(server: StandInServer, transport: str, requests: int, chars: int, concurrency: int, wire: bool) -> None:
+    overrides = {"transport": TRANSPORTS[transport], "wire_format": "auto" if wire else "json"}
+    with headless_client(server.port, server_overrides=overrides) as (config, listener, clipboard, keyboard):
+        client = listener.client
+        for index in range(min(20, requests)):  # Прогрев пула соединений и кэшей
+            client.translate(make_text(index, chars), "yandex", "en")
+
+        before = dict(server.stats)
+        latencies: List[float] = []
+        failures = 0
+        for index in range(requests):
+            text = make_text(index, chars)
+            started = time.perf_counter()
+            translated = client.translate(text, "yandex", "en")
+            if translated == fake_translate(text, "yandex", "en"):
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                failures += 1
+        sent = (server.stats["request_bytes"] - before["request_bytes"]) / requests
+        print(f"{transport:<9} sequential   {describe(latencies)}  request={sent:6.0f} B  failures={failures}")
+
+        def translate(index: int) -> None:
+            client.translate(make_text(index, chars), "yandex", "en")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(translate, range(requests)))
+        throughput = requests / (time.perf_counter() - started)
+        print(f"{transport:<9} concurrency={concurrency:<2} {throughput:8.1f} req/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Запросов на транспорт")
+    parser.add_argument("--chars", type=int, default=200, help="Длина текста запроса в символах")
+    parser.add_argument("--concurrency", type=int, default=8, help="Параллельных запросов при замере пропускной способности")
+    parser.add_argument("--latency", type=float, default=0.0, help="Время «перевода» на сервере, секунды")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--wire", action="store_true", help="Согласовать MessagePack и сжатие")
+    args = parser.parse_args()
+
+    server = StandInServer(latency=args.latency, jitter=args.jitter, offer_wire=args.wire, offer_ws_translate=True).start()
+    try:
+        for transport in TRANSPORTS:
+            measure(server, transport, args.requests, args.chars, args.concurrency, args.wire)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
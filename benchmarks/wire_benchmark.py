@@ -0,0 +1,119 @@
+"""Бенчмарк форматов передачи: байты на проводе и стоимость кодирования/декодирования.
+
+Для запроса перевода (тело POST) и кадра результата (WebSocket) сравниваются JSON, JSON+сжатие,
+MessagePack и MessagePack+сжатие на текстах разной длины. С --e2e дополнительно прогоняется
+настоящий TranslationClient против сервера-заглушки с форматом по умолчанию и с согласованным.
+
+Запуск из корня репозитория:
+    python -m benchmarks.wire_benchmark --sizes 200 900 4000 --e2e
+"""
+import argparse
+import time
+from typing import Callable, List
+from benchmarks.harness import describe, headless_client
+from benchmarks.stand_in_server import StandInServer, fake_translate
+from module.wire import (
+    COMPRESSION_DEFLATE, COMPRESSION_GZIP, ENCODING_MSGPACK, WireFormat, decode_frame, decode_request,
+    encode_frame, encode_request, result_format, supported_encodings
+)
+
+
+SAMPLE = (
+    "Переводчик получает текст из буфера обмена и отправляет его на сервер. "
+    "The result arrives over the WebSocket session in a separate frame. "
+)
+
+
+def make_text(chars: int) -> str:
+    return (SAMPLE * (chars // len(SAMPLE) + 1))[:chars]
+
+
+def make_request(text: str) -> dict:
+    return {
+        "method": "translate",
+        "request_id": "0f8c1c7a6d2b4f1e9a3b5c7d9e1f2a3b",
+        "ws_session_id": "5b3e8c1d7a9f4e2b8c6d1a3f5e7b9c2d",
+        "payload": {"text": text, "translator_code": "yandex", "target_lang": "en"},
+    }
+
+
+def time_per_call(function: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+def wire_formats() -> List[WireFormat]:
+    formats = []
+    for encoding in reversed(supported_encodings()):
+        formats.append(WireFormat(encoding))
+        formats.append(WireFormat(encoding, COMPRESSION_GZIP, COMPRESSION_DEFLATE))
+    return formats
+
+
+def format_name(wire: WireFormat) -> str:
+    return wire.encoding + ("+gzip/deflate" if wire.request_compression else "")
+
+
+def measure_codecs(sizes: List[int], repeat: int) -> None:
+    print(f"{'chars':>6} {'format':<22} {'request B':>10} {'enc us':>8} {'dec us':>8} "
+          f"{'result B':>9} {'enc us':>8} {'dec us':>8}")
+    for chars in sizes:
+        text = make_text(chars)
+        request = make_request(text)
+        result = {"result": {"request_id": request["request_id"], "result": {"text": fake_translate(text, "yandex", "en")}}}
+        for wire in wire_formats():
+            body, headers = encode_request(request, wire)
+            requested = result_format(wire)
+            _, frame = encode_frame(result, requested)
+
+            request_encode = time_per_call(lambda: encode_request(request, wire), repeat)
+            request_decode = time_per_call(
+                lambda: decode_request(body, headers["Content-Type"], headers.get("Content-Encoding")), repeat
+            )
+            result_encode = time_per_call(lambda: encode_frame(result, requested), repeat)
+            result_decode = time_per_call(lambda: decode_frame(frame), repeat)
+            print(f"{chars:>6} {format_name(wire):<22} {len(body):>10} {request_encode:>8.1f} {request_decode:>8.1f} "
+                  f"{len(frame):>9} {result_encode:>8.1f} {result_decode:>8.1f}")
+        print()
+
+
+def measure_end_to_end(sizes: List[int], requests: int) -> None:
+    for offered in (False, True):
+        server = StandInServer(offer_wire=offered).start()
+        try:
+            with headless_client(server.port) as (config, listener, clipboard, keyboard):
+                for chars in sizes:
+                    before = dict(server.stats)
+                    latencies = []
+                    for _ in range(requests):
+                        started = time.perf_counter()
+                        listener.client.translate_text(make_text(chars), "yandex", "en")
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    sent = (server.stats["request_bytes"] - before["request_bytes"]) / requests
+                    received = (server.stats["result_bytes"] - before["result_bytes"]) / requests
+                    wire = "negotiated" if offered else "json"
+                    print(f"{wire:<10} chars={chars:<5} request={sent:8.0f} B  result={received:8.0f} B  "
+                          f"{describe(latencies)}")
+        finally:
+            server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 900, 4000], help="Длины текста в символах")
+    parser.add_argument("--repeat", type=int, default=2000, help="Повторов при замере кодирования")
+    parser.add_argument("--e2e", action="store_true", help="Прогнать клиент против сервера-заглушки")
+    parser.add_argument("--requests", type=int, default=50, help="Запросов на размер в сквозном прогоне")
+    args = parser.parse_args()
+
+    if ENCODING_MSGPACK not in supported_encodings():
+        print("msgpack не установлен: MessagePack пропущен\n")
+    measure_codecs(args.sizes, args.repeat)
+    if args.e2e:
+        measure_end_to_end(args.sizes, args.requests)
+
+
+if __name__ == "__main__":
+    main()
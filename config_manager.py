@@ -1,21 +1,33 @@
+import os
 import sys
-import requests
+import time
 from logging import getLogger
-from typing import List
-from module.translators import Translator, Language
-from module.configs import AppConfig, ServerConfig, UserConfig
-from module.utils import show_error_message
+from threading import Event, Thread
+from typing import Any, Callable, Dict, List, Optional, Set
+from module.translators import CatalogDiff, Language, Registry, Translator
+from module.catalog import CatalogStore
+from module.configs import AppConfig, ConfigWatcher, ServerConfig, UserConfig
+from module.endpoints import Endpoint, EndpointPool
+from module.http_client import HttpClient
+from module.utils import get_config_dir, show_error_message
 
 
-SERVER_REQUEST_TIMEOUT = 2
+CATALOG_CACHE_FILE = "catalog_cache.json"
 
 logger = getLogger(__name__)
 
 
+class CatalogError(Exception):
+    pass
+
+
 class ConfigurationManager:
     def __init__(self):
-        self.__translators_data = []
-        self.__languages_data = []
+        self.__translators: Registry[Translator] = Registry(Translator)
+        self.__languages: Registry[Language] = Registry(Language)
+        self.__catalog: Dict[str, Any] = {}
+        self.__catalog_listeners: List[Callable[[CatalogDiff], None]] = []
+        self.__stopped = Event()
 
         self.app = AppConfig()
         self.server = ServerConfig()
@@ -23,30 +35,31 @@ class ConfigurationManager:
 
         self.__load_config()
 
+        self.http = HttpClient(self.server)
+        self.endpoints = EndpointPool(self.server, self.http)
+        self.endpoints.start()
+        self.server.add_listener(self.__on_server_config_change)
+        self.__watcher = ConfigWatcher(self.app, self.server, self.user)
+        self.__watcher.start()
+        self.__catalog_store = CatalogStore(os.path.join(get_config_dir(), CATALOG_CACHE_FILE))
+
+        cached_catalog = self.__catalog_store.load()
+        if cached_catalog:
+            # Запуск не ждёт сервер: работаем с сохранённым каталогом и проверяем его актуальность в фоне
+            self.__apply_catalog(cached_catalog)
+            Thread(target=self.__refresh_catalog_loop, args=(True,), name="catalog", daemon=True).start()
+            return
+
+        # Первый запуск: сохранённого каталога ещё нет, без сервера работать не с чем
         try:
-            session = requests.Session()
-            response = session.get(self.server.config_url, timeout=SERVER_REQUEST_TIMEOUT)
-
-            if response.status_code == 200:
-                data = response.json()
-                self.__translators_data = list(data.get('translators', {}).items())
-                self.__languages_data = list(data.get('languages', {}).items())
-
-                if not self.__translators_data or not self.__languages_data:
-                    title, msg = "Ошибка при загрузке данных с сервера", "Полученные данные с сервера пустые"
-
-                    logger.error(msg)
-                    show_error_message(title, msg)
-
-                    sys.exit(1)
-            else:
-                title, msg = "Ошибка при загрузке данных с сервера", f'Ошибка при загрузке конфигурации с сервера. Статус: "{response.status_code}"'
+            self.__update_catalog()
+        except CatalogError as e:
+            title, msg = "Ошибка при загрузке данных с сервера", str(e)
 
-                logger.error(msg)
-                show_error_message(title, msg)
-
-                sys.exit(1)
+            logger.error(msg)
+            show_error_message(title, msg)
 
+            sys.exit(1)
         except Exception as e:
             title, msg = "Ошибка при загрузке конфигурации с сервера", f'Ошибка при загрузке конфигурации с сервера: "{e}"'
 
@@ -55,24 +68,137 @@ class ConfigurationManager:
 
             sys.exit(1)
 
-        self.__translators = self.__init_translators()
-        self.__languages = self.__init_languages()
-
-    def __init_translators(self) -> List[Translator]:
-        return [Translator(code, name) for code, name in self.__translators_data]
-
-    def __init_languages(self) -> List[Language]:
-        return [Language(code, name) for code, name in self.__languages_data]
+        Thread(target=self.__refresh_catalog_loop, args=(False,), name="catalog", daemon=True).start()
+
+    def __fetch_catalog(self, etag: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Запрашивает каталог у лучшего сервера, при ошибке — у следующих; None, если ответ 304 Not Modified."""
+        endpoints = self.endpoints.ranked()
+        for index, endpoint in enumerate(endpoints):
+            started = time.perf_counter()
+            try:
+                catalog = self.__fetch_catalog_from(endpoint, etag)
+            except Exception as e:
+                self.endpoints.record(endpoint, ok=False)
+                if index == len(endpoints) - 1:
+                    raise
+                logger.warning(f"Не удалось получить каталог с {endpoint.address}: {e}")
+                continue
+            self.endpoints.record(endpoint, ok=True, latency=time.perf_counter() - started)
+            return catalog
+
+    def __fetch_catalog_from(self, endpoint: Endpoint, etag: Optional[str]) -> Optional[Dict[str, Any]]:
+        headers = {"If-None-Match": etag} if etag else {}
+        response = self.http.get(endpoint.config_url, headers=headers)
+
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            raise CatalogError(f'Ошибка при загрузке конфигурации с сервера. Статус: "{response.status_code}"')
+
+        data = response.json()
+        catalog = {
+            "etag": response.headers.get("ETag"),
+            "version": data.get("version"),
+            "translators": data.get("translators", {}),
+            "languages": data.get("languages", {}),
+            "wire": data.get("wire", {}),  # Форматы и сжатие, которые понимает сервер
+            "transports": data.get("transports", []),  # Способы отправки запроса перевода, которые понимает сервер
+            # Сервер возвращает request_id в кадре результата: только тогда в сессии можно держать несколько запросов
+            "echo_request_id": bool(data.get("echo_request_id", False)),
+        }
+        if not catalog["translators"] or not catalog["languages"]:
+            raise CatalogError("Полученные данные с сервера пустые")
+        return catalog
+
+    def __update_catalog(self) -> Optional[CatalogDiff]:
+        """Обновляет каталог с сервера; возвращает изменения или None, если каталог не изменился."""
+        catalog = self.__fetch_catalog(self.__catalog.get("etag"))
+        if catalog is None:
+            logger.info("Catalog is up to date (304 Not Modified)")
+            return None
+
+        self.__catalog_store.save(catalog)
+        diff = self.__apply_catalog(catalog)
+        return diff if diff else None
+
+    def __refresh_catalog_loop(self, refresh_now: bool) -> None:
+        """Проверяет каталог сразу (если запуск был с сохранённой копией) и затем каждые catalog_refresh_interval секунд."""
+        if refresh_now:
+            self.__refresh_catalog()
+        while self.server.catalog_refresh_interval > 0 and not self.__stopped.wait(self.server.catalog_refresh_interval):
+            self.__refresh_catalog()
+
+    def __refresh_catalog(self) -> None:
+        try:
+            diff = self.__update_catalog()
+        except Exception as e:
+            logger.error(f"Не удалось обновить каталог с сервера, используется сохранённая копия: {e}")
+            return
+        if diff is None:
+            return
+
+        logger.info(
+            f"Catalog changed on server: translators +{len(diff.translators.added)} -{len(diff.translators.removed)} "
+            f"~{len(diff.translators.renamed)}, languages +{len(diff.languages.added)} -{len(diff.languages.removed)} "
+            f"~{len(diff.languages.renamed)}"
+        )
+        if self.user.selected_translator not in self.__translators:
+            logger.warning(f'Выбранный переводчик "{self.user.selected_translator}" больше не поддерживается сервером')
+        if self.user.selected_language not in self.__languages:
+            logger.warning(f'Выбранный язык "{self.user.selected_language}" больше не поддерживается сервером')
+        for listener in list(self.__catalog_listeners):
+            try:
+                listener(diff)
+            except Exception as e:
+                logger.error(f"Ошибка обработчика обновления каталога: {e}")
+
+    def __apply_catalog(self, catalog: Dict[str, Any]) -> CatalogDiff:
+        self.__catalog = catalog
+        return CatalogDiff(
+            self.__translators.update(catalog["translators"]),
+            self.__languages.update(catalog["languages"])
+        )
 
     def __load_config(self) -> None:
         self.app.load()
         self.server.load()
         self.user.load()
 
+    def __on_server_config_change(self, changed: Set[str]) -> None:
+        logger.info("Server config changed, HTTP connection pool will be recreated")
+        self.http.reset()
+        if changed & {"endpoints", "server_host", "server_port"}:
+            self.endpoints.reload()
+
+    def add_catalog_listener(self, listener: Callable[[CatalogDiff], None]) -> None:
+        """Подписывает listener на изменения каталога, полученные в фоне."""
+        self.__catalog_listeners.append(listener)
+
+    def close(self) -> None:
+        self.__stopped.set()
+        self.endpoints.stop()
+        self.__watcher.stop()
+        self.app.flush()
+        self.server.flush()
+        self.user.flush()
+        self.http.close()
+
     @property
-    def languages(self) -> List[Language]:
+    def languages(self) -> Registry[Language]:
         return self.__languages
 
     @property
-    def translators(self) -> List[Translator]:
+    def translators(self) -> Registry[Translator]:
         return self.__translators
+
+    @property
+    def wire_offer(self) -> Dict[str, Any]:
+        return self.__catalog.get("wire") or {}
+
+    @property
+    def transport_offer(self) -> List[str]:
+        return self.__catalog.get("transports") or []
+
+    @property
+    def echoes_request_id(self) -> bool:
+        return bool(self.__catalog.get("echo_request_id"))
@@ -1,13 +1,23 @@
-import json
 from logging import getLogger
 import time
-import keyboard
-import pyperclip
-from threading import Thread
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING, Callable, Deque, Dict, FrozenSet, List, Optional, Tuple
 from config_manager import ConfigurationManager
-import websocket
-import requests
+from module.clipboard_watcher import ClipboardWatcher
+from module.hedging import Hedger
+from module.langid import detect_language, is_confident, same_language
+from module.log_pipeline import loggable
+from module.metrics import metrics
+from module.single_flight import SingleFlight
+from translation_client import TranslationClient, TranslationError
 
+if TYPE_CHECKING:
+    from module.outbox import OutboxEntry
+
+
+OUTBOX_ERROR_KINDS = frozenset({"not_connected", "disconnected"})  # Сбои связи, после которых запрос ставится в очередь
 
 logger = getLogger(__name__)
 
@@ -17,165 +27,456 @@ class KeyListener(Thread):
         super().__init__(daemon=True)
         self.__config = config_manager
         self.__key_combination = self.__config.user.translate_keyboard  # например "alt+shift+t"
-        self.__running = True
-        self.__ws_connected = False
-        self.__reconnect_delay = 5  # Задержка перед переподключением в секундах
+        self.__stopped = Event()
+        # Нажатия обрабатываются вне потока хука клавиатуры, чтобы медленный перевод не блокировал следующий
+        self.__executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="translate")
+        # Переводы на несколько языков в одном нажатии; отдельный пул, чтобы не ждать освобождения своего же
+        self.__fanout_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fanout")
         logger.info(f"Инициализация KeyListener с комбинацией {self.__key_combination}")
-        self.ws = None
-           
-    def __connect_websocket(self):
-        """Устанавливает соединение с WebSocket."""
-        if self.ws and self.ws.connected:
-            return True
+        self.client = TranslationClient(self.__config)
+        self.cache = None
+        self.memory = None
+        self.outbox = None
+        self.__hotkey = None
+        # Одинаковые нажатия во время перевода присоединяются к уже отправленному запросу,
+        # а в буфер обмена пишется только результат последнего нажатия
+        self.__flights = SingleFlight()
+        self.__press_lock = Lock()
+        self.__latest_press = 0
+        self.__wanted_keys: FrozenSet[Tuple[str, str, str]] = frozenset()
+        # Упреждающий перевод: текст переводится сразу после копирования, нажатие забирает готовый результат
+        self.__watcher: Optional[ClipboardWatcher] = None
+        self.__prefetch_keys: FrozenSet[Tuple[str, str, str]] = frozenset()
+        self.__prefetched: Dict[Tuple[str, str, str], str] = {}
+        self.__own_copies: Deque[str] = deque(maxlen=16)  # Собственные записи в буфер, их переводить не нужно
+        # Медленный ответ основного переводчика дублируется запросом к запасному
+        self.__hedger = Hedger(self.__config.user)
+        self.client.add_request_listener(self.__hedger.observe)
+        # Нажатия без связи с сервером сохраняются и переводятся после переподключения
+        self.__replay_executor = ThreadPoolExecutor(
+            max_workers=self.__config.user.outbox_replay_window, thread_name_prefix="replay"
+        )
+        # Отправкой очереди управляет свой поток: долгая отправка не занимает обработчики нажатий
+        self.__outbox_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox")
+        self.__replay_lock = Lock()
+        self.__outbox_listeners: List[Callable[["OutboxEntry", str, bool], None]] = []
+        self.client.ws.add_connect_listener(self.__on_connected)
+        self.__config.user.add_listener(self.__on_user_config_change)
+        self.__config.server.add_listener(self.__on_server_config_change)
+
+    def __on_hotkey_press(self):
+        """Обработчик нажатия комбинации клавиш"""
+        import pyperclip
+
+        logger.info(f"Обнаружено нажатие комбинации {self.__key_combination}")
+        metrics.inc("presses_total")
+        started = time.perf_counter()
+        try:
+            with metrics.timer("stage_seconds", stage="clipboard_read"):
+                clipboard_text = pyperclip.paste()
+        except Exception as e:
+            logger.error(f"Ошибка при чтении буфера обмена: {e}")
+            metrics.inc("failures_total", type="clipboard")
+            return
+        if not clipboard_text or not clipboard_text.strip():
+            logger.warning("Буфер обмена пуст. Операция отменена.")
+            return
+        keys = self.__make_keys(clipboard_text)
+        with self.__press_lock:
+            self.__latest_press += 1
+            press_id = self.__latest_press
+            self.__wanted_keys = frozenset(keys)
+
+        if not keys:
+            logger.info("Текст уже на языке перевода, запрос не отправляется")
+            metrics.inc("same_language_total")
+            return
+        if len(keys) > 1:
+            self.__translate_to_many(press_id, keys, started)
+            return
+
+        key = keys[0]
+        resolved = self.__resolve(key, on_progress=lambda partial: self.__copy_if_wanted(key, partial))
+        if resolved is None:
+            return
+        translated_text, source = resolved
+
+        logger.info(f"Перведённый текст: {loggable(translated_text)}")
+        with metrics.timer("stage_seconds", stage="clipboard_write"):
+            written = self.__copy_if_latest(press_id, translated_text)
+        if not written:
+            # Результат запишет более новое нажатие с тем же текстом либо он уже устарел
+            if key not in self.__wanted_keys:
+                logger.info("Результат перевода устарел: после этого нажатия скопирован другой текст")
+                metrics.inc("superseded_total")
+            return
+        metrics.observe("press_seconds", time.perf_counter() - started, source=source)
+        logger.info(f"Перевод получен ({source}) за {(time.perf_counter() - started) * 1000:.1f} мс")
+
+    def __make_keys(self, text: str) -> List[Tuple[str, str, str]]:
+        """Ключи (текст, переводчик, язык) для всех языков, на которые переводит одно нажатие.
+
+        Язык текста определяется локально: языки, на которых текст уже написан, пропускаются,
+        а при заданной language_pair текст на одном языке пары переводится на другой.
+        """
+        user = self.__config.user
+        translator_code = user.selected_translator
+        targets = user.target_languages or [user.selected_language]
+        if user.skip_same_language or len(user.language_pair) == 2:
+            with metrics.timer("stage_seconds", stage="langid"):
+                detection = detect_language(text)
+            if is_confident(detection):
+                if len(user.language_pair) == 2 and not user.target_languages:
+                    first, second = user.language_pair
+                    if same_language(detection.language, first):
+                        targets = [second]
+                    elif same_language(detection.language, second):
+                        targets = [first]
+                if user.skip_same_language:
+                    targets = [target for target in targets if not same_language(detection.language, target)]
+        return [(text, translator_code, target_lang) for target_lang in dict.fromkeys(targets)]
+
+    def __translate_to_many(self, press_id: int, keys: List[Tuple[str, str, str]], started: float) -> None:
+        """Переводит текст на все языки одновременно и собирает результаты в буфер обмена по мере готовности."""
+        logger.info(f"Перевод на {len(keys)} языков: {', '.join(key[2] for key in keys)}")
+        futures = {self.__fanout_executor.submit(self.__resolve, key): key[2] for key in keys}
+        results: Dict[str, str] = {}
+        for future in as_completed(futures):
+            resolved = future.result()
+            if resolved is None:
+                continue
+            results[futures[future]] = resolved[0]
+            with metrics.timer("stage_seconds", stage="clipboard_write"):
+                written = self.__copy_if_latest(press_id, self.__combine([key[2] for key in keys], results))
+            if not written:
+                logger.info("Результат перевода устарел: после этого нажатия было более новое")
+                metrics.inc("superseded_total")
+                return
+
+        if results:
+            metrics.observe("press_seconds", time.perf_counter() - started, source="fanout")
+            logger.info(
+                f"Переведено на {len(results)} из {len(keys)} языков за {(time.perf_counter() - started) * 1000:.1f} мс"
+            )
+
+    def __combine(self, targets: List[str], results: Dict[str, str]) -> str:
+        languages = self.__config.languages
+        return self.__config.user.multi_target_separator.join(
+            self.__config.user.multi_target_layout.format(
+                code=code, name=languages.get(code).name if code in languages else code, text=results[code]
+            )
+            for code in targets if code in results
+        )
+
+    def __resolve(self, key: Tuple[str, str, str],
+                  on_progress: Optional[Callable[[str], None]] = None) -> Optional[Tuple[str, str]]:
+        """Находит перевод: кэш, готовый упреждающий перевод, память переводов или сервер.
+
+        Возвращает (перевод, источник) или None, если перевести не удалось.
+        """
+        text, translator_code, target_lang = key
+        if self.cache:
+            cached_text = self.cache.get(text, translator_code, target_lang)
+            if cached_text is not None:
+                metrics.inc("cache_hits_total")
+                logger.info(f"Перевод взят из кэша (попаданий: {self.cache.hits}, промахов: {self.cache.misses})")
+                return cached_text, "cache"
+            metrics.inc("cache_misses_total")
+
+        prefetched = self.__prefetched.get(key)
+        if prefetched is not None:
+            metrics.inc("prefetch_hits_total")
+            return prefetched, "prefetch"
+
+        hint = None
+        if self.memory:
+            with metrics.timer("stage_seconds", stage="memory_lookup"):
+                match = self.memory.search(text, translator_code, target_lang)
+            if match and self.__config.user.tm_mode == "serve":
+                from module.translation_memory import transfer_numbers
+
+                metrics.inc("memory_hits_total", mode="serve")
+                logger.info(f"Перевод взят из памяти переводов (сходство {match.similarity:.2f})")
+                return transfer_numbers(match, text), "memory"
+            if match:
+                metrics.inc("memory_hits_total", mode="hint")
+                # Похожий перевод передаётся серверу, чтобы сохранить терминологию и формулировки
+                hint = {"source": match.source, "translation": match.translation, "similarity": round(match.similarity, 3)}
+
+        winner = [translator_code]
+
+        def attempt(code: str, is_cancelled: Callable[[], bool]) -> str:
+            progress = None
+            if on_progress and code == translator_code:
+                progress = lambda partial: None if is_cancelled() else on_progress(partial)
+            return self.client.translate_text(
+                text, code, target_lang,
+                on_progress=progress,
+                hint=hint,
+                is_cancelled=is_cancelled
+            )
+
+        def translate() -> str:
+            is_cancelled = lambda: key not in self.__wanted_keys
+            if not self.__hedge_enabled(translator_code):
+                return attempt(translator_code, is_cancelled)
+            translated, winner[0] = self.__hedger.run(translator_code, attempt, is_cancelled)
+            return translated
+
         try:
-            self.ws = websocket.WebSocket()
-            self.ws.connect(self.__config.server.websocket_url)
-            self.__ws_connected = True
-            logger.info("Успешное подключение к WebSocket.")
+            translated_text, shared = self.__flights.run(key, translate)
+        except TranslationError as e:
+            if e.kind == "cancelled":
+                logger.info(f"{e}.")
+                metrics.inc("superseded_total")
+                return None
+            if e.kind in OUTBOX_ERROR_KINDS and self.outbox is not None and self.outbox.add(*key):
+                logger.warning(f"{e}. Запрос сохранён и будет отправлен после восстановления соединения.")
+                metrics.inc("outbox_queued_total")
+                return None
+            logger.error(f"{e}. Операция отменена.")
+            metrics.inc("failures_total", type=e.kind)
+            return None
+        except Exception as e:
+            logger.error(f"Ошибка при обработке комбинации клавиш: {e}")
+            metrics.inc("failures_total", type=type(e).__name__)
+            return None
+
+        if shared:
+            metrics.inc("coalesced_total")
+            return translated_text, "coalesced"
+        if winner[0] != translator_code:
+            # Перевод запасного переводчика кэшируется под его кодом, а не под выбранным
+            self.__remember((text, winner[0], target_lang), translated_text)
+            return translated_text, "hedge"
+        self.__remember(key, translated_text)
+        return translated_text, "server"
+
+    def __hedge_enabled(self, translator_code: str) -> bool:
+        fallback = self.__config.user.hedge_translator
+        if not self.__hedger.enabled_for(translator_code):
+            return False
+        if not self.client.pipelined:
+            return False  # Без эха request_id запросы в сессии идут по одному, дублировать некуда
+        if fallback not in self.__config.translators:
+            logger.warning(f"Запасной переводчик {fallback} отсутствует в каталоге сервера, запрос не дублируется")
+            return False
+        return True
+
+    def __remember(self, key: Tuple[str, str, str], translated_text: str) -> None:
+        if self.cache:
+            self.cache.put(*key, translated_text)
+        if self.memory:
+            self.memory.add(*key, translated_text)
+
+    def __copy(self, text: str) -> None:
+        import pyperclip
+
+        self.__own_copies.append(text)
+        pyperclip.copy(text)
+
+    def __copy_if_latest(self, press_id: int, text: str) -> bool:
+        with self.__press_lock:
+            if press_id != self.__latest_press:
+                return False
+            self.__copy(text)
             return True
+
+    def __copy_if_wanted(self, key: Tuple[str, str, str], text: str) -> None:
+        """Промежуточный результат пишется, пока последнее нажатие ждёт перевод того же текста."""
+        with self.__press_lock:
+            if self.__wanted_keys == {key}:
+                self.__copy(text)
+
+    def __on_clipboard_change(self, text: str) -> None:
+        if text in self.__own_copies:
+            return
+        keys = self.__make_keys(text)
+        self.__prefetch_keys = frozenset(keys)
+        self.__prefetched = {}
+        for key in keys:
+            if not (self.cache and self.cache.peek(*key) is not None):
+                self.__executor.submit(self.__prefetch, key)
+
+    def __prefetch(self, key: Tuple[str, str, str]) -> None:
+        """Переводит скопированный текст заранее; отменяется, если буфер обмена снова изменился."""
+        text, translator_code, target_lang = key
+        if key not in self.__prefetch_keys and key not in self.__wanted_keys:
+            metrics.inc("prefetch_cancelled_total")
+            return
+        metrics.inc("prefetch_total")
+        logger.debug(f"Упреждающий перевод текста длиной {len(text)} символов")
+
+        def translate() -> str:
+            return self.client.translate_text(
+                text, translator_code, target_lang,
+                is_cancelled=lambda: key not in self.__prefetch_keys and key not in self.__wanted_keys
+            )
+
+        try:
+            translated_text, shared = self.__flights.run(key, translate)
+        except TranslationError as e:
+            metrics.inc("prefetch_cancelled_total" if e.kind == "cancelled" else "prefetch_failed_total")
+            logger.debug(f"Упреждающий перевод не выполнен: {e}")
+            return
         except Exception as e:
-            logger.error(f"Ошибка подключения к WebSocket: {e}")
-            self.__ws_connected = False
-            if self.ws:
-                self.ws.close()
+            metrics.inc("prefetch_failed_total")
+            logger.error(f"Ошибка упреждающего перевода: {e}")
+            return
+
+        if shared:
+            return  # Результат уже обработан нажатием, которое отправило этот запрос
+        if key in self.__prefetch_keys:
+            self.__prefetched[key] = translated_text
+        self.__remember(key, translated_text)
+
+    def __on_connected(self, session_id: str) -> None:
+        if self.outbox is not None:
+            self.__outbox_executor.submit(self.__replay_outbox)
+
+    def __replay_outbox(self) -> None:
+        """Отправляет запросы из очереди по порядку, не больше outbox_replay_window одновременно."""
+        if not self.__replay_lock.acquire(blocking=False):
+            return  # Очередь уже отправляется после предыдущего подключения
+        try:
+            entries = self.outbox.pending()
+            if not entries:
+                return
+            logger.info(f"Отправка запросов из очереди после восстановления соединения: {len(entries)}")
+            futures = [self.__replay_executor.submit(self.__replay_entry, entry) for entry in entries]
+            replayed = sum(1 for future in futures if future.result())
+            logger.info(f"Из очереди переведено запросов: {replayed} из {len(entries)}")
+        finally:
+            self.__replay_lock.release()
+
+    def __replay_entry(self, entry: "OutboxEntry") -> bool:
+        import pyperclip
+
+        key = (entry.text, entry.translator_code, entry.target_lang)
+        try:
+            translated_text, _ = self.__flights.run(
+                key, lambda: self.client.translate_text(entry.text, entry.translator_code, entry.target_lang)
+            )
+        except TranslationError as e:
+            if e.kind in OUTBOX_ERROR_KINDS:
+                logger.warning(f"{e}. Запрос остаётся в очереди до следующего подключения.")
+                return False
+            logger.error(f"{e}. Запрос удалён из очереди.")
+            metrics.inc("failures_total", type=e.kind)
+            self.outbox.remove(entry.id)
             return False
+        except Exception as e:
+            logger.error(f"Ошибка при переводе запроса из очереди: {e}")
+            metrics.inc("failures_total", type=type(e).__name__)
+            self.outbox.remove(entry.id)
+            return False
+
+        self.outbox.remove(entry.id)
+        self.__remember(key, translated_text)
+        metrics.inc("outbox_replayed_total")
+        metrics.observe("outbox_delay_seconds", max(time.time() - entry.created, 0))
+        # Перевод попадает в буфер обмена, только если пользователь с тех пор ничего не копировал
+        with self.__press_lock:
+            try:
+                copied = pyperclip.paste() == entry.text
+                if copied:
+                    self.__copy(translated_text)
+            except Exception as e:
+                logger.error(f"Ошибка при работе с буфером обмена: {e}")
+                metrics.inc("failures_total", type="clipboard")
+                copied = False
+        for listener in list(self.__outbox_listeners):
+            try:
+                listener(entry, translated_text, copied)
+            except Exception as e:
+                logger.error(f"Ошибка обработчика очереди запросов: {e}")
+        return True
+
+    def add_outbox_listener(self, listener: Callable[["OutboxEntry", str, bool], None]) -> None:
+        """Подписывает listener(запись, перевод, скопирован ли в буфер) на перевод запроса из очереди."""
+        self.__outbox_listeners.append(listener)
+
+    def __update_watcher(self) -> None:
+        if self.__config.user.prefetch_enabled and self.__watcher is None:
+            self.__watcher = ClipboardWatcher(self.__config.user, self.__on_clipboard_change)
+            self.__watcher.start()
+            logger.info("Упреждающий перевод буфера обмена включён")
+        elif not self.__config.user.prefetch_enabled and self.__watcher is not None:
+            self.__watcher.stop()
+            self.__watcher = None
+            self.__prefetched = {}
+            logger.info("Упреждающий перевод буфера обмена выключен")
+
+    def __register_hotkey(self):
+        import keyboard
+
+        self.__hotkey = keyboard.add_hotkey(self.__key_combination, lambda: self.__executor.submit(self.__on_hotkey_press))
+
+    def __on_user_config_change(self, changed):
+        if "prefetch_enabled" in changed and self.__hotkey is not None:
+            self.__update_watcher()
+        if "translate_keyboard" not in changed or self.__hotkey is None:
+            return
+
+        import keyboard
+
+        keyboard.remove_hotkey(self.__hotkey)
+        self.__key_combination = self.__config.user.translate_keyboard
+        self.__register_hotkey()
+        logger.info(f"Комбинация клавиш изменена на {self.__key_combination}")
+
+    def __on_server_config_change(self, changed):
+        if changed & {"server_host", "server_port", "endpoints"}:
+            self.client.ws.reconnect()
 
     def run(self):
         """Метод, который запускается при старте потока"""
         logger.info("Started KeyListener...")
-        session_id = None
-
-        def on_hotkey_press():
-            """Обработчик нажатия комбинации клавиш"""
-            nonlocal session_id # Для доступа к session_id из внешней области видимости
-            logger.info(f"Обнаружено нажатие комбинации {self.__key_combination}")
-            if not self.__ws_connected or not self.ws or not self.ws.connected:
-                logger.warning("WebSocket не подключен. Попытка переподключения...")
-                if not self.__connect_websocket():
-                    logger.error("Не удалось переподключиться к WebSocket. Операция отменена.")
-                    return
-                try:
-                    # Повторное получение session_id после переподключения
-                    session_id_data = json.loads(self.ws.recv())
-                    session_id = session_id_data.get("room_id").replace("room_", "")
-                    if not session_id:
-                        logger.error("Не удалось получить session_id после переподключения.")
-                        self.ws.close()
-                        self.__ws_connected = False
-                        return
-                    logger.info(f"Получен новый session_id: {session_id}")
-                except Exception as e:
-                    logger.error(f"Ошибка при получении session_id после переподключения: {e}")
-                    if self.ws:
-                        self.ws.close()
-                    self.__ws_connected = False
-                    return
-            
-            try:
-                clipboard_text = pyperclip.paste()
-                trimmed_text = clipboard_text[:900] if clipboard_text else ""
-
-                session = requests.Session()
-                response = session.post(
-                    url=self.__config.server.api_url + "translate",
-                    json={
-                        "method": "translate",
-                        "ws_session_id": session_id,
-                        "payload": {
-                            "text": trimmed_text,
-                            "translator_code": self.__config.user.selected_translator,
-                            "target_lang": self.__config.user.selected_language,
-                        }
-                    }
-                )
-
-                if response.status_code != 200:
-                    logger.error(f"Ошибка при отправке запроса: {response.status_code} - {response.text}")
-                    return
-
-                if response.json().get("status") == "success":
-                    # Убедимся, что WebSocket все еще подключен перед получением данных
-                    if not self.ws or not self.ws.connected:
-                        logger.error("WebSocket был отключен перед получением результата перевода.")
-                        self.__ws_connected = False
-                        return
-
-                    translated_text_data = json.loads(self.ws.recv())
-                    translated_text = translated_text_data.get("result", {}).get("result", {}).get("text")
-                    if translated_text is not None:
-                        logger.info(f"Перведённый текст: {translated_text}")
-                        pyperclip.copy(translated_text)
-                    else:
-                        logger.error(f"Не удалось извлечь переведенный текст из ответа: {translated_text_data}")
-                else:
-                    logger.error(f"Ошибка от API: {response.json()}")
-
-            except websocket.WebSocketConnectionClosedException as e:
-                logger.error(f"Соединение WebSocket было закрыто во время обработки горячей клавиши: {e}")
-                self.__ws_connected = False
-                if self.ws:
-                    self.ws.close()
-            except Exception as e:
-                logger.error(f"Ошибка при обработке комбинации клавиш: {e}")
-                if self.ws and self.ws.connected: # Закрываем только если еще подключен
-                    self.ws.close()
-                self.__ws_connected = False
-
-
-        keyboard.add_hotkey(self.__key_combination, on_hotkey_press)
-
-        while self.__running:
-            if not self.__ws_connected:
-                logger.info(f"Попытка подключения к WebSocket (задержка {self.__reconnect_delay} сек)...")
-                if self.__connect_websocket():
-                    try:
-                        session_id_data = json.loads(self.ws.recv()) # Получаем session_id при первом подключении
-                        session_id = session_id_data.get("room_id").replace("room_", "")
-                        if not session_id:
-                            logger.error("Не удалось получить session_id.")
-                            self.ws.close()
-                            self.__ws_connected = False
-                        else:
-                             logger.info(f"Получен session_id: {session_id}")
-                    except Exception as e:
-                        logger.error(f"Ошибка при получении session_id: {e}")
-                        if self.ws:
-                            self.ws.close()
-                        self.__ws_connected = False
-                
-                if not self.__ws_connected and self.__running: # Если не удалось подключиться и поток все еще работает
-                    time.sleep(self.__reconnect_delay)
-            else:
-                # Проверяем состояние соединения
-                try:
-                    if self.ws and self.ws.connected:
-                        # Можно отправить пинг или просто проверить статус
-                        # self.ws.ping() # Если сервер поддерживает пинги
-                        pass
-                    else:
-                        # Соединение было потеряно
-                        logger.warning("Соединение WebSocket потеряно.")
-                        self.__ws_connected = False
-                        if self.ws:
-                            self.ws.close()
-                except Exception as e:
-                    logger.error(f"Ошибка при проверке соединения WebSocket: {e}")
-                    self.__ws_connected = False
-                    if self.ws:
-                        self.ws.close()
-
-                time.sleep(0.1)  # Небольшая пауза, чтобы не загружать CPU
+        # Тяжёлые зависимости (keyboard, sqlite3) загружаются в потоке KeyListener и не задерживают появление иконки
+        from module.cache import TranslationCache
+        from module.outbox import Outbox
+        from module.translation_memory import TranslationMemory
+
+        self.client.start()
+        if self.__config.user.cache_enabled:
+            self.cache = TranslationCache(
+                max_entries=self.__config.user.cache_max_entries,
+                ttl=self.__config.user.cache_ttl,
+                disk_max_entries=self.__config.user.cache_disk_max_entries
+            )
+        if self.__config.user.tm_mode != "off":
+            self.memory = TranslationMemory(self.__config.user.tm_threshold, self.__config.user.tm_max_entries)
+            self.memory.load()
+        if self.__config.user.outbox_enabled:
+            self.outbox = Outbox(self.__config.user.outbox_max_age, self.__config.user.outbox_max_entries)
+            if len(self.outbox) and self.client.ws.connected:
+                self.__outbox_executor.submit(self.__replay_outbox)  # Очередь с прошлого запуска
+        self.__register_hotkey()
+        self.__update_watcher()
+
+        self.__stopped.wait()
 
         logger.info("KeyListener остановлен.")
-        if self.ws:
-            self.ws.close()
+        if self.cache:
+            logger.info(f"Статистика кэша переводов: {self.cache.stats()}")
+            self.cache.close()
+        if self.memory:
+            self.memory.close()
+        if self.outbox is not None:
+            self.outbox.close()
 
     def stop(self):
         """Метод для остановки потока"""
+        import keyboard
+
         logger.info("Остановка отслеживания комбинации клавиш")
-        self.__running = False
         keyboard.unhook_all()
-        if self.ws:
-            logger.info("Закрытие WebSocket соединения...")
-            self.ws.close()
-            logger.info("WebSocket соединение закрыто.")
+        if self.__watcher:
+            self.__watcher.stop()
+        self.client.stop()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+        self.__fanout_executor.shutdown(wait=False, cancel_futures=True)
+        self.__hedger.shutdown()
+        self.__replay_executor.shutdown(wait=False, cancel_futures=True)
+        self.__outbox_executor.shutdown(wait=False, cancel_futures=True)
+        self.__stopped.set()
@@ -4,6 +4,8 @@ import logging.config
 from logging import getLogger
 from config_manager import ConfigurationManager
 from tray_app import TrayApp
+from module.log_pipeline import configure_payload, start_queue_logging
+from module.metrics import MetricsExporter
 from module.utils import get_config_dir
 
 
@@ -11,6 +13,8 @@ CONFIG_DIR = get_config_dir()
 LOG_DIR = "logs"
 LOG_FILE = "data.log"
 LOG_CONFIG_FILE = "logging_config.json"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 7
 
 DEFAULT_LOGGING_CONFIG = {
     "version": 1,
@@ -28,11 +32,14 @@ DEFAULT_LOGGING_CONFIG = {
             "stream": "ext://sys.stderr"
         },
         "file": {
-            "class": "logging.FileHandler",
+            "class": "module.log_pipeline.SizedTimedRotatingFileHandler",
             "level": "DEBUG",
             "filename": os.path.join("logs", "data.log"),
             "formatter": "simple",
-            "mode": "w"
+            "when": "midnight",
+            "maxBytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
+            "encoding": "utf-8"
         }
     },
     "root": {
@@ -45,6 +52,20 @@ DEFAULT_LOGGING_CONFIG = {
 }
 
 
+def migrate_logging_config(logging_config: dict) -> bool:
+    """Заменяет файловый обработчик старой конфигурации по умолчанию (FileHandler, mode "w") на ротируемый."""
+    file_handler = logging_config.get("handlers", {}).get("file")
+    if not file_handler or file_handler.get("class") != "logging.FileHandler":
+        return False
+    logging_config["handlers"]["file"] = {
+        **DEFAULT_LOGGING_CONFIG["handlers"]["file"],
+        "level": file_handler.get("level", "DEBUG"),
+        "filename": file_handler.get("filename", os.path.join(LOG_DIR, LOG_FILE)),
+        "formatter": file_handler.get("formatter", "simple"),
+    }
+    return True
+
+
 def main() -> None:
     log_file_path = os.path.join(LOG_DIR, LOG_FILE)
     logging_config_path = os.path.join(CONFIG_DIR, LOG_CONFIG_FILE)
@@ -59,9 +80,15 @@ def main() -> None:
     if os.path.isfile(logging_config_path):
         with open(logging_config_path, "r", encoding="utf-8") as f:
             logging_config = load(f)
+        migrated = migrate_logging_config(logging_config)
+        if migrated:
+            with open(logging_config_path, "w", encoding="utf-8") as f:
+                dump(logging_config, f, indent=4, ensure_ascii=False)
         logging.config.dictConfig(logging_config)
         logger = getLogger()
         logger.info(f"Config loaded from {logging_config_path}")
+        if migrated:
+            logger.info("Log file handler migrated to rotating handler")
     else:
         with open(logging_config_path, "w", encoding="utf-8") as f:
             dump(DEFAULT_LOGGING_CONFIG, f, indent=4, ensure_ascii=False)
@@ -69,8 +96,20 @@ def main() -> None:
         logger = getLogger()
         logger.info(f"Created default config at {logging_config_path}")
 
+    # Запись в файл и консоль выполняется в фоновом потоке, горячая клавиша не ждёт диск
+    log_listener = start_queue_logging()
+
     config = ConfigurationManager()
-    TrayApp(config)
+    configure_payload(config.user.log_payload, config.user.log_payload_max_chars)
+    config.user.add_listener(lambda changed: configure_payload(config.user.log_payload, config.user.log_payload_max_chars))
+
+    metrics_exporter = MetricsExporter(LOG_DIR, config.user.metrics_interval, config.user.metrics_port)
+    metrics_exporter.start()
+
+    TrayApp(config)  # Возвращает управление после выхода из трея
+
+    metrics_exporter.stop()
+    log_listener.stop()
 
 
 if __name__ == "__main__":
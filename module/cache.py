@@ -0,0 +1,193 @@
+import os
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+from hashlib import sha256
+from logging import getLogger
+from threading import Lock
+from typing import Dict, Optional, Tuple
+from module.utils import get_config_dir
+
+
+CACHE_FILE = "translation_cache.sqlite3"
+
+logger = getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Приводит текст к единому виду для ключа кэша."""
+    text = unicodedata.normalize("NFC", text)
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+def make_cache_key(text: str, translator_code: str, target_lang: str) -> str:
+    raw = f"{translator_code}\x00{target_lang}\x00{normalize_text(text)}"
+    return sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """Двухуровневый кэш переводов: LRU в памяти + SQLite в каталоге конфигурации."""
+
+    def __init__(self, max_entries: int, ttl: float, disk_max_entries: int, path: Optional[str] = None):
+        self.__max_entries = max_entries
+        self.__ttl = ttl
+        self.__disk_max_entries = disk_max_entries
+        self.__path = path or os.path.join(get_config_dir(), CACHE_FILE)
+        self.__memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.__lock = Lock()
+        self.__db = None
+        self.__accessed: Dict[str, float] = {}  # Время обращений к записям диска, ещё не записанное в базу
+
+        self.__memory_hits = 0
+        self.__disk_hits = 0
+        self.__misses = 0
+
+        try:
+            self.__db = sqlite3.connect(self.__path, check_same_thread=False)
+            self.__db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, translation TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self.__db.execute("CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed)")
+            self.__db.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.__ttl,))
+            self.__db.commit()
+            logger.info(f"Translation cache opened at {self.__path}")
+        except sqlite3.Error as e:
+            logger.error(f"Не удалось открыть дисковый кэш переводов, используется только память: {e}")
+            self.__db = None
+
+    def get(self, text: str, translator_code: str, target_lang: str) -> Optional[str]:
+        key = make_cache_key(text, translator_code, target_lang)
+        now = time.time()
+
+        with self.__lock:
+            entry = self.__memory.get(key)
+            if entry is not None:
+                translation, created = entry
+                if now - created <= self.__ttl:
+                    self.__memory.move_to_end(key)
+                    self.__memory_hits += 1
+                    return translation
+                del self.__memory[key]
+
+            translation = self.__disk_get(key, now)
+            if translation is not None:
+                translation, created = translation
+                self.__memory_put(key, translation, created)
+                self.__disk_hits += 1
+                return translation
+
+            self.__misses += 1
+            return None
+
+    def peek(self, text: str, translator_code: str, target_lang: str) -> Optional[str]:
+        """Перевод из кэша без побочных эффектов: не учитывается в статистике и не меняет порядок вытеснения."""
+        key = make_cache_key(text, translator_code, target_lang)
+        now = time.time()
+
+        with self.__lock:
+            entry = self.__memory.get(key)
+            if entry is not None and now - entry[1] <= self.__ttl:
+                return entry[0]
+            if self.__db is None:
+                return None
+            try:
+                row = self.__db.execute(
+                    "SELECT translation FROM translations WHERE key = ? AND created >= ?", (key, now - self.__ttl)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка чтения дискового кэша переводов: {e}")
+                return None
+            return row[0] if row else None
+
+    def put(self, text: str, translator_code: str, target_lang: str, translation: str) -> None:
+        key = make_cache_key(text, translator_code, target_lang)
+        now = time.time()
+
+        with self.__lock:
+            self.__memory_put(key, translation, now)
+            self.__disk_put(key, translation, now)
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__db is not None:
+                self.__flush_accessed()
+                self.__db.commit()
+                self.__db.close()
+                self.__db = None
+
+    def __memory_put(self, key: str, translation: str, created: float) -> None:
+        self.__memory[key] = (translation, created)
+        self.__memory.move_to_end(key)
+        while len(self.__memory) > self.__max_entries:
+            self.__memory.popitem(last=False)
+
+    def __disk_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        if self.__db is None:
+            return None
+        try:
+            row = self.__db.execute(
+                "SELECT translation, created FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.__ttl:
+                self.__db.execute("DELETE FROM translations WHERE key = ?", (key,))
+                self.__db.commit()
+                return None
+            # Время обращения записывается вместе со следующей записью в кэш, а не отдельной транзакцией
+            self.__accessed[key] = now
+            return row[0], row[1]
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка чтения дискового кэша переводов: {e}")
+            return None
+
+    def __disk_put(self, key: str, translation: str, now: float) -> None:
+        if self.__db is None:
+            return
+        try:
+            self.__flush_accessed()
+            self.__db.execute(
+                "INSERT OR REPLACE INTO translations (key, translation, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, translation, now, now)
+            )
+            self.__db.execute(
+                "DELETE FROM translations WHERE key IN ("
+                "SELECT key FROM translations ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.__disk_max_entries,)
+            )
+            self.__db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка записи дискового кэша переводов: {e}")
+
+    def __flush_accessed(self) -> None:
+        if not self.__accessed:
+            return
+        try:
+            self.__db.executemany(
+                "UPDATE translations SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self.__accessed.items()]
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка записи дискового кэша переводов: {e}")
+        self.__accessed.clear()
+
+    @property
+    def hits(self) -> int:
+        return self.__memory_hits + self.__disk_hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def stats(self) -> Dict[str, float]:
+        with self.__lock:
+            total = self.hits + self.__misses
+            return {
+                "memory_hits": self.__memory_hits,
+                "disk_hits": self.__disk_hits,
+                "misses": self.__misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "memory_entries": len(self.__memory),
+            }
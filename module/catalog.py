@@ -0,0 +1,38 @@
+import os
+from json import load, dump
+from logging import getLogger
+from typing import Any, Dict, Optional
+
+
+logger = getLogger(__name__)
+
+
+class CatalogStore:
+    """Локальная копия каталога переводчиков и языков, полученного с сервера."""
+
+    def __init__(self, path: str):
+        self.__path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.isfile(self.__path):
+            return None
+        try:
+            with open(self.__path, "r", encoding="utf-8") as f:
+                catalog = load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Не удалось прочитать кэш каталога {self.__path}: {e}")
+            return None
+        if not catalog.get("translators") or not catalog.get("languages"):
+            return None
+        logger.info(f"Catalog loaded from {self.__path} (etag={catalog.get('etag')}, version={catalog.get('version')})")
+        return catalog
+
+    def save(self, catalog: Dict[str, Any]) -> None:
+        tmp_path = f"{self.__path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                dump(catalog, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.__path)
+            logger.info(f"Catalog saved to {self.__path}")
+        except OSError as e:
+            logger.error(f"Не удалось сохранить кэш каталога {self.__path}: {e}")
@@ -0,0 +1,60 @@
+import time
+from logging import getLogger
+from threading import Event, Thread
+from typing import Callable, Optional
+from module.configs import UserConfig
+
+
+logger = getLogger(__name__)
+
+
+class ClipboardWatcher(Thread):
+    """Опрашивает буфер обмена и сообщает о новом тексте.
+
+    Текст передаётся в on_change, только когда он не менялся хотя бы один интервал опроса
+    (быстрые повторные копирования не порождают событий) и с предыдущего события прошло не
+    меньше prefetch_min_interval секунд. Пустой текст и текст длиннее prefetch_max_chars
+    пропускаются. Параметры читаются из UserConfig на каждом шаге и меняются без перезапуска.
+    """
+
+    def __init__(self, user_config: UserConfig, on_change: Callable[[str], None]):
+        super().__init__(name="clipboard-watcher", daemon=True)
+        self.__user = user_config
+        self.__on_change = on_change
+        self.__stopped = Event()
+
+    def run(self) -> None:
+        import pyperclip
+
+        last_seen = self.__paste(pyperclip)  # То, что было в буфере до запуска, не переводится
+        pending: Optional[str] = None
+        last_emitted = 0.0
+        while not self.__stopped.wait(self.__user.prefetch_poll_interval):
+            text = self.__paste(pyperclip)
+            if text is None:
+                continue
+            if text != last_seen:
+                last_seen, pending = text, text
+                continue
+            if pending is None or time.monotonic() - last_emitted < self.__user.prefetch_min_interval:
+                continue
+
+            text, pending = pending, None
+            if not text.strip() or len(text) > self.__user.prefetch_max_chars:
+                continue
+            last_emitted = time.monotonic()
+            try:
+                self.__on_change(text)
+            except Exception as e:
+                logger.error(f"Ошибка обработчика изменения буфера обмена: {e}")
+
+    @staticmethod
+    def __paste(pyperclip) -> Optional[str]:
+        try:
+            return pyperclip.paste()
+        except Exception as e:
+            logger.debug(f"Не удалось прочитать буфер обмена: {e}")
+            return None
+
+    def stop(self) -> None:
+        self.__stopped.set()
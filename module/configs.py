@@ -1,7 +1,8 @@
 import os
 from json import load, dump
 from logging import getLogger
-from typing import Dict, Any
+from threading import Event, RLock, Thread, Timer
+from typing import Any, Callable, Dict, List, Optional, Set
 from module.translators import Translator, Language
 from module.utils import get_config_dir
 
@@ -21,15 +22,64 @@ DEFAULT_APP_CONFIG = {
 DEFAULT_USER_CONFIG = {
     "selected_language": "ru",
     "selected_translator": "yandex",
-    "translate_keyboard": "alt+shift+t"  # TODO: ЗАМЕНА ГОРЯЧИХ КЛАВИШ ТОЛЬКО ЧЕРЕЗ CFG !
+    "translate_keyboard": "alt+shift+t",  # TODO: ЗАМЕНА ГОРЯЧИХ КЛАВИШ ТОЛЬКО ЧЕРЕЗ CFG !
+    "cache_enabled": True,
+    "cache_max_entries": 512,  # Записей в памяти
+    "cache_disk_max_entries": 20000,  # Записей на диске
+    "cache_ttl": 604800,  # Время жизни записи в секундах (7 дней)
+    "metrics_interval": 60,  # Период выгрузки метрик в logs/ в секундах
+    "metrics_port": 0,  # Порт http://127.0.0.1:<port>/metrics, 0 — не открывать
+    "tm_mode": "off",  # Память переводов: "off", "hint" — подсказка серверу, "serve" — отдавать найденный перевод
+    "tm_threshold": 0.85,  # Минимальное сходство (Жаккара по триграммам) для совпадения
+    "tm_max_entries": 20000,  # Сколько последних записей хранится в памяти переводов; индекс строится при каждом запуске
+    "prefetch_enabled": False,  # Переводить скопированный текст заранее, до нажатия комбинации
+    "prefetch_poll_interval": 0.3,  # Период опроса буфера обмена, секунды
+    "prefetch_min_interval": 1.0,  # Не чаще одного упреждающего перевода за столько секунд
+    "prefetch_max_chars": 2000,  # Более длинный текст заранее не переводится
+    "target_languages": [],  # Перевод одним нажатием сразу на несколько языков; пустой список — только selected_language
+    "multi_target_layout": "{name}:\n{text}",  # Вид перевода на один язык: {code}, {name}, {text}
+    "multi_target_separator": "\n\n",  # Разделитель между переводами на разные языки
+    "log_payload": "truncate",  # Тексты пользователя в логе: "full", "truncate" или "redact"
+    "log_payload_max_chars": 80,  # Сколько символов текста оставлять в логе в режиме "truncate"
+    "hedge_translator": "",  # Запасной переводчик для медленных ответов; пустая строка — без дублирования запросов
+    "hedge_deadline": 0,  # Через сколько секунд без ответа дублировать запрос; 0 — по p80 задержки запросов переводчика
+    "skip_same_language": True,  # Не отправлять текст, который уже написан на языке перевода
+    "language_pair": [],  # Например ["ru", "en"]: текст на одном языке пары переводится на другой
+    "incremental_translation": False,  # Отправлять только изменённые предложения; они переводятся без контекста текста
+    "segment_cache_max_entries": 4096,  # Сколько переводов предложений хранить в памяти
+    "outbox_enabled": False,  # Сохранять нажатия без связи с сервером на диск и переводить после переподключения
+    "outbox_max_age": 3600,  # Через сколько секунд несделанный перевод из очереди отбрасывается
+    "outbox_max_entries": 100,  # Больше запросов в очереди не хранится, вытесняются самые старые
+    "outbox_replay_window": 2  # Сколько запросов из очереди отправляется одновременно
 }
 
 DEFAULT_SERVER_CONFIG = {
     "server_host": "0.0.0.0",
-    "server_port": "8080"
+    "server_port": "8080",
+    "connect_timeout": 2,  # Таймаут установки соединения в секундах
+    "read_timeout": 10,  # Таймаут ожидания ответа в секундах
+    "retry_total": 2,  # Количество повторов при сетевых ошибках
+    "retry_backoff": 0.3,  # Базовая задержка между повторами (растёт экспоненциально)
+    "pool_maxsize": 4,  # Максимум keep-alive соединений в пуле
+    "ws_ping_interval": 20,  # Интервал heartbeat-пингов WebSocket в секундах
+    "ws_reconnect_min_delay": 0.5,  # Начальная задержка переподключения в секундах
+    "ws_reconnect_max_delay": 30,  # Максимальная задержка переподключения в секундах
+    "ws_ready_timeout": 3,  # Сколько нажатие ждёт восстановления сессии в секундах
+    "chunk_max_chars": 900,  # Лимит сервера на длину одного запроса перевода
+    "chunk_window": 4,  # Сколько кусков длинного текста переводится одновременно
+    "batch_window": 8,  # Сколько строк или абзацев пакетный режим переводит одновременно
+    "wire_format": "auto",  # "auto" — MessagePack и сжатие, если их предлагает сервер; "json" — только JSON
+    "transport": "auto",  # "auto" — запрос перевода кадром в WebSocket, если это предлагает сервер; "http" — всегда POST
+    "catalog_refresh_interval": 3600,  # Период проверки каталога переводчиков и языков, секунды; 0 — только при запуске
+    "endpoints": [],  # Серверы "host:port" для выбора и переключения; пустой список — только server_host:server_port
+    "endpoint_probe_interval": 15,  # Период проверки доступности серверов, секунды
+    "endpoint_ewma_alpha": 0.3  # Вес последнего замера в сглаженных задержке и доле ошибок
 }
 
 
+CONFIG_SAVE_DELAY = 0.5  # Изменения, сделанные за это время, записываются на диск одной записью
+CONFIG_WATCH_INTERVAL = 1.0  # Период проверки mtime файлов конфигурации
+
 logger = getLogger(__name__)
 
 
@@ -38,28 +88,124 @@ class BaseConfig:
         self.__config_path = config_path
         self.__default_config = default_config
         self.__config = None
+        self.__mtime = None  # mtime файла после последнего чтения или записи этим процессом
+        self.__dirty = False
+        self.__save_timer: Optional[Timer] = None
+        self.__lock = RLock()
+        self.__listeners: List[Callable[[Set[str]], None]] = []
 
     def load(self) -> None:
-        if os.path.isfile(self.__config_path):
-            with open(self.__config_path, "r", encoding="utf-8") as f:
-                self.__config = load(f)
-            logger.info(f"Config loaded from {self.__config_path}")
-        else:
-            self.__config = self.__default_config
-            with open(self.__config_path, "w", encoding="utf-8") as f:
-                dump(self.__default_config, f, indent=4, ensure_ascii=False)
-            logger.info(f"Created default config at {self.__config_path}")
+        with self.__lock:
+            if os.path.isfile(self.__config_path):
+                self.__config = {**self.__default_config, **self.__read()}  # Новые ключи получают значения по умолчанию
+                logger.info(f"Config loaded from {self.__config_path}")
+            else:
+                self.__config = dict(self.__default_config)
+                self.__write()
+                logger.info(f"Created default config at {self.__config_path}")
 
     def save(self) -> None:
-        with open(self.__config_path, "w", encoding="utf-8") as f:
-            dump(self.__config, f, indent=4, ensure_ascii=False)
+        """Планирует запись на диск; частые изменения объединяются в одну запись в фоне."""
+        with self.__lock:
+            self.__dirty = True
+            if self.__save_timer:
+                self.__save_timer.cancel()
+            self.__save_timer = Timer(CONFIG_SAVE_DELAY, self.flush)
+            self.__save_timer.daemon = True
+            self.__save_timer.start()
+
+    def flush(self) -> None:
+        """Немедленно записывает отложенные изменения."""
+        with self.__lock:
+            if self.__save_timer:
+                self.__save_timer.cancel()
+                self.__save_timer = None
+            if not self.__dirty:
+                return
+            try:
+                self.__write()
+            except OSError as e:
+                logger.error(f"Не удалось сохранить конфигурацию {self.__config_path}: {e}")
+                return
+            self.__dirty = False
         logger.info(f"Config saved to {self.__config_path}")
 
+    def reload_if_changed(self) -> None:
+        """Перечитывает файл, если его изменили извне, и уведомляет подписчиков об изменённых ключах."""
+        try:
+            mtime = os.stat(self.__config_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self.__mtime:
+            return
+
+        with self.__lock:
+            if self.__dirty:
+                logger.warning(f"Файл {self.__config_path} изменён извне, но будет перезаписан несохранёнными изменениями")
+                return
+            try:
+                new_config = {**self.__default_config, **self.__read()}
+            except (OSError, ValueError) as e:
+                logger.error(f"Не удалось перечитать конфигурацию {self.__config_path}: {e}")
+                self.__mtime = mtime  # Не повторяем попытку, пока файл не изменится снова
+                return
+            old_config = self.__config
+            self.__config = new_config
+
+        changed = {key for key in new_config.keys() | old_config.keys() if new_config.get(key) != old_config.get(key)}
+        if not changed:
+            return
+
+        logger.info(f"Config reloaded from {self.__config_path}, changed keys: {sorted(changed)}")
+        for listener in list(self.__listeners):
+            try:
+                listener(changed)
+            except Exception as e:
+                logger.error(f"Ошибка при применении изменений конфигурации: {e}")
+
+    def add_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        """Подписывает listener на перезагрузку файла; он получает множество изменённых ключей."""
+        self.__listeners.append(listener)
+
+    def __read(self) -> Dict[str, Any]:
+        mtime = os.stat(self.__config_path).st_mtime_ns
+        with open(self.__config_path, "r", encoding="utf-8") as f:
+            data = load(f)
+        self.__mtime = mtime
+        return data
+
+    def __write(self) -> None:
+        # Запись во временный файл и атомарная замена: сбой посреди записи не повреждает конфигурацию
+        tmp_path = f"{self.__config_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            dump(self.__config, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.__config_path)
+        self.__mtime = os.stat(self.__config_path).st_mtime_ns
+
     @property
     def config(self) -> Dict[str, Any]:
         return self.__config
 
 
+class ConfigWatcher(Thread):
+    """Следит за mtime файлов конфигурации и перезагружает изменённые без перезапуска приложения."""
+
+    def __init__(self, *configs: BaseConfig):
+        super().__init__(name="config-watcher", daemon=True)
+        self.__configs = configs
+        self.__stopped = Event()
+
+    def run(self) -> None:
+        while not self.__stopped.wait(CONFIG_WATCH_INTERVAL):
+            for config in self.__configs:
+                config.reload_if_changed()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+
+
 class AppConfig(BaseConfig):
     def __init__(self):
         super().__init__(os.path.join(get_config_dir(), "app_config.json"), DEFAULT_APP_CONFIG)
@@ -105,6 +251,78 @@ class ServerConfig(BaseConfig):
     def config_url(self) -> str:
         return f'{self.api_url}get_config'
 
+    @property
+    def connect_timeout(self) -> float:
+        return self.config["connect_timeout"]
+
+    @property
+    def read_timeout(self) -> float:
+        return self.config["read_timeout"]
+
+    @property
+    def retry_total(self) -> int:
+        return self.config["retry_total"]
+
+    @property
+    def retry_backoff(self) -> float:
+        return self.config["retry_backoff"]
+
+    @property
+    def pool_maxsize(self) -> int:
+        return self.config["pool_maxsize"]
+
+    @property
+    def ws_ping_interval(self) -> float:
+        return self.config["ws_ping_interval"]
+
+    @property
+    def ws_reconnect_min_delay(self) -> float:
+        return self.config["ws_reconnect_min_delay"]
+
+    @property
+    def ws_reconnect_max_delay(self) -> float:
+        return self.config["ws_reconnect_max_delay"]
+
+    @property
+    def ws_ready_timeout(self) -> float:
+        return self.config["ws_ready_timeout"]
+
+    @property
+    def chunk_max_chars(self) -> int:
+        return self.config["chunk_max_chars"]
+
+    @property
+    def chunk_window(self) -> int:
+        return self.config["chunk_window"]
+
+    @property
+    def batch_window(self) -> int:
+        return self.config["batch_window"]
+
+    @property
+    def wire_format(self) -> str:
+        return self.config["wire_format"]
+
+    @property
+    def transport(self) -> str:
+        return self.config["transport"]
+
+    @property
+    def catalog_refresh_interval(self) -> float:
+        return self.config["catalog_refresh_interval"]
+
+    @property
+    def endpoint_addresses(self) -> List[str]:
+        return self.config["endpoints"] or [self.server_address]
+
+    @property
+    def endpoint_probe_interval(self) -> float:
+        return self.config["endpoint_probe_interval"]
+
+    @property
+    def endpoint_ewma_alpha(self) -> float:
+        return self.config["endpoint_ewma_alpha"]
+
 
 class UserConfig(BaseConfig):
     def __init__(self):
@@ -122,6 +340,118 @@ class UserConfig(BaseConfig):
     def selected_language(self) -> str:
         return self.config["selected_language"]
 
+    @property
+    def cache_enabled(self) -> bool:
+        return self.config["cache_enabled"]
+
+    @property
+    def cache_max_entries(self) -> int:
+        return self.config["cache_max_entries"]
+
+    @property
+    def cache_disk_max_entries(self) -> int:
+        return self.config["cache_disk_max_entries"]
+
+    @property
+    def cache_ttl(self) -> float:
+        return self.config["cache_ttl"]
+
+    @property
+    def metrics_interval(self) -> float:
+        return self.config["metrics_interval"]
+
+    @property
+    def metrics_port(self) -> int:
+        return self.config["metrics_port"]
+
+    @property
+    def tm_mode(self) -> str:
+        return self.config["tm_mode"]
+
+    @property
+    def tm_threshold(self) -> float:
+        return self.config["tm_threshold"]
+
+    @property
+    def tm_max_entries(self) -> int:
+        return self.config["tm_max_entries"]
+
+    @property
+    def prefetch_enabled(self) -> bool:
+        return self.config["prefetch_enabled"]
+
+    @property
+    def prefetch_poll_interval(self) -> float:
+        return self.config["prefetch_poll_interval"]
+
+    @property
+    def prefetch_min_interval(self) -> float:
+        return self.config["prefetch_min_interval"]
+
+    @property
+    def prefetch_max_chars(self) -> int:
+        return self.config["prefetch_max_chars"]
+
+    @property
+    def target_languages(self) -> List[str]:
+        return self.config["target_languages"]
+
+    @property
+    def multi_target_layout(self) -> str:
+        return self.config["multi_target_layout"]
+
+    @property
+    def multi_target_separator(self) -> str:
+        return self.config["multi_target_separator"]
+
+    @property
+    def log_payload(self) -> str:
+        return self.config["log_payload"]
+
+    @property
+    def log_payload_max_chars(self) -> int:
+        return self.config["log_payload_max_chars"]
+
+    @property
+    def hedge_translator(self) -> str:
+        return self.config["hedge_translator"]
+
+    @property
+    def hedge_deadline(self) -> float:
+        return self.config["hedge_deadline"]
+
+    @property
+    def skip_same_language(self) -> bool:
+        return self.config["skip_same_language"]
+
+    @property
+    def language_pair(self) -> List[str]:
+        return self.config["language_pair"]
+
+    @property
+    def incremental_translation(self) -> bool:
+        return self.config["incremental_translation"]
+
+    @property
+    def segment_cache_max_entries(self) -> int:
+        return self.config["segment_cache_max_entries"]
+
+    @property
+    def outbox_enabled(self) -> bool:
+        return self.config["outbox_enabled"]
+
+    @property
+    def outbox_max_age(self) -> float:
+        return self.config["outbox_max_age"]
+
+    @property
+    def outbox_max_entries(self) -> int:
+        return self.config["outbox_max_entries"]
+
+    @property
+    def outbox_replay_window(self) -> int:
+        return self.config["outbox_replay_window"]
+
     def set_language(self, language: Language) -> None:
         self.config["selected_language"] = language.code
         self.save()
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from logging import getLogger
+from threading import Lock
+from typing import Any, Dict, Optional
+
+
+ABANDONED_MAX = 1024  # Сколько брошенных request_id помнится, чтобы их поздние результаты отбрасывались молча
+
+logger = getLogger(__name__)
+
+
+def extract_request_id(message: Dict[str, Any]) -> Optional[str]:
+    request_id = message.get("request_id")
+    if request_id is None and isinstance(message.get("result"), dict):
+        request_id = message["result"].get("request_id")
+    return request_id
+
+
+class ResponseDispatcher:
+    """Сопоставляет входящие кадры WebSocket с ожидающими запросами по request_id.
+
+    Если сервер не возвращает request_id, кадр можно отдать только единственному ожидающему
+    запросу: с переменной задержкой перевода сервер отвечает не в порядке запросов. Поэтому
+    без эха request_id клиент держит в сессии не больше одного запроса (TranslationClient.pipelined).
+    """
+
+    def __init__(self):
+        self.__pending: "OrderedDict[str, Future]" = OrderedDict()
+        # Запросы, которые перестали ждать до результата: проигравшая попытка дублирования, отменённый перевод
+        self.__abandoned: "OrderedDict[str, None]" = OrderedDict()
+        self.__lock = Lock()
+
+    def register(self, request_id: str) -> Future:
+        future = Future()
+        with self.__lock:
+            self.__pending[request_id] = future
+        return future
+
+    def discard(self, request_id: str) -> None:
+        with self.__lock:
+            future = self.__pending.pop(request_id, None)
+            if future is not None and not future.done():
+                self.__abandoned[request_id] = None
+                if len(self.__abandoned) > ABANDONED_MAX:
+                    self.__abandoned.popitem(last=False)
+
+    def dispatch(self, message: Dict[str, Any]) -> None:
+        request_id = extract_request_id(message)
+        abandoned = False
+
+        with self.__lock:
+            if request_id is not None:
+                future = self.__pending.pop(request_id, None)
+                abandoned = future is None and request_id in self.__abandoned
+                if abandoned:
+                    del self.__abandoned[request_id]
+            elif len(self.__pending) == 1:
+                request_id, future = self.__pending.popitem()
+            else:
+                future = None
+                if self.__pending:
+                    logger.error(
+                        f"Получен кадр без request_id при {len(self.__pending)} ожидающих запросах, "
+                        f"сопоставить его нельзя, кадр отброшен"
+                    )
+                    return
+
+        if future is None and abandoned:
+            logger.debug(f"Получен результат запроса, который больше не ждут (request_id={request_id}), кадр отброшен")
+            return
+        if future is None:
+            logger.warning(f"Получен кадр без ожидающего запроса (request_id={request_id}), кадр отброшен")
+            return
+        if not future.done():
+            future.set_result(message)
+
+    def fail_all(self, error: Exception) -> None:
+        with self.__lock:
+            pending = list(self.__pending.values())
+            self.__pending.clear()
+            self.__abandoned.clear()  # Результаты прежней сессии уже не придут
+
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    @property
+    def pending(self) -> int:
+        return len(self.__pending)
@@ -0,0 +1,175 @@
+import time
+from logging import getLogger
+from threading import Event, Lock, Thread
+from typing import Callable, List, Optional
+from module.configs import ServerConfig
+from module.http_client import HttpClient
+from module.metrics import metrics
+
+
+UNHEALTHY_AFTER_FAILURES = 3  # Подряд неудачных запросов, после которых сервер исключается из выбора
+UNHEALTHY_COOLDOWN = 30.0  # Через сколько секунд исключённый сервер снова пробуется, секунды
+SWITCH_RATIO = 0.7  # Переход на другой здоровый сервер, только если он заметно лучше текущего
+ERROR_PENALTY = 4.0  # Вес доли ошибок в оценке сервера
+UNKNOWN_LATENCY = 0.1  # Оценка задержки сервера, к которому ещё не было запросов, секунды
+
+logger = getLogger(__name__)
+
+
+class Endpoint:
+    """Один сервер из списка endpoints и сглаженная (EWMA) статистика обращений к нему."""
+
+    def __init__(self, address: str, order: int):
+        self.address = address
+        self.order = order
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.last_failure = 0.0
+        self.etag: Optional[str] = None  # Проверка запрашивает каталог с If-None-Match и получает короткий 304
+
+    @property
+    def websocket_url(self) -> str:
+        return f"ws://{self.address}/ws"
+
+    @property
+    def api_url(self) -> str:
+        return f"http://{self.address}/api/v1/"
+
+    @property
+    def translate_url(self) -> str:
+        return f"{self.api_url}translate"
+
+    @property
+    def config_url(self) -> str:
+        return f"{self.api_url}get_config"
+
+    @property
+    def healthy(self) -> bool:
+        return (
+            self.consecutive_failures < UNHEALTHY_AFTER_FAILURES
+            or time.monotonic() - self.last_failure >= UNHEALTHY_COOLDOWN
+        )
+
+    @property
+    def score(self) -> float:
+        """Чем меньше, тем лучше: задержка с поправкой на долю ошибок."""
+        latency = UNKNOWN_LATENCY if self.latency is None else self.latency
+        return latency * (1 + ERROR_PENALTY * self.error_rate)
+
+    def __repr__(self) -> str:
+        latency = "?" if self.latency is None else f"{self.latency * 1000:.0f} ms"
+        return f"Endpoint({self.address}, latency={latency}, errors={self.error_rate:.2f})"
+
+
+class EndpointPool:
+    """Выбор сервера по задержке и доле ошибок с фоновыми проверками доступности.
+
+    Статистика собирается из настоящих запросов (record) и проверок get_config, которые
+    выполняются каждые endpoint_probe_interval секунд, если серверов больше одного.
+    """
+
+    def __init__(self, server_config: ServerConfig, http: HttpClient):
+        self.__server = server_config
+        self.__http = http
+        self.__lock = Lock()
+        self.__endpoints: List[Endpoint] = []
+        self.__listeners: List[Callable[[Endpoint], None]] = []
+        self.__stopped = Event()
+        self.__thread: Optional[Thread] = None
+        self.reload()
+
+    def reload(self) -> None:
+        """Перечитывает список серверов из настроек, сохраняя статистику оставшихся."""
+        with self.__lock:
+            known = {endpoint.address: endpoint for endpoint in self.__endpoints}
+            self.__endpoints = [
+                known.get(address) or Endpoint(address, order)
+                for order, address in enumerate(self.__server.endpoint_addresses)
+            ]
+            for order, endpoint in enumerate(self.__endpoints):
+                endpoint.order = order
+        logger.info(f"Endpoints: {', '.join(endpoint.address for endpoint in self.__endpoints)}")
+
+    def start(self) -> None:
+        self.__thread = Thread(target=self.__probe_loop, name="endpoint-probe", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+
+    def ranked(self) -> List[Endpoint]:
+        """Серверы от лучшего к худшему: сначала здоровые по оценке, затем недоступные по давности отказа."""
+        with self.__lock:
+            endpoints = list(self.__endpoints)
+        healthy = sorted(
+            (endpoint for endpoint in endpoints if endpoint.healthy),
+            key=lambda endpoint: (endpoint.score, endpoint.order)
+        )
+        unhealthy = sorted(
+            (endpoint for endpoint in endpoints if not endpoint.healthy),
+            key=lambda endpoint: endpoint.last_failure
+        )
+        return healthy + unhealthy
+
+    def preferred(self, current: Optional[Endpoint] = None) -> Endpoint:
+        """Лучший сервер; текущий сохраняется, пока он здоров и другой не лучше заметно."""
+        best = self.ranked()[0]
+        if (current is not None and current is not best and current.healthy and current in self.endpoints
+                and best.score >= current.score * SWITCH_RATIO):
+            return current
+        return best
+
+    def record(self, endpoint: Endpoint, ok: bool, latency: Optional[float] = None) -> None:
+        """Учитывает результат обращения к серверу: успех с задержкой или ошибку."""
+        alpha = self.__server.endpoint_ewma_alpha
+        was_healthy = endpoint.healthy
+        with self.__lock:
+            endpoint.error_rate += alpha * ((0.0 if ok else 1.0) - endpoint.error_rate)
+            if ok:
+                endpoint.consecutive_failures = 0
+                if latency is not None:
+                    endpoint.latency = latency if endpoint.latency is None else endpoint.latency + alpha * (latency - endpoint.latency)
+            else:
+                endpoint.consecutive_failures += 1
+                endpoint.last_failure = time.monotonic()
+        if not ok:
+            metrics.inc("endpoint_errors_total", endpoint=endpoint.address)
+
+        if was_healthy and not endpoint.healthy:
+            logger.warning(f"Сервер {endpoint.address} недоступен: {endpoint.consecutive_failures} ошибок подряд")
+            for listener in list(self.__listeners):
+                listener(endpoint)
+
+    def add_unhealthy_listener(self, listener: Callable[[Endpoint], None]) -> None:
+        """Подписывает listener на переход сервера в недоступные."""
+        self.__listeners.append(listener)
+
+    def __probe_loop(self) -> None:
+        while not self.__stopped.wait(self.__server.endpoint_probe_interval):
+            with self.__lock:
+                endpoints = list(self.__endpoints)
+            if len(endpoints) < 2:
+                continue
+            for endpoint in endpoints:
+                self.__probe(endpoint)
+
+    def __probe(self, endpoint: Endpoint) -> None:
+        started = time.perf_counter()
+        try:
+            response = self.__http.get(
+                endpoint.config_url,
+                headers={"If-None-Match": endpoint.etag} if endpoint.etag else {},
+                timeout=(self.__server.connect_timeout, self.__server.connect_timeout)
+            )
+            ok = response.status_code in (200, 304)
+            endpoint.etag = response.headers.get("ETag", endpoint.etag)
+        except Exception as e:
+            logger.debug(f"Проверка сервера {endpoint.address} не удалась: {e}")
+            ok = False
+        self.record(endpoint, ok, time.perf_counter() - started if ok else None)
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        with self.__lock:
+            return list(self.__endpoints)
@@ -0,0 +1,281 @@
+import json
+import os
+import re
+import time
+from collections import deque
+from hashlib import sha256
+from logging import getLogger
+from threading import Lock
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from module.metrics import metrics
+from module.utils import get_config_dir
+
+
+GLOSSARY_FILE = "glossary.json"
+GLOSSARY_CACHE_FILE = "glossary.cache.json"
+GLOSSARY_CACHE_VERSION = 2
+GLOSSARY_CHECK_INTERVAL = 2.0  # Как часто проверять, не изменился ли файл глоссария, секунды
+DEFAULT_TARGET = "*"  # Ключ перевода термина для языков, не указанных явно
+
+PLACEHOLDER = "⟦{}⟧"
+PLACEHOLDER_RE = re.compile(r"⟦\s*(\d+)\s*⟧")  # Переводчики иногда добавляют пробелы внутри скобок
+
+logger = getLogger(__name__)
+
+
+class Automaton(NamedTuple):
+    """Автомат Ахо — Корасик по терминам глоссария."""
+    goto: List[Dict[str, int]]  # Переходы из узла по символу
+    fail: List[int]  # Узел самого длинного собственного суффикса, который есть в боре
+    output: List[int]  # Ближайший по суффиксным ссылкам узел, где кончается термин (0 — нет)
+    term_at: List[int]  # Номер термина, который кончается в узле, или -1
+
+
+class Masked(NamedTuple):
+    text: str  # Текст с заполнителями вместо терминов
+    replacements: List[str]  # Что подставить на место заполнителя с номером i
+
+
+def build_automaton(terms: List[str]) -> Automaton:
+    goto: List[Dict[str, int]] = [{}]
+    term_at = [-1]
+    for index, term in enumerate(terms):
+        node = 0
+        for char in term:
+            child = goto[node].get(char)
+            if child is None:
+                child = len(goto)
+                goto[node][char] = child
+                goto.append({})
+                term_at.append(-1)
+            node = child
+        term_at[node] = index
+
+    fail = [0] * len(goto)
+    output = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        node = queue.popleft()
+        for char, child in goto[node].items():
+            queue.append(child)
+            state = fail[node]
+            while state and char not in goto[state]:
+                state = fail[state]
+            target = goto[state].get(char, 0)
+            fail[child] = target if target != child else 0
+            output[child] = fail[child] if term_at[fail[child]] >= 0 else output[fail[child]]
+    return Automaton(goto, fail, output, term_at)
+
+
+def is_valid_automaton(automaton: Automaton, terms_count: int) -> bool:
+    """Проверяет автомат из кэша: переходы образуют бор, а суффиксные ссылки ведут в менее глубокие узлы,
+    поэтому поиск по испорченному кэшу не зациклится и не выйдет за границы списков."""
+    goto, fail, output, term_at = automaton
+    size = len(goto)
+    if not size or not len(fail) == len(output) == len(term_at) == size:
+        return False
+    if (fail[0], output[0], term_at[0]) != (0, 0, -1):
+        return False
+    if not all(type(node) is dict for node in goto) or not all(len(char) == 1 for node in goto for char in node):
+        return False
+    children = [child for node in goto for child in node.values()]
+    for values, low, high in ((children, 1, size), (fail, 0, size), (output, 0, size), (term_at, -1, terms_count)):
+        if values and (set(map(type, values)) != {int} or min(values) < low or max(values) >= high):
+            return False
+    # У каждого узла, кроме корня, ровно один родитель с меньшим номером (build_automaton создаёт
+    # потомка после родителя): переходы образуют бор, и глубины считаются одним проходом по номерам
+    if len(set(children)) != size - 1 or len(children) != size - 1:
+        return False
+    depth = [0] * size
+    for node, edges in enumerate(goto):
+        for child in edges.values():
+            if child <= node:
+                return False
+            depth[child] = depth[node] + 1
+    return (
+        all(depth[link] < node_depth for link, node_depth in zip(fail[1:], depth[1:]))
+        and all(out == 0 or depth[out] < node_depth for out, node_depth in zip(output, depth))
+    )
+
+
+def find_terms(automaton: Automaton, terms: List[str], text: str) -> List[Tuple[int, int, int]]:
+    """Вхождения терминов целыми словами: (начало, конец, номер термина), самые левые и самые длинные, без пересечений."""
+    goto, fail, output, term_at = automaton
+    longest: Dict[int, Tuple[int, int]] = {}
+    node = 0
+    for position, char in enumerate(text):
+        while node and char not in goto[node]:
+            node = fail[node]
+        node = goto[node].get(char, 0)
+        match = node if term_at[node] >= 0 else output[node]
+        while match:
+            index = term_at[match]
+            end = position + 1
+            start = end - len(terms[index])
+            if is_whole_word(text, start, end) and end > longest.get(start, (0, -1))[0]:
+                longest[start] = (end, index)
+            match = output[match]
+
+    found, last_end = [], 0
+    for start in sorted(longest):
+        end, index = longest[start]
+        if start >= last_end:
+            found.append((start, end, index))
+            last_end = end
+    return found
+
+
+def is_whole_word(text: str, start: int, end: int) -> bool:
+    """Термин не должен быть частью более длинного слова: "API" не ищется внутри "RAPID"."""
+    if start > 0 and text[start].isalnum() and text[start - 1].isalnum():
+        return False
+    if end < len(text) and text[end - 1].isalnum() and text[end].isalnum():
+        return False
+    return True
+
+
+def restore(text: str, replacements: List[str], partial: bool = False) -> str:
+    """Подставляет термины на место заполнителей в переводе; partial — начало перевода, где есть не все заполнители."""
+    if not replacements:
+        return text
+    restored = set()
+
+    def substitute(match: "re.Match") -> str:
+        number = int(match.group(1))
+        if number >= len(replacements):
+            return match.group(0)
+        restored.add(number)
+        return replacements[number]
+
+    text = PLACEHOLDER_RE.sub(substitute, text)
+    if not partial and len(restored) < len(replacements):
+        metrics.inc("glossary_lost_total", len(replacements) - len(restored))
+        logger.warning(f"Переводчик потерял {len(replacements) - len(restored)} из {len(replacements)} терминов глоссария")
+    return text
+
+
+class Glossary:
+    """Термины, которые не переводятся или переводятся всегда одинаково.
+
+    Файл glossary.json в каталоге конфигурации: {"термин": null | "перевод" | {"en": "перевод", "*": "перевод"}}.
+    null — термин остаётся как есть; строка — один перевод для всех языков; словарь — по языкам,
+    "*" — для остальных языков. Термины ищутся с учётом регистра целыми словами за один проход
+    автоматом Ахо — Корасик и заменяются заполнителями до отправки на сервер. Собранный автомат
+    сохраняется в glossary.cache.json вместе с хешем файла и собирается заново, только если изменилось
+    содержимое файла или кэш не прошёл проверку.
+    """
+
+    def __init__(self, path: Optional[str] = None, cache_path: Optional[str] = None):
+        self.__path = path or os.path.join(get_config_dir(), GLOSSARY_FILE)
+        self.__cache_path = cache_path or os.path.join(get_config_dir(), GLOSSARY_CACHE_FILE)
+        self.__lock = Lock()
+        self.__stat: Optional[Tuple[int, int]] = None
+        self.__checked = 0.0
+        self.__terms: List[str] = []
+        self.__targets: List[Any] = []
+        self.__automaton: Optional[Automaton] = None
+
+    def load(self) -> None:
+        """Загружает глоссарий, если файл появился или изменился с прошлой загрузки."""
+        self.__checked = time.monotonic()
+        try:
+            stat = os.stat(self.__path)
+        except FileNotFoundError:
+            if self.__automaton is not None:
+                logger.info(f"Файл глоссария {self.__path} удалён, глоссарий выключен")
+            with self.__lock:
+                self.__stat, self.__terms, self.__targets, self.__automaton = None, [], [], None
+            return
+        if (stat.st_mtime_ns, stat.st_size) == self.__stat:
+            return
+
+        try:
+            with open(self.__path, "rb") as f:
+                data = f.read()
+            digest = sha256(data).hexdigest()
+            compiled = self.__read_cache(digest)
+            if compiled is None:
+                started = time.perf_counter()
+                entries = json.loads(data.decode("utf-8"))
+                terms = [term for term in entries if term]
+                compiled = (terms, [entries[term] for term in terms], build_automaton(terms))
+                self.__write_cache(digest, compiled)
+                logger.info(
+                    f"Glossary compiled: {len(terms)} terms in {(time.perf_counter() - started) * 1000:.1f} ms"
+                )
+            else:
+                logger.info(f"Glossary loaded from cache: {len(compiled[0])} terms")
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(f"Не удалось загрузить глоссарий {self.__path}, используется прежний: {e}")
+            self.__stat = (stat.st_mtime_ns, stat.st_size)
+            return
+
+        with self.__lock:
+            self.__terms, self.__targets, self.__automaton = compiled
+            self.__stat = (stat.st_mtime_ns, stat.st_size)
+
+    def mask(self, text: str, target_lang: str) -> Masked:
+        """Заменяет термины заполнителями; replacements — их перевод на target_lang или исходный вид."""
+        if time.monotonic() - self.__checked >= GLOSSARY_CHECK_INTERVAL:
+            self.load()
+        with self.__lock:
+            automaton, terms, targets = self.__automaton, self.__terms, self.__targets
+        if automaton is None:
+            return Masked(text, [])
+
+        found = find_terms(automaton, terms, text)
+        if not found:
+            return Masked(text, [])
+
+        parts, replacements, numbers, position = [], [], {}, 0
+        for start, end, index in found:
+            number = numbers.get(index)
+            if number is None:
+                number = numbers[index] = len(replacements)
+                replacements.append(self.__target(terms[index], targets[index], target_lang))
+            parts.append(text[position:start])
+            parts.append(PLACEHOLDER.format(number))
+            position = end
+        parts.append(text[position:])
+        metrics.inc("glossary_terms_total", len(found))
+        return Masked("".join(parts), replacements)
+
+    @staticmethod
+    def __target(term: str, target: Any, target_lang: str) -> str:
+        if isinstance(target, dict):
+            target = target.get(target_lang, target.get(DEFAULT_TARGET))
+        return target if isinstance(target, str) else term
+
+    def __read_cache(self, digest: str) -> Optional[Tuple[List[str], List[Any], Automaton]]:
+        try:
+            with open(self.__cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache["version"] != GLOSSARY_CACHE_VERSION or cache["digest"] != digest:
+                return None
+            terms, targets = cache["terms"], cache["targets"]
+            automaton = Automaton(*cache["automaton"])
+            if not (isinstance(terms, list) and isinstance(targets, list) and len(terms) == len(targets)
+                    and all(isinstance(term, str) and term for term in terms)
+                    and is_valid_automaton(automaton, len(terms))):
+                raise ValueError("неверная структура")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Кэш глоссария {self.__cache_path} не прочитан и будет собран заново: {e}")
+            return None
+        return terms, targets, automaton
+
+    def __write_cache(self, digest: str, compiled: Tuple[List[str], List[Any], Automaton]) -> None:
+        terms, targets, automaton = compiled
+        tmp_path = f"{self.__cache_path}.tmp"
+        cache = {"version": GLOSSARY_CACHE_VERSION, "digest": digest, "terms": terms, "targets": targets,
+                 "automaton": list(automaton)}
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.__cache_path)
+        except OSError as e:
+            logger.error(f"Не удалось сохранить кэш глоссария {self.__cache_path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self.__terms)
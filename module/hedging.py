@@ -0,0 +1,105 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from logging import getLogger
+from threading import Event, Lock
+from typing import Callable, Deque, Dict, Tuple
+from module.configs import UserConfig
+from module.metrics import metrics
+
+
+HEDGE_WINDOW = 200  # Сколько последних задержек запросов переводчика учитывается в выученном сроке
+HEDGE_MIN_SAMPLES = 20  # Пока замеров меньше, используется HEDGE_DEFAULT_DEADLINE
+HEDGE_DEFAULT_DEADLINE = 1.5  # Срок ответа переводчика без статистики, секунды
+HEDGE_MIN_DEADLINE = 0.2  # Нижняя граница выученного срока, чтобы не дублировать каждый запрос, секунды
+# Квантиль задержки, после которого запрос дублируется. Он должен быть ниже доли медленных ответов:
+# при «хвосте» в 10% p95 попадает внутрь хвоста и дублирование почти не срабатывает
+HEDGE_QUANTILE = 0.8
+
+Attempt = Callable[[str, Callable[[], bool]], str]
+
+logger = getLogger(__name__)
+
+
+class Hedger:
+    """Дублирование медленных запросов на запасной переводчик.
+
+    Если основной переводчик не ответил за hedge_deadline секунд (или за p80 задержки своих последних
+    запросов), тот же текст отправляется запасному hedge_translator. Берётся первый успешный
+    ответ, второй запрос отменяется.
+
+    Задержки учитываются по каждому запросу к серверу (TranslationClient.add_request_listener),
+    а не по переводу всего текста. Запрос, ожидание которого прервано позже срока (проигравший
+    или отменённый), учитывается сроком: иначе медленные ответы выпадали бы из статистики.
+    """
+
+    def __init__(self, user_config: UserConfig, max_workers: int = 8):
+        self.__user = user_config
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self.__latencies: Dict[str, Deque[float]] = {}
+        self.__lock = Lock()
+
+    def enabled_for(self, translator_code: str) -> bool:
+        fallback = self.__user.hedge_translator
+        return bool(fallback) and fallback != translator_code
+
+    def deadline(self, translator_code: str) -> float:
+        """Срок ответа основного переводчика, после которого запрос дублируется."""
+        if self.__user.hedge_deadline > 0:
+            return self.__user.hedge_deadline
+        with self.__lock:
+            samples = sorted(self.__latencies.get(translator_code, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DEADLINE
+        return max(samples[min(int(len(samples) * HEDGE_QUANTILE), len(samples) - 1)], HEDGE_MIN_DEADLINE)
+
+    def observe(self, translator_code: str, seconds: float, completed: bool = True) -> None:
+        """Учитывает задержку запроса; completed=False — ответа не дождались, задержка не меньше seconds."""
+        if not completed:
+            deadline = self.deadline(translator_code)
+            if seconds < deadline:
+                return  # Отменён раньше срока более новым нажатием: о задержке ничего не известно
+            seconds = deadline
+        with self.__lock:
+            self.__latencies.setdefault(translator_code, deque(maxlen=HEDGE_WINDOW)).append(seconds)
+
+    def run(self, translator_code: str, attempt: Attempt, is_cancelled: Callable[[], bool]) -> Tuple[str, str]:
+        """Выполняет attempt(переводчик, is_cancelled) с дублированием; возвращает (перевод, переводчик).
+
+        Ошибка возвращается, только если не удались оба запроса (или основной до срока).
+        """
+        fallback_code = self.__user.hedge_translator
+        stopped = {translator_code: Event(), fallback_code: Event()}
+
+        def hedged_attempt(code: str) -> str:
+            return attempt(code, lambda: stopped[code].is_set() or is_cancelled())
+
+        deadline = self.deadline(translator_code)
+        primary = self.__executor.submit(hedged_attempt, translator_code)
+        done, _ = wait([primary], timeout=deadline)
+        if done:
+            return primary.result(), translator_code
+
+        logger.info(f"{translator_code} не ответил за {deadline * 1000:.0f} мс, запрос продублирован в {fallback_code}")
+        metrics.inc("hedge_triggered_total", translator=translator_code, fallback=fallback_code)
+        pending = {primary: translator_code, self.__executor.submit(hedged_attempt, fallback_code): fallback_code}
+        error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                code = pending.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                for loser in pending.values():
+                    stopped[loser].set()
+                winner = "fallback" if code == fallback_code else "primary"
+                metrics.inc("hedge_won_total", winner=winner)
+                if winner == "fallback":
+                    logger.info(f"Первым ответил запасной переводчик {fallback_code}")
+                return text, code
+        raise error
+
+    def shutdown(self) -> None:
+        self.__executor.shutdown(wait=False, cancel_futures=True)
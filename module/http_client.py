@@ -0,0 +1,84 @@
+from logging import getLogger
+from threading import Lock
+from typing import TYPE_CHECKING, Optional, Tuple
+from module.configs import ServerConfig
+
+if TYPE_CHECKING:
+    import requests
+
+
+logger = getLogger(__name__)
+
+
+class HttpClient:
+    """Долгоживущий HTTP-клиент с пулом keep-alive соединений, таймаутами и повторами.
+
+    requests импортируется при первом запросе, а не при запуске приложения.
+    """
+
+    def __init__(self, server_config: ServerConfig):
+        self.__server = server_config
+        self.__session: Optional["requests.Session"] = None
+        self.__lock = Lock()
+
+    def __get_session(self) -> "requests.Session":
+        with self.__lock:
+            if self.__session is None:
+                self.__session = self.__create_session()
+            return self.__session
+
+    def __create_session(self) -> "requests.Session":
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+
+        # POST не входит в DEFAULT_ALLOWED_METHODS: перевод повторяется только при ошибке установки
+        # соединения, когда запрос гарантированно не дошёл до сервера.
+        retry = Retry(
+            total=self.__server.retry_total,
+            connect=self.__server.retry_total,
+            read=self.__server.retry_total,
+            status=self.__server.retry_total,
+            backoff_factor=self.__server.retry_backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=len(self.__server.endpoint_addresses),
+            pool_maxsize=self.__server.pool_maxsize,
+            pool_block=True,
+            max_retries=retry
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        logger.info(
+            f"HTTP client initialized (timeout={self.__get_timeout()}, pool_maxsize={self.__server.pool_maxsize}, "
+            f"retries={self.__server.retry_total})"
+        )
+        return session
+
+    def __get_timeout(self) -> Tuple[float, float]:
+        return self.__server.connect_timeout, self.__server.read_timeout
+
+    def get(self, url: str, **kwargs) -> "requests.Response":
+        kwargs.setdefault("timeout", self.__get_timeout())
+        return self.__get_session().get(url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> "requests.Response":
+        kwargs.setdefault("timeout", self.__get_timeout())
+        return self.__get_session().post(url, **kwargs)
+
+    def reset(self) -> None:
+        """Закрывает пул; следующий запрос создаст сессию с актуальными настройками сервера."""
+        self.close()
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__session is not None:
+                self.__session.close()
+                self.__session = None
+                logger.info("HTTP client closed")
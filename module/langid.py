@@ -0,0 +1,249 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+LANGID_MAX_CHARS = 1000  # Язык определяется по началу текста, чтобы время не зависело от длины
+LANGID_MIN_FEATURES = 12  # Меньше признаков (пара коротких слов) — язык не определяется
+LANGID_MIN_MARGIN = 0.35  # Средний перевес лучшего языка над вторым на признак, в натах
+LANGID_MIN_SCRIPT_LETTERS = 4
+LANGID_SCRIPT_SHARE = 0.6  # Доля букв письменности, при которой текст считается написанным на ней
+LANGID_FLOOR = 1e-4  # Вероятность признака, которого нет в профиле языка
+LANGID_WORD_CACHE = 50000  # Сколько оценок слов хранить
+
+# Самые частые слова языков: из них строятся профили символьных триграмм
+PROFILE_WORDS = {
+    "latin": {
+        "en": "the of and to a in is it you that he was for on are with as i his they be at one have this from "
+              "or had by not but what all were we when your can said there use an each which she do how their if "
+              "will up other about out many then them these so some her would make like him into time has look "
+              "more could people my than first been who its now only also any new because should",
+        "de": "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an werden "
+              "aus er hat dass sie nach wird bei einer um am sind noch wie einem über einen so zum war haben nur "
+              "oder aber vor zur bis mehr durch man sein wurde sei ich wir ihr können kann diese schon wenn muss",
+        "fr": "de la le et les des en un du une que est pour qui dans par plus pas au sur ne se ce il sont avec "
+              "son elle nous vous mais ou comme on tout aux été fait cette ses leur être je sa dont bien aussi même "
+              "peut après avoir très sans faire",
+        "es": "de la que el en y a los del se las por un para con no una su al lo como más pero sus le ya o este "
+              "sí porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos durante "
+              "todos uno les ni otros ese eso ellos es son está puede hacer",
+        "it": "di e il la che in a per un del non è sono le con i una da si al lo come ma ha della anche più nel "
+              "se gli questo alla mi ci io dei delle essere ho sul molto quando tutto fatto cosa perché questa "
+              "sia stato può",
+        "pt": "de a o que e do da em um para é com não uma os no se na por mais as dos como mas foi ao ele das "
+              "tem à seu sua ou ser quando muito há nos já está eu também só pelo pela até isso ela entre você "
+              "pode fazer são",
+        "nl": "de en van het een in is dat op te zijn met voor niet aan er om ook als door maar bij nog wordt uit "
+              "dan was hij ze je naar kan dit over zo heeft worden wat al tot wij onze deze geen",
+        "pl": "i w się na nie z do to że jest o a jak po co tak za od ale jego by czy już dla tylko może być "
+              "przez tym są jej mnie ich jako który była także bardzo tego które oraz jednak",
+        "tr": "bir ve bu da de için ile çok ne daha gibi olarak ben sen o ama var değil kadar sonra olan en her "
+              "şey ya mi ki göre olduğu iki nasıl diye bunu ancak içinde olan",
+        "sv": "och i att det som en på är av för med till den har de inte om ett han men var jag sig från vi så "
+              "kan man när år säger hon under också efter eller nu sin där vid mot skulle",
+    },
+    "cyrillic": {
+        "ru": "и в не на я что он с а как это по но к его все она так из у же то за вы от бы о мы для был уже ты "
+              "да было только если или когда мне даже при нет чтобы их ещё есть быть который этот может были "
+              "очень также после будет",
+        "uk": "і в на не що з та до я він як це у а за від по але так його є ми ви вона для ще був коли бути які "
+              "який все їх цей якщо тому також або між було дуже після буде",
+        "bg": "и на в да е се от за с не че са по това към как като но той тя ние бъде ще които който има беше "
+              "още ли при след само тези всички или много",
+    },
+}
+
+# Обычный текст добавляет к профилям окончания и сочетания букв знаменательных слов
+PROFILE_SAMPLES = {
+    "en": "Copy the selected text and press the shortcut to get its translation. The application keeps working "
+          "in the background and shows an icon in the notification area, where you can choose the translator "
+          "and the language you need.",
+    "de": "Kopieren Sie den markierten Text und drücken Sie die Tastenkombination, um die Übersetzung zu erhalten. "
+          "Die Anwendung läuft im Hintergrund und zeigt ein Symbol im Infobereich, wo Sie den Übersetzer und "
+          "die gewünschte Sprache auswählen können.",
+    "fr": "Copiez le texte sélectionné et appuyez sur le raccourci pour obtenir sa traduction. L'application "
+          "fonctionne en arrière-plan et affiche une icône dans la zone de notification, où vous pouvez choisir "
+          "le traducteur et la langue souhaitée.",
+    "es": "Copie el texto seleccionado y pulse el atajo para obtener su traducción. La aplicación funciona en "
+          "segundo plano y muestra un icono en el área de notificaciones, donde puede elegir el traductor y el "
+          "idioma que necesita.",
+    "it": "Copiate il testo selezionato e premete la scorciatoia per ottenere la traduzione. L'applicazione "
+          "lavora in background e mostra un'icona nell'area di notifica, dove potete scegliere il traduttore e "
+          "la lingua necessaria.",
+    "pt": "Copie o texto selecionado e pressione o atalho para obter a tradução. O aplicativo funciona em "
+          "segundo plano e mostra um ícone na área de notificação, onde você pode escolher o tradutor e o "
+          "idioma desejado.",
+    "nl": "Kopieer de geselecteerde tekst en druk op de sneltoets om de vertaling te krijgen. De toepassing "
+          "werkt op de achtergrond en toont een pictogram in het meldingengebied, waar je de vertaler en de "
+          "gewenste taal kunt kiezen.",
+    "pl": "Skopiuj zaznaczony tekst i naciśnij skrót, aby otrzymać tłumaczenie. Aplikacja działa w tle i "
+          "pokazuje ikonę w obszarze powiadomień, gdzie można wybrać tłumacza i potrzebny język.",
+    "tr": "Seçili metni kopyalayın ve çevirisini almak için kısayola basın. Uygulama arka planda çalışır ve "
+          "bildirim alanında bir simge gösterir; buradan çevirmeni ve istediğiniz dili seçebilirsiniz.",
+    "sv": "Kopiera den markerade texten och tryck på kortkommandot för att få översättningen. Programmet körs "
+          "i bakgrunden och visar en ikon i meddelandefältet, där du kan välja översättare och önskat språk.",
+    "ru": "Скопируйте выделенный текст и нажмите сочетание клавиш, чтобы получить его перевод. Приложение "
+          "работает в фоновом режиме и показывает значок в области уведомлений, где можно выбрать переводчик "
+          "и нужный язык. Сегодня утром в городе прошёл сильный дождь, поэтому многие жители остались дома. "
+          "Мы решили встретиться после работы, чтобы обсудить новый проект и распределить задачи между "
+          "сотрудниками. Если у вас возникнут вопросы, напишите нам, и мы обязательно ответим. Эта книга "
+          "рассказывает о жизни обычной семьи в небольшом северном посёлке. Объявление о съезде висело у "
+          "подъезда, но этот вопрос ещё никто не решил. Для нашего нового клиента важно качество обслуживания "
+          "и скорость доставки. Информация о состоянии системы обновляется каждую минуту. Студенты третьего "
+          "курса готовятся к экзаменам по истории и математике. Правительство страны приняло решение о "
+          "строительстве большой дороги между двумя областями. Он позвонил своему старому другу и рассказал "
+          "ему о последних событиях.",
+    "uk": "Скопіюйте виділений текст і натисніть сполучення клавіш, щоб отримати його переклад. Застосунок "
+          "працює у фоновому режимі та показує значок в області сповіщень, де можна вибрати перекладач і "
+          "потрібну мову. Сьогодні вранці в місті пройшов сильний дощ, тому багато мешканців залишилися вдома. "
+          "Ми вирішили зустрітися після роботи, щоб обговорити новий проєкт і розподілити завдання між "
+          "працівниками. Якщо у вас виникнуть запитання, напишіть нам, і ми обов'язково відповімо. Ця книжка "
+          "розповідає про життя звичайної родини в невеликому північному селищі. Для нашого нового клієнта "
+          "важлива якість обслуговування і швидкість доставки. Інформація про стан системи оновлюється "
+          "щохвилини. Студенти третього курсу готуються до іспитів з історії та математики. Уряд країни ухвалив "
+          "рішення про будівництво великої дороги між двома областями. Він зателефонував своєму старому "
+          "другові й розповів йому про останні події.",
+    "bg": "Копирайте избрания текст и натиснете клавишната комбинация, за да получите превода му. Приложението "
+          "работи във фонов режим и показва икона в областта за известия, където можете да изберете "
+          "преводача и нужния език. Днес сутринта в града валя силен дъжд, затова много жители останаха "
+          "вкъщи. Решихме да се срещнем след работа, за да обсъдим новия проект и да разпределим задачите "
+          "между служителите. Ако имате въпроси, пишете ни и непременно ще отговорим. Тази книга разказва за "
+          "живота на едно обикновено семейство в малко северно селище. За нашия нов клиент са важни качеството "
+          "на обслужването и бързината на доставката. Информацията за състоянието на системата се обновява "
+          "всяка минута. Студентите от трети курс се подготвят за изпитите по история и математика. "
+          "Правителството на страната взе решение за строежа на голям път между двете области. Той се обади "
+          "на стария си приятел и му разказа за последните събития.",
+}
+
+# Письменности, по которым язык определяется сразу, и письменности с профилями языков
+SCRIPTS: List[Tuple[str, "re.Pattern"]] = [
+    ("latin", re.compile(r"[a-zA-ZÀ-ɏ]+")),
+    ("cyrillic", re.compile(r"[Ѐ-ӿ]+")),
+    ("el", re.compile(r"[Ͱ-Ͽ]+")),
+    ("he", re.compile(r"[֐-׿]+")),
+    ("ar", re.compile(r"[؀-ۿ]+")),
+    ("hi", re.compile(r"[ऀ-ॿ]+")),
+    ("th", re.compile(r"[฀-๿]+")),
+    ("ka", re.compile(r"[Ⴀ-ჿ]+")),
+    ("hy", re.compile(r"[԰-֏]+")),
+    ("ko", re.compile(r"[가-힯ᄀ-ᇿ]+")),
+    ("ja", re.compile(r"[぀-ヿ]+")),
+    ("zh", re.compile(r"[一-鿿]+")),
+]
+NON_LETTERS_RE = re.compile(r"[\W\d_]+")
+
+
+class Detection(NamedTuple):
+    language: str
+    margin: float  # Перевес над вторым по вероятности языком; float("inf") для однозначной письменности
+
+
+class Profiles:
+    """Профили языков одной письменности: наивный байесовский классификатор по символьным триграммам.
+
+    Оценка слова — вектор прибавок ко всем языкам сразу; векторы слов запоминаются, поэтому текст
+    оценивается сложением векторов его различных слов, а не перебором всех триграмм.
+    """
+
+    def __init__(self, words: Dict[str, str]):
+        self.languages = list(words)
+        self.table: Dict[str, Tuple[Tuple[int, float], ...]] = {}
+        self.__vectors: Dict[str, Tuple[int, List[float]]] = {}
+        deltas: Dict[str, List[Tuple[int, float]]] = {}
+        for index, language in enumerate(self.languages):
+            weights: Counter = Counter()
+            for word in normalize(PROFILE_SAMPLES[language]).split():
+                weights.update(features_of(word))
+            # Вес слова по закону Ципфа: первые слова списка встречаются в тексте чаще
+            for rank, word in enumerate(words[language].split()):
+                for feature in features_of(word):
+                    weights[feature] += 20 / (rank + 10)
+            total = sum(weights.values())
+            for feature, weight in weights.items():
+                deltas.setdefault(feature, []).append((index, math.log(weight / total / LANGID_FLOOR)))
+        # Буква, которая есть во всех языках письменности (а, к, щ в кириллице), их не различает,
+        # а только размывает перевес на признак
+        self.table = {
+            feature: tuple(values) for feature, values in deltas.items()
+            if len(feature) > 1 or len(values) < len(self.languages)
+        }
+
+    def detect(self, words: List[str]) -> Optional[Detection]:
+        scores = [0.0] * len(self.languages)
+        matched = 0
+        for word, count in Counter(words).items():
+            word_matched, vector = self.__vector(word)
+            if word_matched:
+                matched += word_matched * count
+                scores = [score + delta * count for score, delta in zip(scores, vector)]
+        if matched < LANGID_MIN_FEATURES:
+            return None
+        ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        best, second = ranked[0], ranked[1]
+        return Detection(self.languages[best], (scores[best] - scores[second]) / matched)
+
+    def __vector(self, word: str) -> Tuple[int, List[float]]:
+        vector = self.__vectors.get(word)
+        if vector is None:
+            if len(self.__vectors) >= LANGID_WORD_CACHE:
+                self.__vectors.clear()
+            scores, matched = [0.0] * len(self.languages), 0
+            for feature in features_of(word):
+                deltas = self.table.get(feature)
+                if deltas:
+                    matched += 1
+                    for index, delta in deltas:
+                        scores[index] += delta
+            vector = self.__vectors[word] = (matched, scores)
+        return vector
+
+
+def features_of(word: str) -> List[str]:
+    """Триграммы слова с границами и его небазовые буквы (ä, ñ, ы, і…), которые хорошо различают языки."""
+    padded = f" {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)] + [char for char in word if char > "\x7f"]
+
+
+def normalize(text: str) -> str:
+    return NON_LETTERS_RE.sub(" ", text.lower())
+
+
+def detect_language(text: str) -> Optional[Detection]:
+    """Определяет язык текста без обращения к серверу; None, если язык определить нельзя."""
+    text = text[:LANGID_MAX_CHARS]
+    words = normalize(text).split()
+    letters = sum(map(len, words))
+    if letters < LANGID_MIN_SCRIPT_LETTERS:
+        return None
+
+    # Латиница и кириллица проверяются первыми: остальные письменности нужны редко
+    counts = {}
+    for script, pattern in SCRIPTS:
+        counts[script] = sum(map(len, pattern.findall(text)))
+        if counts[script] >= letters * LANGID_SCRIPT_SHARE and script != "zh":
+            break
+    if counts.get("ja"):
+        counts["ja"] += counts.pop("zh", 0)  # Иероглифы вместе с каной — японский текст
+    script = max(counts, key=counts.__getitem__)
+    if counts[script] < letters * LANGID_SCRIPT_SHARE:
+        return None
+    if script not in PROFILE_WORDS:
+        return Detection(script, float("inf"))
+    return profiles(script).detect(words)
+
+
+@lru_cache(maxsize=None)
+def profiles(script: str) -> Profiles:
+    """Профили строятся при первом обращении (несколько миллисекунд), а не при импорте."""
+    return Profiles(PROFILE_WORDS[script])
+
+
+def is_confident(detection: Optional[Detection]) -> bool:
+    return detection is not None and detection.margin >= LANGID_MIN_MARGIN
+
+
+def same_language(detected: str, language_code: str) -> bool:
+    """Сравнивает код языка без региона: "en" совпадает с "en-US"."""
+    return detected == language_code.split("-")[0].lower()
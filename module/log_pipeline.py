@@ -0,0 +1,89 @@
+import atexit
+import hashlib
+import logging
+import os
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from queue import SimpleQueue
+
+
+PAYLOAD_FULL = "full"
+PAYLOAD_TRUNCATE = "truncate"
+PAYLOAD_REDACT = "redact"
+
+_payload_mode = PAYLOAD_TRUNCATE
+_payload_max_chars = 80
+
+
+class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """Ротация по времени (when/interval) и дополнительно при превышении maxBytes."""
+
+    def __init__(self, filename: str, maxBytes: int = 0, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.maxBytes = maxBytes
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if self.maxBytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() + len(self.format(record)) + 1 >= self.maxBytes
+
+    def rotation_filename(self, default_name: str) -> str:
+        # Несколько ротаций по размеру за один период получают имена data.log.<дата>.1, .2, ...
+        name, index = super().rotation_filename(default_name), 0
+        while os.path.exists(name):
+            index += 1
+            name = f"{default_name}.{index}"
+        return name
+
+
+class LogQueueListener(QueueListener):
+    """QueueListener, который можно останавливать повторно: при выходе его останавливает и atexit."""
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
+
+
+def start_queue_logging() -> QueueListener:
+    """Переносит обработчики корневого логгера в фоновый поток.
+
+    Вызывающий поток только кладёт запись в очередь без ограничения размера и не ждёт ни диска,
+    ни консоли; запись выполняет QueueListener. Вызывается после logging.config.dictConfig.
+    Listener останавливается при любом выходе из процесса, в том числе через sys.exit,
+    и дописывает очередь; остановить его раньше можно вызовом stop().
+    """
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    queue = SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(queue))
+
+    listener = LogQueueListener(queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def configure_payload(mode: str, max_chars: int) -> None:
+    """Как выводить в лог тексты пользователя: full, truncate (первые max_chars символов) или redact."""
+    global _payload_mode, _payload_max_chars
+    _payload_mode = mode
+    _payload_max_chars = max_chars
+
+
+def loggable(text: str) -> str:
+    """Представление текста пользователя для лога в соответствии с configure_payload."""
+    text = str(text)
+    if _payload_mode == PAYLOAD_FULL:
+        return text
+    if _payload_mode == PAYLOAD_REDACT:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+        return f"<скрыто: {len(text)} символов, #{digest}>"
+    if len(text) <= _payload_max_chars:
+        return text
+    return f"{text[:_payload_max_chars]}… (+{len(text) - _payload_max_chars} символов)"
+
@@ -0,0 +1,219 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from logging import getLogger
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+
+METRICS_PREFIX = "ai_translate_hub"
+METRICS_FILE = "metrics.prom"
+METRICS_HISTORY_FILE = "metrics-history.jsonl"
+METRICS_HISTORY_MAX_BYTES = 5 * 1024 * 1024
+METRICS_HISTORY_BACKUPS = 3
+
+# Границы корзин гистограмм в секундах
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+logger = getLogger(__name__)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.__buckets = buckets
+        self.__counts = [0] * (len(buckets) + 1)  # Последняя корзина — +Inf
+        self.__sum = 0.0
+        self.__count = 0
+
+    def observe(self, value: float) -> None:
+        self.__counts[bisect_left(self.__buckets, value)] += 1
+        self.__sum += value
+        self.__count += 1
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля по корзинам (верхняя граница корзины, в которую попадает квантиль)."""
+        if not self.__count:
+            return 0.0
+        rank, seen = q * self.__count, 0
+        for index, count in enumerate(self.__counts):
+            seen += count
+            if seen >= rank:
+                return self.__buckets[index] if index < len(self.__buckets) else float("inf")
+        return float("inf")
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        result, seen = [], 0
+        for bound, count in zip(self.__buckets + (float("inf"),), self.__counts):
+            seen += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), seen))
+        return result
+
+    @property
+    def sum(self) -> float:
+        return self.__sum
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+
+class MetricsRegistry:
+    """Счётчики и гистограммы процесса; потокобезопасны."""
+
+    def __init__(self):
+        self.__counters: Dict[str, Dict[LabelSet, float]] = {}
+        self.__histograms: Dict[str, Dict[LabelSet, Histogram]] = {}
+        self.__lock = Lock()
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.__lock:
+            series = self.__counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.__lock:
+            series = self.__histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def render(self) -> str:
+        """Текстовый формат Prometheus."""
+        lines = []
+        with self.__lock:
+            for name, series in sorted(self.__counters.items()):
+                lines.append(f"# TYPE {METRICS_PREFIX}_{name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{METRICS_PREFIX}_{name}{format_labels(labels)} {value}")
+            for name, series in sorted(self.__histograms.items()):
+                lines.append(f"# TYPE {METRICS_PREFIX}_{name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{METRICS_PREFIX}_{name}_bucket{format_labels(labels + (('le', bound),))} {count}")
+                    lines.append(f"{METRICS_PREFIX}_{name}_sum{format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{METRICS_PREFIX}_{name}_count{format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Компактная сводка: значения счётчиков и p50/p95/p99 гистограмм в миллисекундах."""
+        result = {}
+        with self.__lock:
+            for name, series in self.__counters.items():
+                for labels, value in series.items():
+                    result[f"{name}{format_labels(labels)}"] = {"value": value}
+            for name, series in self.__histograms.items():
+                for labels, histogram in series.items():
+                    result[f"{name}{format_labels(labels)}"] = {
+                        "count": histogram.count,
+                        "p50_ms": histogram.quantile(0.50) * 1000,
+                        "p95_ms": histogram.quantile(0.95) * 1000,
+                        "p99_ms": histogram.quantile(0.99) * 1000,
+                    }
+        return result
+
+
+def format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsExporter(Thread):
+    """Периодически пишет метрики в logs/ и, если задан порт, отдаёт их по http://127.0.0.1:<port>/metrics.
+
+    metrics.prom перезаписывается атомарно (подходит для textfile-коллектора), а сводки
+    дописываются в metrics-history.jsonl, который ротируется по размеру.
+    """
+
+    def __init__(self, log_dir: str, interval: float, port: int = 0):
+        super().__init__(name="metrics-exporter", daemon=True)
+        self.__log_dir = log_dir
+        self.__interval = interval
+        self.__port = port
+        self.__stopped = Event()
+        self.__server: Optional["ThreadingHTTPServer"] = None
+
+    def run(self) -> None:
+        if self.__port:
+            self.__start_http_endpoint()
+        while not self.__stopped.wait(self.__interval):
+            self.export()
+
+    def export(self) -> None:
+        try:
+            prom_path = os.path.join(self.__log_dir, METRICS_FILE)
+            tmp_path = f"{prom_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(metrics.render())
+            os.replace(tmp_path, prom_path)
+
+            history_path = os.path.join(self.__log_dir, METRICS_HISTORY_FILE)
+            self.__rotate(history_path)
+            with open(history_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"time": time.time(), "metrics": metrics.summary()}) + "\n")
+        except OSError as e:
+            logger.error(f"Не удалось записать метрики в {self.__log_dir}: {e}")
+
+    def __rotate(self, path: str) -> None:
+        if not os.path.isfile(path) or os.path.getsize(path) < METRICS_HISTORY_MAX_BYTES:
+            return
+        for index in range(METRICS_HISTORY_BACKUPS - 1, 0, -1):
+            if os.path.isfile(f"{path}.{index}"):
+                os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+        os.replace(path, f"{path}.1")
+
+    def __start_http_endpoint(self) -> None:
+        # http.server загружается, только если порт метрик задан, а не при каждом запуске приложения
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.__server = ThreadingHTTPServer(("127.0.0.1", self.__port), MetricsHandler)
+        except OSError as e:
+            logger.error(f"Не удалось открыть порт метрик {self.__port}: {e}")
+            return
+        Thread(target=self.__server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"Metrics endpoint started at http://127.0.0.1:{self.__port}/metrics")
+
+    def stop(self) -> None:
+        self.__stopped.set()
+        if self.__server:
+            self.__server.shutdown()
+            self.__server.server_close()
+        self.export()
+        logger.info(f"Metrics summary: {metrics.summary()}")
@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import time
+from logging import getLogger
+from threading import Lock
+from typing import List, NamedTuple, Optional
+from module.utils import get_config_dir
+
+
+OUTBOX_FILE = "outbox.sqlite3"
+OUTBOX_VACUUM_PAGES = 64  # Сколько свободных страниц базы возвращать файловой системе за раз
+
+logger = getLogger(__name__)
+
+
+class OutboxEntry(NamedTuple):
+    id: int
+    text: str
+    translator_code: str
+    target_lang: str
+    created: float
+
+
+class Outbox:
+    """Очередь запросов перевода, сделанных без связи с сервером, в SQLite в каталоге конфигурации.
+
+    Записи переживают перезапуск приложения, выдаются в порядке добавления, устаревают через
+    max_age секунд; при переполнении вытесняются самые старые. Освободившееся место возвращается
+    файловой системе (auto_vacuum=INCREMENTAL), поэтому файл не растёт без ограничений.
+    """
+
+    def __init__(self, max_age: float, max_entries: int, path: Optional[str] = None):
+        self.__max_age = max_age
+        self.__max_entries = max_entries
+        self.__path = path or os.path.join(get_config_dir(), OUTBOX_FILE)
+        self.__lock = Lock()
+        self.__db = None
+        try:
+            self.__db = sqlite3.connect(self.__path, check_same_thread=False)
+            self.__db.execute("PRAGMA auto_vacuum = INCREMENTAL")  # Действует только для новой базы
+            self.__db.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL, translator_code TEXT NOT NULL, "
+                "target_lang TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self.__db.commit()
+            self.compact()
+            logger.info(f"Outbox opened at {self.__path}, pending: {len(self)}")
+        except sqlite3.Error as e:
+            logger.error(f"Не удалось открыть очередь запросов {self.__path}, запросы без связи не сохраняются: {e}")
+            self.__db = None
+
+    def add(self, text: str, translator_code: str, target_lang: str) -> bool:
+        """Ставит запрос в очередь; одинаковый запрос, уже стоящий в очереди, не дублируется."""
+        if self.__db is None:
+            return False
+        with self.__lock:
+            try:
+                exists = self.__db.execute(
+                    "SELECT 1 FROM outbox WHERE text = ? AND translator_code = ? AND target_lang = ?",
+                    (text, translator_code, target_lang)
+                ).fetchone()
+                if not exists:
+                    self.__db.execute(
+                        "INSERT INTO outbox (text, translator_code, target_lang, created) VALUES (?, ?, ?, ?)",
+                        (text, translator_code, target_lang, time.time())
+                    )
+                    self.__db.execute(
+                        "DELETE FROM outbox WHERE id NOT IN (SELECT id FROM outbox ORDER BY id DESC LIMIT ?)",
+                        (self.__max_entries,)
+                    )
+                    self.__db.commit()
+                return True
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка записи в очередь запросов: {e}")
+                return False
+
+    def pending(self) -> List[OutboxEntry]:
+        """Неустаревшие записи в порядке добавления."""
+        if self.__db is None:
+            return []
+        self.compact()
+        with self.__lock:
+            try:
+                rows = self.__db.execute(
+                    "SELECT id, text, translator_code, target_lang, created FROM outbox ORDER BY id"
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка чтения очереди запросов: {e}")
+                return []
+        return [OutboxEntry(*row) for row in rows]
+
+    def remove(self, entry_id: int) -> None:
+        if self.__db is None:
+            return
+        with self.__lock:
+            try:
+                self.__db.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+                self.__db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка удаления из очереди запросов: {e}")
+
+    def compact(self) -> None:
+        """Удаляет устаревшие записи и возвращает освободившиеся страницы файловой системе."""
+        if self.__db is None:
+            return
+        with self.__lock:
+            try:
+                expired = self.__db.execute(
+                    "DELETE FROM outbox WHERE created < ?", (time.time() - self.__max_age,)
+                ).rowcount
+                self.__db.commit()
+                if expired:
+                    logger.info(f"Из очереди запросов удалено устаревших записей: {expired}")
+                self.__db.execute(f"PRAGMA incremental_vacuum({OUTBOX_VACUUM_PAGES})").fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка очистки очереди запросов: {e}")
+
+    def close(self) -> None:
+        if self.__db is not None:
+            with self.__lock:
+                self.__db.close()
+                self.__db = None
+
+    def __len__(self) -> int:
+        if self.__db is None:
+            return 0
+        with self.__lock:
+            return self.__db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
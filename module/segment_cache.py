@@ -0,0 +1,39 @@
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from typing import Optional
+
+
+class SegmentCache:
+    """Переводы отдельных предложений по хэшу их содержимого (LRU в памяти).
+
+    Позволяет при повторном переводе отредактированного текста отправлять только изменённые предложения.
+    """
+
+    def __init__(self, max_entries: int):
+        self.__max_entries = max_entries
+        self.__entries: "OrderedDict[bytes, str]" = OrderedDict()
+        self.__lock = Lock()
+
+    @staticmethod
+    def __key(text: str, translator_code: str, target_lang: str) -> bytes:
+        return sha256(f"{translator_code}\x00{target_lang}\x00{text}".encode("utf-8")).digest()
+
+    def get(self, text: str, translator_code: str, target_lang: str) -> Optional[str]:
+        key = self.__key(text, translator_code, target_lang)
+        with self.__lock:
+            translation = self.__entries.get(key)
+            if translation is not None:
+                self.__entries.move_to_end(key)
+            return translation
+
+    def put(self, text: str, translator_code: str, target_lang: str, translation: str) -> None:
+        key = self.__key(text, translator_code, target_lang)
+        with self.__lock:
+            self.__entries[key] = translation
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
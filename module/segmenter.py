@@ -0,0 +1,71 @@
+import re
+from typing import List, NamedTuple
+
+
+# Граница предложения: знак конца предложения (с закрывающими кавычками/скобками) и пробелы за ним,
+# либо перевод строки вместе со следующими пробельными символами.
+SENTENCE_BOUNDARY_RE = re.compile(r'[.!?…。！？]+[)"»”’\]]*\s+|\n\s*')
+
+
+class Chunk(NamedTuple):
+    prefix: str  # Пробельные символы перед текстом, сохраняются как есть
+    text: str  # Текст, который отправляется на перевод
+    suffix: str  # Пробельные символы после текста, сохраняются как есть
+
+
+def split_sentences(text: str) -> List[str]:
+    """Делит текст на предложения; каждое предложение включает пробелы, идущие за ним."""
+    units, start = [], 0
+    for match in SENTENCE_BOUNDARY_RE.finditer(text):
+        units.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        units.append(text[start:])
+    return units
+
+
+def split_long_unit(unit: str, max_chars: int) -> List[str]:
+    """Делит слишком длинное предложение по последнему пробелу, а при его отсутствии — жёстко."""
+    parts = []
+    while len(unit) > max_chars:
+        cut = unit.rfind(" ", 0, max_chars) + 1 or max_chars
+        parts.append(unit[:cut])
+        unit = unit[cut:]
+    if unit:
+        parts.append(unit)
+    return parts
+
+
+def make_chunk(raw: str) -> Chunk:
+    stripped = raw.lstrip()
+    prefix = raw[:len(raw) - len(stripped)]
+    text = stripped.rstrip()
+    return Chunk(prefix, text, stripped[len(text):])
+
+
+def split_into_segments(text: str, max_chars: int) -> List[Chunk]:
+    """Делит текст на предложения (слишком длинные — на части не длиннее max_chars).
+
+    Склейка prefix + text + suffix всех сегментов в порядке следования даёт исходный текст.
+    """
+    return [make_chunk(unit) for sentence in split_sentences(text) for unit in split_long_unit(sentence, max_chars)]
+
+
+def split_into_chunks(text: str, max_chars: int) -> List[Chunk]:
+    """Собирает предложения в куски не длиннее max_chars.
+
+    Склейка prefix + text + suffix всех кусков в порядке следования даёт исходный текст.
+    """
+    units = []
+    for unit in split_sentences(text):
+        units.extend(split_long_unit(unit, max_chars))
+
+    chunks, current = [], ""
+    for unit in units:
+        if current and len(current) + len(unit) > max_chars:
+            chunks.append(make_chunk(current))
+            current = ""
+        current += unit
+    if current:
+        chunks.append(make_chunk(current))
+    return chunks
@@ -0,0 +1,42 @@
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Объединяет одинаковые одновременные вызовы: пока вызов с ключом выполняется,
+    повторные вызовы с тем же ключом не запускают работу заново, а ждут его результат.
+
+    Результаты не сохраняются: после завершения вызова ключ освобождается.
+    """
+
+    def __init__(self):
+        self.__in_flight: Dict[Hashable, Future] = {}
+        self.__lock = Lock()
+
+    def run(self, key: Hashable, function: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Возвращает (результат, shared); shared — результат получен от чужого вызова.
+
+        Исключение ведущего вызова пробрасывается всем присоединившимся.
+        """
+        with self.__lock:
+            future = self.__in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self.__in_flight[key] = Future()
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(function())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self.__lock:
+                self.__in_flight.pop(key, None)
+        return future.result(), False
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self.__lock:
+            return key in self.__in_flight
@@ -0,0 +1,349 @@
+import os
+import re
+import sqlite3
+import time
+from array import array
+from collections import Counter, OrderedDict
+from logging import getLogger
+from threading import Lock, Thread
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+from module.cache import normalize_text
+from module.utils import get_config_dir
+
+
+TM_FILE = "translation_memory.sqlite3"
+NGRAM_SIZE = 3
+MINHASH_BINS = 24  # Длина подписи MinHash
+MINHASH_ROWS = 2  # Значений подписи в одной полосе LSH
+MAX_VERIFIED_CANDIDATES = 16  # Сколько кандидатов с наибольшим числом совпавших полос проверяется точно
+BIN_BYTES = array("I").itemsize  # Размер значения подписи в pack_signature
+BANDS = MINHASH_BINS // MINHASH_ROWS
+MAX_DEPTH = BANDS  # На наибольшей глубине ключ полосы — вся подпись
+MAX_BUCKET_SIZE = 64  # Переполненная корзина полосы делится по более длинному префиксу подписи
+TRIM_INTERVAL = 256  # Через сколько добавлений база обрезается до tm_max_entries
+GRAM_HASH_MASK = (1 << 32) - 1  # n-граммы хранятся 32-битными хешами: array("I") вместо множества строк
+
+NUMBER_RE = re.compile(r"\d+")
+
+logger = getLogger(__name__)
+
+
+class MemoryMatch(NamedTuple):
+    source: str
+    translation: str
+    similarity: float
+
+
+def make_ngrams(text: str) -> FrozenSet[str]:
+    # Числа заменяются нулём: тексты, различающиеся только числами, считаются одинаковыми,
+    # а сами числа переносит transfer_numbers
+    padded = f" {NUMBER_RE.sub('0', normalize_text(text).lower())} "
+    return frozenset(padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+
+def template_key(text: str) -> str:
+    """Ключ записи: тексты, различающиеся только числами, хранятся в индексе одной записью."""
+    return NUMBER_RE.sub("0", normalize_text(text))
+
+
+def hash_ngrams(text: str) -> "array[int]":
+    # hash() строк зависит от запуска процесса, но индекс строится заново при каждом запуске
+    return array("I", {hash(gram) & GRAM_HASH_MASK for gram in make_ngrams(text)})
+
+
+def signature(hashes: Iterable[int]) -> List[int]:
+    bins = [GRAM_HASH_MASK] * MINHASH_BINS
+    for value in hashes:
+        index, value = value % MINHASH_BINS, value // MINHASH_BINS
+        if value < bins[index]:
+            bins[index] = value
+    return bins
+
+
+def pack_signature(hashes: Iterable[int]) -> bytes:
+    """Подпись, записанная дважды подряд байтами: ключ полосы любой длины берётся одним срезом."""
+    return array("I", signature(hashes) * 2).tobytes()
+
+
+def band_key(bins: bytes, band: int, depth: int) -> bytes:
+    """Ключ полосы band глубины depth: MINHASH_ROWS * depth значений подписи начиная с полосы, по кругу."""
+    start = band * MINHASH_ROWS * BIN_BYTES
+    return bins[start:start + MINHASH_ROWS * depth * BIN_BYTES]
+
+
+def transfer_numbers(match: MemoryMatch, text: str) -> str:
+    """Переносит числа из нового текста в найденный перевод, если тексты различаются только числами.
+
+    Шаблонные тексты (тикеты, уведомления) часто отличаются лишь номером или датой: тогда
+    старые числа в переводе заменяются новыми в том же порядке.
+    """
+    old_numbers, new_numbers = NUMBER_RE.findall(match.source), NUMBER_RE.findall(text)
+    if NUMBER_RE.sub("0", match.source) != NUMBER_RE.sub("0", text) or old_numbers == new_numbers:
+        return match.translation
+    if [NUMBER_RE.findall(match.translation).count(n) for n in old_numbers] != [1] * len(old_numbers):
+        return match.translation  # Числа в переводе нельзя однозначно сопоставить с исходными
+
+    mapping = dict(zip(old_numbers, new_numbers))
+    return NUMBER_RE.sub(lambda m: mapping.get(m.group(0), m.group(0)), match.translation)
+
+
+SPLIT = object()  # Метка разделённой корзины
+
+
+class IndexEntry(NamedTuple):
+    source: str
+    translation: str
+    grams: "array[int]"  # Хеши n-грамм источника для точной проверки сходства
+    bins: bytes  # Подпись MinHash (pack_signature) для переноса записи при делении корзины
+
+
+class MinHashIndex:
+    """Индекс похожих текстов: MinHash по символьным n-граммам и LSH с разбиением на полосы.
+
+    Подпись строится за один проход (one-permutation hashing): хеш каждой n-граммы попадает
+    в одну из MINHASH_BINS корзин, в корзине остаётся минимум. Подпись делится на полосы по
+    MINHASH_ROWS значений; тексты с совпадающей хотя бы одной полосой становятся кандидатами,
+    а кандидаты проверяются точным сходством Жаккара по сохранённым хешам n-грамм.
+
+    Тексты, различающиеся только числами, занимают одну запись. Корзина полосы, в которой
+    больше MAX_BUCKET_SIZE записей (однородные и шаблонные тексты), делится по ключу на полосу
+    длиннее, как в LSH Forest: поиск спускается до неразделённой корзины и
+    просматривает не больше MAX_BUCKET_SIZE кандидатов на полосу при любом размере индекса.
+    Удалённая запись убирается из своих корзин, а её номер достаётся следующей добавленной,
+    поэтому память индекса зависит от числа живых записей, а не от числа добавлений.
+    """
+
+    def __init__(self):
+        # Ключ полосы -> номера записей или SPLIT, если корзина разделена по более длинному ключу
+        self.__bands: List[Dict[bytes, Any]] = [{} for _ in range(BANDS)]
+        self.__entries: List[Optional[IndexEntry]] = []
+        self.__free: List[int] = []  # Номера удалённых записей для повторного использования
+        self.__by_template: Dict[str, int] = {}
+
+    def add(self, source: str, translation: str) -> None:
+        key = template_key(source)
+        entry_id = self.__by_template.get(key)
+        if entry_id is not None:
+            self.__entries[entry_id] = self.__entries[entry_id]._replace(source=source, translation=translation)
+            return
+
+        grams = hash_ngrams(source)
+        bins = pack_signature(grams)
+        entry = IndexEntry(source, translation, grams, bins)
+        if self.__free:
+            entry_id = self.__free.pop()
+            self.__entries[entry_id] = entry
+        else:
+            entry_id = len(self.__entries)
+            self.__entries.append(entry)
+        self.__by_template[key] = entry_id
+        for band in range(BANDS):
+            self.__insert(band, entry_id, bins, 1)
+
+    def __insert(self, band: int, entry_id: int, bins: bytes, depth: int) -> None:
+        index = self.__bands[band]
+        while True:
+            key = band_key(bins, band, depth)
+            bucket = index.get(key, [])
+            if bucket is not SPLIT:
+                break
+            depth += 1
+
+        bucket.append(entry_id)
+        index[key] = bucket
+        if len(bucket) <= MAX_BUCKET_SIZE:
+            return
+        if depth == MAX_DEPTH:
+            del bucket[0]  # Подписи совпадают целиком: остаются последние записи
+            return
+        index[key] = SPLIT
+        for moved_id in bucket:
+            self.__insert(band, moved_id, self.__entries[moved_id].bins, depth + 1)
+
+    def remove(self, source: str) -> None:
+        entry_id = self.__by_template.pop(template_key(source), None)
+        if entry_id is None:
+            return
+        bins = self.__entries[entry_id].bins
+        for band, index in enumerate(self.__bands):
+            key, bucket = self.__leaf(index, bins, band)
+            if bucket and entry_id in bucket:  # На наибольшей глубине запись могла быть вытеснена
+                bucket.remove(entry_id)
+                if not bucket:
+                    del index[key]
+        self.__entries[entry_id] = None
+        self.__free.append(entry_id)
+
+    @staticmethod
+    def __leaf(index: Dict[bytes, Any], bins: bytes, band: int) -> Tuple[bytes, Optional[List[int]]]:
+        """Неразделённая корзина полосы для подписи bins: ключ и номера записей (None, если корзины нет)."""
+        for depth in range(1, MAX_DEPTH + 1):
+            key = band_key(bins, band, depth)
+            bucket = index.get(key)
+            if bucket is not SPLIT:
+                return key, bucket
+        return key, None
+
+    def search(self, text: str, threshold: float) -> Optional[MemoryMatch]:
+        entry_id = self.__by_template.get(template_key(text))
+        if entry_id is not None:
+            entry = self.__entries[entry_id]
+            return MemoryMatch(entry.source, entry.translation, 1.0)
+
+        hashes = hash_ngrams(text)
+        if not hashes:
+            return None
+        grams = set(hashes)
+        bins = pack_signature(hashes)
+
+        hits = Counter()
+        for band, index in enumerate(self.__bands):
+            hits.update(self.__leaf(index, bins, band)[1] or ())
+
+        best = None
+        for entry_id, _ in hits.most_common(MAX_VERIFIED_CANDIDATES):
+            entry = self.__entries[entry_id]
+            common = len(grams.intersection(entry.grams))
+            similarity = common / (len(grams) + len(entry.grams) - common)
+            if similarity >= threshold and (best is None or similarity > best.similarity):
+                best = MemoryMatch(entry.source, entry.translation, similarity)
+        return best
+
+    def __len__(self) -> int:
+        return len(self.__by_template)
+
+
+class TranslationMemory:
+    """Память переводов: пары (исходный текст, перевод) по переводчику и языку с нечётким поиском.
+
+    Хранится не больше tm_max_entries последних записей: при добавлении самая старая запись
+    вытесняется из индекса, а база обрезается каждые TRIM_INTERVAL добавлений.
+    """
+
+    def __init__(self, threshold: float, max_entries: int, path: Optional[str] = None):
+        self.__threshold = threshold
+        self.__max_entries = max_entries
+        self.__path = path or os.path.join(get_config_dir(), TM_FILE)
+        self.__indexes: Dict[Tuple[str, str], MinHashIndex] = {}
+        # (переводчик, язык, ключ шаблона) -> исходный текст, от самой старой записи индекса к самой новой
+        self.__order: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self.__pending: List[Tuple[str, str, str, str, float]] = []  # Записи, добавленные до окончания загрузки
+        self.__failed = False  # База не открылась: записи живут только в индексе до выхода
+        self.__inserted = 0
+        self.__lock = Lock()
+        self.__db = None
+
+    def load(self) -> None:
+        """Открывает базу и строит индексы в фоновом потоке; до окончания загрузки поиск ничего не находит."""
+        Thread(target=self.__load, name="translation-memory", daemon=True).start()
+
+    def __load(self) -> None:
+        started = time.perf_counter()
+        try:
+            db = sqlite3.connect(self.__path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS memory ("
+                "id INTEGER PRIMARY KEY, source TEXT NOT NULL, translation TEXT NOT NULL, "
+                "translator TEXT NOT NULL, language TEXT NOT NULL, created REAL NOT NULL, template TEXT NOT NULL)"
+            )
+            self.__migrate(db)
+            # Строка на ключ шаблона, как запись индекса: остаётся последний перевод
+            db.execute(
+                "DELETE FROM memory WHERE id NOT IN (SELECT MAX(id) FROM memory GROUP BY translator, language, template)"
+            )
+            db.execute("CREATE UNIQUE INDEX IF NOT EXISTS memory_template ON memory (translator, language, template)")
+            self.__trim(db)
+            db.commit()
+            rows = db.execute("SELECT source, translation, translator, language FROM memory ORDER BY id").fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Не удалось открыть память переводов {self.__path}, записи не сохраняются: {e}")
+            with self.__lock:
+                self.__failed = True
+                self.__pending = []
+            return
+
+        indexes: Dict[Tuple[str, str], MinHashIndex] = {}
+        order: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        for source, translation, translator, language in rows:
+            self.__index(indexes, order, source, translator, language, translation)
+
+        with self.__lock:
+            # Записи, добавленные во время загрузки, новее записей базы
+            for source, translation, translator, language, _ in self.__pending:
+                self.__index(indexes, order, source, translator, language, translation)
+            self.__indexes, self.__order = indexes, order
+            self.__db = db
+            self.__insert(self.__pending)
+            self.__pending = []
+        logger.info(
+            f"Translation memory loaded from {self.__path}: {len(rows)} entries "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+    @staticmethod
+    def __migrate(db: sqlite3.Connection) -> None:
+        """Добавляет ключ шаблона в базы прежних версий, где строки различались точным текстом."""
+        if "template" in {column[1] for column in db.execute("PRAGMA table_info(memory)")}:
+            return
+        db.execute("ALTER TABLE memory ADD COLUMN template TEXT NOT NULL DEFAULT ''")
+        db.executemany(
+            "UPDATE memory SET template = ? WHERE id = ?",
+            [(template_key(source), row_id) for row_id, source in db.execute("SELECT id, source FROM memory")]
+        )
+        db.execute("DROP INDEX IF EXISTS memory_key")
+
+    def search(self, text: str, translator_code: str, target_lang: str) -> Optional[MemoryMatch]:
+        with self.__lock:
+            index = self.__indexes.get((translator_code, target_lang))
+            if index is None:
+                return None
+            return index.search(text, self.__threshold)
+
+    def add(self, text: str, translator_code: str, target_lang: str, translation: str) -> None:
+        row = (text, translation, translator_code, target_lang, time.time())
+        with self.__lock:
+            self.__index(self.__indexes, self.__order, text, translator_code, target_lang, translation)
+            if self.__db is not None:
+                self.__insert([row])
+            elif not self.__failed:
+                self.__pending.append(row)
+
+    def __index(self, indexes: Dict[Tuple[str, str], MinHashIndex], order: "OrderedDict[Tuple[str, str, str], str]",
+                source: str, translator_code: str, target_lang: str, translation: str) -> None:
+        """Добавляет запись в индекс и вытесняет самую старую, если записей больше tm_max_entries."""
+        indexes.setdefault((translator_code, target_lang), MinHashIndex()).add(source, translation)
+        key = (translator_code, target_lang, template_key(source))
+        order.pop(key, None)
+        order[key] = source
+        while len(order) > self.__max_entries:
+            (old_translator, old_language, _), old_source = order.popitem(last=False)
+            indexes[(old_translator, old_language)].remove(old_source)
+
+    def __insert(self, rows: List[Tuple[str, str, str, str, float]]) -> None:
+        if not rows:
+            return
+        try:
+            # Повторный перевод того же шаблона заменяет строку и становится самым новым
+            self.__db.executemany(
+                "INSERT OR REPLACE INTO memory (source, translation, translator, language, created, template) "
+                "VALUES (?, ?, ?, ?, ?, ?)", [(*row, template_key(row[0])) for row in rows]
+            )
+            self.__inserted += len(rows)
+            if self.__inserted >= TRIM_INTERVAL:
+                self.__inserted = 0
+                self.__trim(self.__db)
+            self.__db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка записи в память переводов: {e}")
+
+    def __trim(self, db: sqlite3.Connection) -> None:
+        db.execute(
+            "DELETE FROM memory WHERE id <= (SELECT id FROM memory ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (self.__max_entries,)
+        )
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__db is not None:
+                self.__db.close()
+                self.__db = None
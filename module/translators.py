@@ -1,4 +1,9 @@
+from typing import Dict, Generic, Iterator, List, NamedTuple, Optional, Type, TypeVar
+
+
 class BaseEntity:
+    __slots__ = ("__code", "__name")
+
     def __init__(self, code: str, name: str):
         self.__code = code
         self.__name = name
@@ -11,12 +16,75 @@ class BaseEntity:
     def name(self) -> str:
         return self.__name
 
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.__code!r}, {self.__name!r})"
+
 
 class Translator(BaseEntity):
+    __slots__ = ()
+
     def __init__(self, code: str, name: str):
         super().__init__(code, name)
 
 
 class Language(BaseEntity):
+    __slots__ = ()
+
     def __init__(self, code: str, name: str):
         super().__init__(code, name)
+
+
+Entity = TypeVar("Entity", bound=BaseEntity)
+
+
+class RegistryDiff(NamedTuple):
+    added: List[BaseEntity]
+    removed: List[BaseEntity]
+    renamed: List[BaseEntity]  # Новые объекты с прежним кодом и другим названием
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.renamed)
+
+
+class CatalogDiff(NamedTuple):
+    translators: RegistryDiff
+    languages: RegistryDiff
+
+    def __bool__(self) -> bool:
+        return bool(self.translators or self.languages)
+
+
+class Registry(Generic[Entity]):
+    """Переводчики или языки из каталога сервера в порядке сервера с поиском по коду за O(1)."""
+
+    def __init__(self, entity_type: Type[Entity]):
+        self.__entity_type = entity_type
+        self.__by_code: Dict[str, Entity] = {}
+
+    def update(self, names: Dict[str, str]) -> RegistryDiff:
+        """Заменяет содержимое словарём {код: название} и возвращает разницу с прежним."""
+        previous = self.__by_code
+        current: Dict[str, Entity] = {}
+        added, renamed = [], []
+        for code, name in names.items():
+            entity = previous.get(code)
+            if entity is None or entity.name != name:
+                entity = self.__entity_type(code, name)
+                (added if code not in previous else renamed).append(entity)
+            current[code] = entity
+
+        removed = [entity for code, entity in previous.items() if code not in current]
+        self.__by_code = current
+        return RegistryDiff(added, removed, renamed)
+
+    def get(self, code: str) -> Optional[Entity]:
+        return self.__by_code.get(code)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.__by_code
+
+    def __iter__(self) -> Iterator[Entity]:
+        return iter(list(self.__by_code.values()))
+
+    def __len__(self) -> int:
+        return len(self.__by_code)
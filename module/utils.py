@@ -1,21 +1,41 @@
-from PIL import Image, ImageDraw
 from logging import getLogger
 import os
 import sys
-import tkinter as tk
-from tkinter import ttk, scrolledtext
-import tkinter.font as tkfont
-from tkinter import messagebox
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+APP_ICON_FILE = "app_icon.png"
+CONFIG_DIR_ENV = "AI_TRANSLATE_HUB_CONFIG_DIR"  # Переопределяет каталог конфигурации (бенчмарки, отладка)
 
 logger = getLogger(__name__)
 
 
-def create_app_icon() -> Image:
+def create_app_icon() -> "Image.Image":
+    from PIL import Image
+
+    icon_path = os.path.join(get_config_dir(), APP_ICON_FILE)
+    if os.path.isfile(icon_path):
+        try:
+            image = Image.open(icon_path)
+            image.load()
+            logger.info(f"Application icon loaded from {icon_path}")
+            return image
+        except OSError as e:
+            logger.error(f"Не удалось загрузить иконку {icon_path}, иконка будет создана заново: {e}")
+
+    from PIL import ImageDraw
+
     width, height, padding = 64, 64, 10
     image = Image.new("RGB", (width, height), color="blue")
     dc = ImageDraw.Draw(image)
     dc.ellipse((padding, padding, width - padding, height - padding), fill="yellow")
+    try:
+        image.save(icon_path)
+    except OSError as e:
+        logger.error(f"Не удалось сохранить иконку {icon_path}: {e}")
     logger.info("Application icon initialized successfully")
     return image
 
@@ -26,13 +46,18 @@ def get_config_dir() -> str:
     else:
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
-    config_dir = os.path.join(base_dir, "config")
+    config_dir = os.environ.get(CONFIG_DIR_ENV) or os.path.join(base_dir, "config")
     os.makedirs(config_dir, exist_ok=True)
 
     return config_dir
 
 
 def show_error_message(title, message) -> None:
+    # tkinter нужен только для окна ошибки, поэтому не загружается при обычном запуске
+    import tkinter as tk
+    from tkinter import ttk, scrolledtext
+    import tkinter.font as tkfont
+
     root = tk.Tk()
     root.title(title)
     root.resizable(True, True)  # Разрешаем изменение размера окна
@@ -0,0 +1,149 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_DEFLATE = "deflate"
+TRANSPORT_HTTP = "http"  # POST /translate, результат приходит в WebSocket
+TRANSPORT_WEBSOCKET = "websocket"  # Запрос и результат — кадры одной WebSocket-сессии
+
+CONTENT_TYPES = {
+    ENCODING_JSON: "application/json",
+    ENCODING_MSGPACK: "application/msgpack",
+}
+
+GZIP_MIN_BYTES = 512  # Меньшие тела после gzip почти не уменьшаются, а заголовок gzip добавляет 18 байт
+DEFLATE_MIN_BYTES = 256
+ZLIB_HEADER = 0x78  # Первый байт потока zlib; MessagePack-словарь так начинаться не может
+
+
+class WireFormat(NamedTuple):
+    """Согласованный с сервером формат: кодирование сообщений и сжатие в обе стороны."""
+    encoding: str = ENCODING_JSON
+    request_compression: Optional[str] = None  # Content-Encoding тела POST
+    result_compression: Optional[str] = None  # Сжатие бинарных кадров результата в WebSocket
+
+
+JSON_WIRE = WireFormat()
+
+
+@lru_cache(maxsize=None)
+def load_msgpack():
+    """Модуль msgpack или None, если он не установлен (необязательная зависимость: без неё только JSON).
+
+    Загружается при первом согласовании формата с сервером, предлагающим wire, а не при запуске приложения.
+    """
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def supported_encodings() -> List[str]:
+    return [ENCODING_MSGPACK, ENCODING_JSON] if load_msgpack() is not None else [ENCODING_JSON]
+
+
+def negotiate(offer: Optional[Dict[str, Any]], preference: str = "auto") -> WireFormat:
+    """Выбирает формат по предложению сервера из get_config ("wire": {"encodings": [...], "compression": [...]}).
+
+    Сервер без поля wire получает прежний несжатый JSON; preference "json" отключает MessagePack.
+    """
+    if not offer:
+        return JSON_WIRE
+    encodings = offer.get("encodings") or [ENCODING_JSON]
+    compression = offer.get("compression") or []
+
+    encoding = ENCODING_JSON
+    if preference == "auto":
+        encoding = next((name for name in supported_encodings() if name in encodings), ENCODING_JSON)
+    return WireFormat(
+        encoding=encoding,
+        request_compression=COMPRESSION_GZIP if COMPRESSION_GZIP in compression else None,
+        result_compression=COMPRESSION_DEFLATE if COMPRESSION_DEFLATE in compression else None,
+    )
+
+
+def negotiate_transport(offer: Optional[List[str]], preference: str = "auto") -> str:
+    """Выбирает способ отправки запроса перевода по предложению сервера из get_config ("transports": [...]).
+
+    Кадр в WebSocket используется, только если сервер его предлагает; preference "http" оставляет POST.
+    """
+    if preference == "auto" and TRANSPORT_WEBSOCKET in (offer or []):
+        return TRANSPORT_WEBSOCKET
+    return TRANSPORT_HTTP
+
+
+def dumps(message: Dict[str, Any], encoding: str) -> bytes:
+    if encoding == ENCODING_MSGPACK:
+        return load_msgpack().packb(message, use_bin_type=True)
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes, encoding: str) -> Dict[str, Any]:
+    if encoding == ENCODING_MSGPACK:
+        msgpack = load_msgpack()
+        if msgpack is None:
+            raise ValueError("Получено сообщение MessagePack, но модуль msgpack не установлен")
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(data)
+
+
+def encode_request(message: Dict[str, Any], wire: WireFormat) -> Tuple[bytes, Dict[str, str]]:
+    """Тело и заголовки POST-запроса."""
+    body = dumps(message, wire.encoding)
+    headers = {"Content-Type": CONTENT_TYPES[wire.encoding]}
+    if wire.request_compression == COMPRESSION_GZIP and len(body) >= GZIP_MIN_BYTES:
+        import gzip  # Сжатие загружается, только если его предложил сервер
+
+        body = gzip.compress(body, compresslevel=6, mtime=0)
+        headers["Content-Encoding"] = COMPRESSION_GZIP
+    return body, headers
+
+
+def decode_request(body: bytes, content_type: Optional[str], content_encoding: Optional[str]) -> Dict[str, Any]:
+    if content_encoding == COMPRESSION_GZIP:
+        import gzip
+
+        body = gzip.decompress(body)
+    encoding = ENCODING_MSGPACK if content_type == CONTENT_TYPES[ENCODING_MSGPACK] else ENCODING_JSON
+    return loads(body, encoding)
+
+
+def result_format(wire: WireFormat) -> Optional[Dict[str, str]]:
+    """Поле запроса, которым клиент просит присылать результат в бинарном кадре; None — обычный текстовый JSON."""
+    if wire == JSON_WIRE:
+        return None
+    result = {"encoding": wire.encoding}
+    if wire.result_compression:
+        result["compression"] = wire.result_compression
+    return result
+
+
+def encode_frame(message: Dict[str, Any], requested: Optional[Dict[str, str]]) -> Tuple[bool, bytes]:
+    """Кадр WebSocket в согласованном формате: (бинарный ли кадр, данные).
+
+    Сервер так кодирует результат, клиент — запрос перевода, если он отправляется кадром.
+    """
+    if not requested:
+        return False, dumps(message, ENCODING_JSON)
+    data = dumps(message, requested.get("encoding", ENCODING_JSON))
+    if requested.get("compression") == COMPRESSION_DEFLATE and len(data) >= DEFLATE_MIN_BYTES:
+        import zlib
+
+        data = zlib.compress(data, 6)
+    return True, data
+
+
+def decode_frame(data: bytes) -> Dict[str, Any]:
+    """Разбирает бинарный кадр: при необходимости распаковывает zlib, затем JSON или MessagePack."""
+    if data[:1] == bytes((ZLIB_HEADER,)):
+        import zlib
+
+        data = zlib.decompress(data)
+    if data[:1] in (b"{", b"["):
+        return json.loads(data)
+    return loads(data, ENCODING_MSGPACK)
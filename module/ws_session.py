@@ -0,0 +1,289 @@
+import json
+import random
+import time
+from concurrent.futures import Future
+from logging import getLogger
+from threading import Event, Thread
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
+from module.configs import ServerConfig
+from module.dispatcher import ResponseDispatcher
+from module.endpoints import Endpoint, EndpointPool
+from module.log_pipeline import loggable
+from module.metrics import metrics
+from module.wire import WireFormat, decode_frame, encode_frame, result_format
+
+if TYPE_CHECKING:
+    import websocket
+
+
+FAILOVER_POLL_INTERVAL = 0.02  # Как часто запрос проверяет, открыта ли сессия на другом сервере, секунды
+
+logger = getLogger(__name__)
+
+
+class WebSocketSession(Thread):
+    """Супервизор WebSocket-сессии.
+
+    Поток спит в блокирующем чтении сокета и просыпается только при входящем кадре или по
+    таймауту heartbeat. Потерянное соединение восстанавливается сразу: серверы пробуются по очереди
+    без задержки, а когда в этом круге отказали все, следующий круг начинается с экспоненциальной
+    задержкой и джиттером.
+
+    Сессия открывается на лучшем сервере из EndpointPool. Если он стал недоступен, сессия сразу
+    переоткрывается на другом; если другой сервер заметно быстрее, переход выполняется, когда
+    у сессии нет ожидающих запросов. После перехода у сессии новый session_id (room_id).
+    """
+
+    def __init__(self, server_config: ServerConfig, endpoints: EndpointPool):
+        super().__init__(daemon=True)
+        self.__server = server_config
+        self.__endpoints = endpoints
+        self.__endpoint: Optional[Endpoint] = None
+        self.__running = True
+        self.__stopped = Event()
+        self.__ready = Event()
+        self.__ws: Optional["websocket.WebSocket"] = None
+        self.__session_id: Optional[str] = None
+        self.__dispatcher = ResponseDispatcher()
+        self.__failures = 0
+        self.__connect_listeners: List[Callable[[str], None]] = []
+        self.__reconnect_requested = Event()  # Переподключение запрошено из другого потока
+        self.__endpoints.add_unhealthy_listener(self.__on_endpoint_unhealthy)
+
+    def run(self) -> None:
+        logger.info("WebSocket supervisor started")
+        lost_at = None
+        attempted: Set[Endpoint] = set()  # Серверы, к которым не удалось подключиться в текущем круге
+        while self.__running:
+            endpoint = self.__endpoints.preferred(self.__endpoint)
+            if endpoint in attempted:
+                endpoint = next((candidate for candidate in self.__endpoints.ranked() if candidate not in attempted), endpoint)
+            if not self.__connect(endpoint):
+                attempted.add(endpoint)
+                if any(candidate not in attempted for candidate in self.__endpoints.endpoints):
+                    continue  # Есть сервер, который в этом круге ещё не пробовали: без ожидания
+                attempted.clear()
+                delay = self.__next_delay()
+                logger.info(f"Повторное подключение к WebSocket через {delay:.1f} сек...")
+                self.__stopped.wait(delay)
+                continue
+            attempted.clear()
+
+            if lost_at is not None:
+                metrics.inc("reconnects_total")
+                metrics.observe("stage_seconds", time.perf_counter() - lost_at, stage="reconnect")
+
+            self.__read_loop()
+            self.__disconnect()
+            self.__reconnect_requested.clear()
+            lost_at = time.perf_counter()
+
+        logger.info("WebSocket supervisor stopped")
+
+    def __connect(self, endpoint: Endpoint) -> bool:
+        import websocket  # Загружается в потоке супервизора, а не при запуске приложения
+
+        started = time.perf_counter()
+        try:
+            ws = websocket.WebSocket()
+            ws.connect(endpoint.websocket_url, timeout=self.__server.connect_timeout)
+            greeting = json.loads(ws.recv())
+            session_id = (greeting.get("room_id") or "").replace("room_", "")
+            if not session_id:
+                logger.error(f"Не удалось получить session_id из приветствия {endpoint.address}: {greeting}")
+                ws.close()
+                self.__failures += 1
+                self.__endpoints.record(endpoint, ok=False)
+                return False
+        except Exception as e:
+            logger.error(f"Ошибка подключения к WebSocket {endpoint.address}: {e}")
+            self.__failures += 1
+            self.__endpoints.record(endpoint, ok=False)
+            return False
+
+        self.__endpoints.record(endpoint, ok=True, latency=time.perf_counter() - started)
+        if self.__endpoint is not None and self.__endpoint is not endpoint:
+            metrics.inc("endpoint_switches_total")
+            logger.info(f"Сессия перенесена с {self.__endpoint.address} на {endpoint.address}")
+        ws.settimeout(self.__server.ws_ping_interval)
+        self.__ws = ws
+        self.__endpoint = endpoint
+        self.__session_id = session_id
+        self.__failures = 0
+        self.__ready.set()
+        logger.info(f"Успешное подключение к WebSocket {endpoint.address}, получен session_id: {session_id}")
+        for listener in list(self.__connect_listeners):
+            try:
+                listener(session_id)
+            except Exception as e:
+                logger.error(f"Ошибка обработчика подключения WebSocket: {e}")
+        return True
+
+    def __read_loop(self) -> None:
+        import websocket
+        from websocket import ABNF
+
+        ping_sent: Optional[float] = None  # Когда отправлен ping, на который ещё нет ответа
+        while self.__running:
+            try:
+                opcode, frame = self.__ws.recv_data_frame(True)
+            except websocket.WebSocketTimeoutException:
+                if ping_sent is not None:
+                    logger.warning("Сервер не ответил на ping, соединение WebSocket считается потерянным.")
+                    self.__endpoints.record(self.__endpoint, ok=False)
+                    return
+                if self.__dispatcher.pending == 0 and self.__endpoints.preferred(self.__endpoint) is not self.__endpoint:
+                    logger.info("Найден более быстрый сервер, сессия будет перенесена")
+                    return
+                try:
+                    self.__ws.ping()
+                except Exception as e:
+                    logger.warning(f"Не удалось отправить ping: {e}")
+                    return
+                ping_sent = time.perf_counter()
+                continue
+            except Exception as e:
+                if self.__running and not self.__reconnect_requested.is_set():
+                    logger.warning(f"Соединение WebSocket потеряно: {e}")
+                return
+
+            if opcode == ABNF.OPCODE_PONG and ping_sent is not None:
+                # Задержка сессии для EndpointPool: запросы кадрами её не измеряют
+                self.__endpoints.record(self.__endpoint, ok=True, latency=time.perf_counter() - ping_sent)
+            ping_sent = None  # Любой кадр подтверждает, что соединение живо
+            if opcode == ABNF.OPCODE_TEXT:
+                metrics.inc("bytes_received_total", len(frame.data))
+                self.__on_message(frame.data.decode("utf-8"))
+            elif opcode == ABNF.OPCODE_BINARY:
+                metrics.inc("bytes_received_total", len(frame.data))
+                self.__on_binary_message(frame.data)
+            elif opcode == ABNF.OPCODE_CLOSE:
+                if self.__running:
+                    logger.warning("Сервер закрыл соединение WebSocket.")
+                return
+
+    def __on_message(self, raw: str) -> None:
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.error(f"Получен некорректный кадр WebSocket: {loggable(raw)}")
+            return
+        self.__dispatcher.dispatch(message)
+
+    def __on_binary_message(self, data: bytes) -> None:
+        """Результат в формате, согласованном через get_config: MessagePack или JSON, возможно сжатый."""
+        try:
+            message = decode_frame(data)
+        except Exception as e:
+            logger.error(f"Получен некорректный бинарный кадр WebSocket ({len(data)} байт): {e}")
+            return
+        self.__dispatcher.dispatch(message)
+
+    def __disconnect(self) -> None:
+        self.__ready.clear()
+        self.__session_id = None
+        # Результаты старой сессии уже не придут: ожидающие запросы завершаются сразу
+        self.__dispatcher.fail_all(ConnectionError("Соединение WebSocket потеряно"))
+        if self.__ws:
+            self.__ws.close()
+            self.__ws = None
+
+    def __next_delay(self) -> float:
+        cap = min(
+            self.__server.ws_reconnect_max_delay,
+            self.__server.ws_reconnect_min_delay * 2 ** (self.__failures - 1)
+        )
+        return random.uniform(cap / 2, cap)
+
+    def __on_endpoint_unhealthy(self, endpoint: Endpoint) -> None:
+        """Вызывается в потоке, учитывающем ошибку запроса: сессию переносит супервизор, поток только будит его."""
+        if endpoint is self.__endpoint:
+            logger.info(f"Сервер {endpoint.address} недоступен, сессия будет перенесена")
+            self.__wake_supervisor()
+
+    def add_connect_listener(self, listener: Callable[[str], None]) -> None:
+        """Подписывает listener на каждое успешное подключение; вызывается в потоке супервизора с новым session_id."""
+        self.__connect_listeners.append(listener)
+
+    def reconnect(self) -> None:
+        """Разрывает текущее соединение; супервизор сразу подключится заново с актуальными настройками.
+
+        Сокет только закрывается на чтение и запись (abort), без ожидания ответного кадра close: чтение
+        в потоке супервизора прерывается, и закрытие сессии выполняет он сам.
+        """
+        if self.__ws:
+            logger.info("Переподключение WebSocket по запросу...")
+            self.__wake_supervisor()
+
+    def __wake_supervisor(self) -> None:
+        """Прерывает чтение в потоке супервизора; закрытие сессии и выбор сервера выполняет он."""
+        self.__reconnect_requested.set()
+        ws = self.__ws
+        if ws:
+            ws.abort()
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Ожидает активную сессию не дольше timeout секунд."""
+        return self.__ready.wait(timeout)
+
+    def failover(self, session_id: Optional[str], timeout: float) -> bool:
+        """Переносит сессию session_id, сервер которой не принял запрос, и ждёт новую не дольше timeout секунд.
+
+        Если сессию уже перенёс другой запрос или сам супервизор, разрыв не повторяется: ожидается
+        только сессия с другим session_id.
+        """
+        if session_id is not None and self.__session_id == session_id:
+            logger.info("Сервер сессии не принял запрос, сессия будет перенесена")
+            self.__wake_supervisor()
+        deadline = time.monotonic() + timeout
+        while self.__running and self.__ready.wait(max(deadline - time.monotonic(), 0)):
+            if self.__session_id not in (None, session_id):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            self.__stopped.wait(FAILOVER_POLL_INTERVAL)
+        return False
+
+    def expect(self, request_id: str) -> Future:
+        """Регистрирует ожидание результата; регистрировать нужно до отправки запроса."""
+        return self.__dispatcher.register(request_id)
+
+    def send(self, message: Dict[str, Any], wire: WireFormat) -> int:
+        """Отправляет сообщение кадром текущей сессии в согласованном формате; возвращает размер кадра в байтах."""
+        from websocket import ABNF
+
+        ws = self.__ws
+        if ws is None or not self.__ready.is_set():
+            raise ConnectionError("WebSocket не подключен")
+        binary, data = encode_frame(message, result_format(wire))
+        try:
+            # websocket-client сериализует отправку кадров своей блокировкой, ping супервизора не мешает
+            ws.send(data, ABNF.OPCODE_BINARY if binary else ABNF.OPCODE_TEXT)
+        except Exception as e:
+            raise ConnectionError(f"Не удалось отправить кадр WebSocket: {e}") from e
+        return len(data)
+
+    def discard(self, request_id: str) -> None:
+        self.__dispatcher.discard(request_id)
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.__session_id
+
+    @property
+    def endpoint(self) -> Optional[Endpoint]:
+        """Сервер текущей сессии; запросы перевода отправляются на него же, где живёт room_id."""
+        return self.__endpoint
+
+    @property
+    def connected(self) -> bool:
+        return self.__ready.is_set()
+
+    def stop(self) -> None:
+        self.__running = False
+        self.__stopped.set()
+        self.__dispatcher.fail_all(ConnectionError("WebSocket-сессия остановлена"))
+        ws = self.__ws
+        if ws:
+            logger.info("Закрытие WebSocket соединения...")
+            ws.abort()  # Сессию закроет супервизор, прервавшись в чтении
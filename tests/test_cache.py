@@ -0,0 +1,45 @@
+"""Кэш переводов: упреждающая проверка без побочных эффектов, отложенная запись времени обращения."""
+import sqlite3
+from module.cache import TranslationCache
+
+
+def accessed(path) -> float:
+    return sqlite3.connect(path).execute("SELECT accessed FROM translations").fetchone()[0]
+
+
+def test_peek_has_no_side_effects(tmp_path):
+    cache = TranslationCache(10, 3600, 100, str(tmp_path / "cache.sqlite3"))
+    cache.put("Hello", "yandex", "ru", "Привет")
+
+    assert cache.peek("Hello", "yandex", "ru") == "Привет"
+    assert cache.peek("Bye", "yandex", "ru") is None
+    assert (cache.hits, cache.misses) == (0, 0)
+    cache.close()
+
+
+def test_peek_reads_disk_tier(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranslationCache(10, 3600, 100, path)
+    cache.put("Hello", "yandex", "ru", "Привет")
+    cache.close()
+
+    reopened = TranslationCache(10, 3600, 100, path)
+    assert reopened.peek("Hello", "yandex", "ru") == "Привет"
+    assert reopened.stats()["memory_entries"] == 0
+    reopened.close()
+
+
+def test_disk_hit_defers_access_time(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranslationCache(10, 3600, 100, path)
+    cache.put("Hello", "yandex", "ru", "Привет")
+    cache.close()
+    written = accessed(path)
+
+    reopened = TranslationCache(10, 3600, 100, path)
+    assert reopened.get("Hello", "yandex", "ru") == "Привет"
+    assert reopened.stats()["disk_hits"] == 1
+    assert accessed(path) == written  # Горячий путь не пишет в базу
+
+    reopened.close()
+    assert accessed(path) > written
@@ -0,0 +1,53 @@
+"""Маршрутизация кадров WebSocket к ожидающим запросам по request_id."""
+import pytest
+from module.dispatcher import ResponseDispatcher
+
+
+def result(request_id: str, text: str, nested: bool = False) -> dict:
+    if nested:
+        return {"result": {"request_id": request_id, "result": {"text": text}}}
+    return {"request_id": request_id, "result": {"result": {"text": text}}}
+
+
+def test_results_are_routed_by_request_id_in_any_order():
+    dispatcher = ResponseDispatcher()
+    futures = {request_id: dispatcher.register(request_id) for request_id in "abc"}
+    dispatcher.dispatch(result("c", "third"))
+    dispatcher.dispatch(result("a", "first", nested=True))
+    dispatcher.dispatch(result("b", "second"))
+
+    texts = {request_id: future.result(timeout=0)["result"] for request_id, future in futures.items()}
+    assert texts["a"]["result"]["text"] == "first"
+    assert texts["b"]["result"]["text"] == "second"
+    assert texts["c"]["result"]["text"] == "third"
+    assert dispatcher.pending == 0
+
+
+def test_unknown_request_id_does_not_reach_pending_request():
+    dispatcher = ResponseDispatcher()
+    future = dispatcher.register("a")
+    dispatcher.dispatch(result("z", "stray"))
+    assert not future.done()
+    assert dispatcher.pending == 1
+
+
+def test_late_result_of_discarded_request_is_dropped():
+    dispatcher = ResponseDispatcher()
+    abandoned = dispatcher.register("a")
+    dispatcher.discard("a")
+    waiting = dispatcher.register("b")
+    dispatcher.dispatch(result("a", "late"))
+
+    assert not abandoned.done() and not waiting.done()
+    assert dispatcher.pending == 1
+
+
+def test_fail_all_fails_every_pending_request():
+    dispatcher = ResponseDispatcher()
+    futures = [dispatcher.register(request_id) for request_id in "ab"]
+    dispatcher.fail_all(ConnectionError("Соединение WebSocket потеряно"))
+
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result(timeout=0)
+    assert dispatcher.pending == 0
@@ -0,0 +1,54 @@
+"""Переподключение WebSocket-сессии и перенос на другой сервер, когда серверы недоступны."""
+import time
+from types import SimpleNamespace
+from benchmarks.harness import headless_client
+from benchmarks.stand_in_server import StandInServer, fake_translate
+from module.endpoints import EndpointPool
+from module.ws_session import WebSocketSession
+
+
+DEAD_ENDPOINTS = ["127.0.0.1:1", "127.0.0.1:2"]
+
+
+class CountingPool(EndpointPool):
+    def __init__(self, server_config):
+        super().__init__(server_config, http=None)
+        self.failures = {}
+
+    def record(self, endpoint, ok, latency=None):
+        if not ok:
+            self.failures[endpoint.address] = self.failures.get(endpoint.address, 0) + 1
+        super().record(endpoint, ok, latency)
+
+
+def test_supervisor_backs_off_when_every_endpoint_is_down():
+    server_config = SimpleNamespace(
+        endpoint_addresses=DEAD_ENDPOINTS, endpoint_ewma_alpha=0.3, endpoint_probe_interval=15,
+        connect_timeout=0.5, ws_ping_interval=1, ws_reconnect_min_delay=0.2, ws_reconnect_max_delay=1,
+    )
+    pool = CountingPool(server_config)
+    session = WebSocketSession(server_config, pool)
+    session.start()
+    time.sleep(1.5)
+    session.stop()
+    session.join(timeout=2)
+
+    # Круг — по попытке на каждый сервер, между кругами задержка 0.1–0.2, 0.2–0.4, 0.4–0.8 сек...
+    assert set(pool.failures) == set(DEAD_ENDPOINTS)
+    assert all(count <= 8 for count in pool.failures.values()), pool.failures
+
+
+def test_translate_waits_for_failover_when_session_server_hangs():
+    servers = {f"127.0.0.1:{server.port}": server for server in (StandInServer().start(), StandInServer().start())}
+    try:
+        with headless_client(0, server_overrides={"endpoints": list(servers)}) as (config, listener, *_):
+            client = listener.client
+            hung = client.ws.endpoint.address
+            servers.pop(hung).stop(close_sessions=False)  # Сессия не узнаёт о сбое до отказа запроса
+
+            text = "Sample sentence for the failover test."
+            assert client.translate(text, "yandex", "en") == fake_translate(text, "yandex", "en")
+            assert client.ws.endpoint.address in servers
+    finally:
+        for server in servers.values():
+            server.stop()
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""Выбор сервера по сглаженной задержке и доле ошибок."""
+from types import SimpleNamespace
+from module.endpoints import UNHEALTHY_AFTER_FAILURES, EndpointPool
+
+
+def make_pool(*addresses: str) -> EndpointPool:
+    server_config = SimpleNamespace(endpoint_addresses=list(addresses), endpoint_ewma_alpha=0.5)
+    return EndpointPool(server_config, http=None)
+
+
+def test_ranked_by_latency_then_order():
+    pool = make_pool("a:1", "b:1", "c:1")
+    a, b, c = pool.endpoints
+    assert pool.ranked() == [a, b, c]  # Без замеров — в порядке настроек
+
+    pool.record(a, ok=True, latency=0.3)
+    pool.record(b, ok=True, latency=0.05)
+    assert pool.ranked() == [b, c, a]
+
+
+def test_errors_outweigh_latency():
+    pool = make_pool("a:1", "b:1")
+    a, b = pool.endpoints
+    pool.record(a, ok=True, latency=0.02)
+    pool.record(b, ok=True, latency=0.04)
+    pool.record(a, ok=False)
+    assert pool.ranked() == [b, a]
+
+
+def test_preferred_keeps_current_unless_much_better():
+    pool = make_pool("a:1", "b:1")
+    a, b = pool.endpoints
+    pool.record(a, ok=True, latency=0.10)
+    pool.record(b, ok=True, latency=0.09)
+    assert pool.preferred(a) is a
+
+    pool.record(b, ok=True, latency=0.01)
+    assert pool.preferred(a) is b
+
+
+def test_unhealthy_listener_fires_once_and_endpoint_drops_to_end():
+    pool = make_pool("a:1", "b:1")
+    a, b = pool.endpoints
+    unhealthy = []
+    pool.add_unhealthy_listener(unhealthy.append)
+
+    for _ in range(UNHEALTHY_AFTER_FAILURES + 2):
+        pool.record(a, ok=False)
+    assert unhealthy == [a]
+    assert not a.healthy
+    assert pool.ranked() == [b, a]
+    assert pool.preferred(a) is b
+
+    pool.record(a, ok=True, latency=0.01)
+    assert a.healthy
+
+
+def test_reload_keeps_statistics_of_remaining_endpoints():
+    server_config = SimpleNamespace(endpoint_addresses=["a:1", "b:1"], endpoint_ewma_alpha=0.5)
+    pool = EndpointPool(server_config, http=None)
+    a = pool.endpoints[0]
+    pool.record(a, ok=True, latency=0.2)
+
+    server_config.endpoint_addresses = ["c:1", "a:1"]
+    pool.reload()
+    assert [endpoint.address for endpoint in pool.endpoints] == ["c:1", "a:1"]
+    assert pool.endpoints[1] is a and a.latency == 0.2 and a.order == 1
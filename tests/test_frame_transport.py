@@ -0,0 +1,40 @@
+"""Запросы кадрами в WebSocket учитываются в оценке сервера, как POST."""
+import time
+import pytest
+from benchmarks.harness import headless_client
+from benchmarks.stand_in_server import StandInServer, fake_translate
+from translation_client import TranslationError
+
+
+@pytest.fixture
+def server():
+    server = StandInServer(offer_ws_translate=True).start()
+    yield server
+    server.stop()
+
+
+def test_lost_frame_result_counts_as_endpoint_failure(server):
+    with headless_client(server.port, server_overrides={"read_timeout": 0.3}) as (config, listener, *_):
+        client = listener.client
+        endpoint = client.ws.endpoint
+        text = "Sample sentence for the frame transport test."
+        assert client.translate(text, "yandex", "en") == fake_translate(text, "yandex", "en")
+        assert server.stats["translate_requests"] == 1
+        assert (endpoint.consecutive_failures, endpoint.error_rate) == (0, 0.0)
+
+        server.drop_rate = 1.0
+        with pytest.raises(TranslationError) as error:
+            client.translate(text, "yandex", "en")
+        assert error.value.kind == "timeout"
+        assert endpoint.consecutive_failures == 1
+        assert endpoint.error_rate > 0
+
+
+def test_session_latency_is_measured_by_ping(server):
+    with headless_client(server.port, server_overrides={"ws_ping_interval": 0.1}) as (config, listener, *_):
+        endpoint = listener.client.ws.endpoint
+        endpoint.latency = 5.0
+        deadline = time.monotonic() + 5
+        while endpoint.latency == 5.0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert endpoint.latency < 5.0
@@ -0,0 +1,43 @@
+"""Кэш автомата глоссария: JSON с хешем файла, испорченный кэш собирается заново."""
+import json
+from module.glossary import Automaton, Glossary, build_automaton, is_valid_automaton
+
+
+ENTRIES = {"API": None, "Hub": "Хаб", "Translate HUB": {"ru": "Переводчик HUB", "*": "Translate HUB"}}
+TEXT = "Translate HUB calls the API of the Hub, not RAPID."
+MASKED = "⟦0⟧ calls the ⟦1⟧ of the ⟦2⟧, not RAPID."
+
+
+def make_glossary(tmp_path):
+    path = tmp_path / "glossary.json"
+    path.write_text(json.dumps(ENTRIES), encoding="utf-8")
+    glossary = Glossary(str(path), str(tmp_path / "glossary.cache.json"))
+    glossary.load()
+    return glossary
+
+
+def test_cached_automaton_masks_like_compiled(tmp_path):
+    compiled = make_glossary(tmp_path).mask(TEXT, "ru")
+    cached = make_glossary(tmp_path).mask(TEXT, "ru")
+    assert compiled == cached
+    assert cached.text == MASKED
+    assert cached.replacements == ["Переводчик HUB", "API", "Хаб"]
+
+
+def test_corrupted_cache_is_rebuilt(tmp_path):
+    make_glossary(tmp_path)
+    cache_path = tmp_path / "glossary.cache.json"
+    cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    cache["automaton"][1][3] = 3  # Суффиксная ссылка узла на себя зациклила бы поиск
+    cache_path.write_text(json.dumps(cache), encoding="utf-8")
+    assert make_glossary(tmp_path).mask(TEXT, "ru").text == MASKED
+
+
+def test_is_valid_automaton():
+    terms = ["he", "she", "his", "hers"]
+    automaton = build_automaton(terms)
+    assert is_valid_automaton(automaton, len(terms))
+    assert not is_valid_automaton(automaton, len(terms) - 1)
+    goto = [dict(node) for node in automaton.goto]
+    goto[1]["x"] = 0
+    assert not is_valid_automaton(Automaton(goto, *automaton[1:]), len(terms))
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""Выученный срок дублирования запросов."""
+from types import SimpleNamespace
+from module.hedging import HEDGE_DEFAULT_DEADLINE, HEDGE_MIN_DEADLINE, Hedger
+
+
+def make_hedger() -> Hedger:
+    return Hedger(SimpleNamespace(hedge_deadline=0, hedge_translator="google"), max_workers=1)
+
+
+def test_learned_deadline_stays_below_slow_tail():
+    hedger = make_hedger()
+    assert hedger.deadline("yandex") == HEDGE_DEFAULT_DEADLINE
+    for index in range(100):
+        hedger.observe("yandex", 1.0 if index % 10 == 0 else 0.3)  # 10% медленных ответов
+    assert hedger.deadline("yandex") == 0.3
+    hedger.shutdown()
+
+
+def test_interrupted_requests_count_as_deadline():
+    hedger = make_hedger()
+    for _ in range(50):
+        hedger.observe("yandex", 0.05)
+    hedger.observe("yandex", 0.01, completed=False)  # Отменён раньше срока: не учитывается
+    for _ in range(50):
+        hedger.observe("yandex", 5.0, completed=False)  # Проигравшие запросы учитываются сроком
+    assert hedger.deadline("yandex") == HEDGE_MIN_DEADLINE
+    hedger.shutdown()
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""Определение языка обычных предложений близких языков одной письменности."""
+import pytest
+from module.langid import detect_language, is_confident, normalize
+
+
+RUSSIAN = [
+    "Вчера вечером мы долго гуляли по набережной и обсуждали планы на лето.",
+    "Новая версия программы работает быстрее и потребляет меньше памяти.",
+    "Мой брат учится в университете и мечтает стать инженером.",
+    "Я не понимаю, почему поезд опять опаздывает на полчаса.",
+    "Нажмите кнопку ниже, чтобы подтвердить адрес электронной почты.",
+    "Дети быстро растут, и вещи приходится покупать каждый год.",
+]
+UKRAINIAN = [
+    "Вчора ввечері ми довго гуляли набережною і обговорювали плани на літо.",
+    "Нова версія програми працює швидше і споживає менше пам'яті.",
+    "Мій брат навчається в університеті та мріє стати інженером.",
+    "Я не розумію, чому потяг знову запізнюється на пів години.",
+    "Натисніть кнопку нижче, щоб підтвердити адресу електронної пошти.",
+    "Ми отримали ваш лист і відповімо протягом двох робочих днів.",
+]
+# Предложения, на которых профили ошибались или сомневались: уверенно язык определяться не должен
+AMBIGUOUS_RUSSIAN = [
+    "Пожалуйста, проверьте документы перед отправкой, иначе заявку вернут на доработку.",
+    "Отправьте, пожалуйста, отчёт до конца недели.",
+    "Сервер временно недоступен, повторите попытку позже.",
+]
+
+
+@pytest.mark.parametrize("language, text", [("ru", text) for text in RUSSIAN] + [("uk", text) for text in UKRAINIAN])
+def test_confident_detection(language, text):
+    detection = detect_language(text)
+    assert detection.language == language
+    assert is_confident(detection)
+
+
+@pytest.mark.parametrize("text", AMBIGUOUS_RUSSIAN)
+def test_never_confidently_wrong(text):
+    detection = detect_language(text)
+    assert detection.language == "ru" or not is_confident(detection)
+
+
+def test_short_text_is_not_detected():
+    assert detect_language("Привет, как дела?") is None
+
+
+def test_normalize_keeps_only_letters():
+    assert normalize("Ошибка 404: файл_не найден!").split() == ["ошибка", "файл", "не", "найден"]
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""Очередь запросов без связи: порядок, повторы, вытеснение и устаревание записей."""
+import time
+from module.outbox import Outbox
+
+
+def texts(outbox: Outbox):
+    return [entry.text for entry in outbox.pending()]
+
+
+def test_entries_survive_reopen_in_order(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    outbox = Outbox(3600, 10, path)
+    for text in ("first", "second", "first"):
+        assert outbox.add(text, "yandex", "ru")
+    outbox.add("first", "google", "ru")
+    outbox.close()
+
+    reopened = Outbox(3600, 10, path)
+    assert [(entry.text, entry.translator_code) for entry in reopened.pending()] == [
+        ("first", "yandex"), ("second", "yandex"), ("first", "google")
+    ]
+    reopened.remove(reopened.pending()[0].id)
+    assert texts(reopened) == ["second", "first"]
+    reopened.close()
+
+
+def test_oldest_entries_are_evicted(tmp_path):
+    outbox = Outbox(3600, 3, str(tmp_path / "outbox.sqlite3"))
+    for index in range(5):
+        outbox.add(f"text {index}", "yandex", "ru")
+    assert texts(outbox) == ["text 2", "text 3", "text 4"]
+    outbox.close()
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    outbox = Outbox(0.05, 10, str(tmp_path / "outbox.sqlite3"))
+    outbox.add("stale", "yandex", "ru")
+    time.sleep(0.1)
+    outbox.add("fresh", "yandex", "ru")
+    assert texts(outbox) == ["fresh"]
+    assert len(outbox) == 1
+    outbox.close()
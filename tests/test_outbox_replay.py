@@ -0,0 +1,58 @@
+"""Отправка очереди запросов после переподключения."""
+import sys
+import time
+from threading import Event
+import pytest
+from benchmarks.harness import headless_client
+from benchmarks.stand_in_server import StandInServer, fake_translate
+
+
+@pytest.fixture
+def server():
+    server = StandInServer().start()
+    yield server
+    server.stop()
+
+
+def replay(listener, texts, timeout: float = 10):
+    """Ставит texts в очередь, переподключает сессию и ждёт, пока очередь переведётся."""
+    replayed, done = [], Event()
+
+    def on_replayed(entry, translated_text, copied):
+        replayed.append((entry.text, translated_text, copied))
+        if len(replayed) == len(texts):
+            done.set()
+
+    listener.add_outbox_listener(on_replayed)
+    for text in texts:
+        assert listener.outbox.add(text, "yandex", "ru")
+    listener.client.ws.reconnect()
+    assert done.wait(timeout)
+    return replayed
+
+
+def test_replay_translates_queue_and_copies_latest(server):
+    with headless_client(server.port, user_overrides={"outbox_enabled": True}) as (config, listener, clipboard, _):
+        texts = [f"Queued sentence number {index}." for index in range(3)]
+        clipboard.set(texts[1])
+        replayed = replay(listener, texts)
+
+        assert sorted(replayed) == sorted(
+            (text, fake_translate(text, "yandex", "ru"), text == texts[1]) for text in texts
+        )
+        assert clipboard.paste() == fake_translate(texts[1], "yandex", "ru")
+        assert len(listener.outbox) == 0
+
+
+def test_clipboard_error_does_not_break_replay(server, monkeypatch):
+    with headless_client(server.port, user_overrides={"outbox_enabled": True}) as (config, listener, clipboard, _):
+        def broken_paste():
+            raise RuntimeError("clipboard is locked")
+
+        monkeypatch.setattr(sys.modules["pyperclip"], "paste", broken_paste)
+        text = "Queued sentence with a broken clipboard."
+        assert replay(listener, [text]) == [(text, fake_translate(text, "yandex", "ru"), False)]
+        deadline = time.monotonic() + 5
+        while len(listener.outbox) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(listener.outbox) == 0
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""Сопоставление результатов с запросами, когда сервер возвращает или не возвращает request_id."""
+import pytest
+from benchmarks.harness import headless_client
+from benchmarks.stand_in_server import StandInServer, fake_translate
+from module.dispatcher import ResponseDispatcher
+from module.segmenter import split_into_chunks
+
+
+CHUNK_MAX_CHARS = 80
+
+
+def make_text(sentences: int) -> str:
+    return " ".join(f"Sentence number {index} of the test text." for index in range(sentences))
+
+
+def expected_translation(text: str) -> str:
+    return "".join(
+        chunk.prefix + fake_translate(chunk.text, "yandex", "en") + chunk.suffix
+        for chunk in split_into_chunks(text, CHUNK_MAX_CHARS)
+    )
+
+
+def test_frame_without_request_id_goes_to_single_pending_request():
+    dispatcher = ResponseDispatcher()
+    future = dispatcher.register("a")
+    dispatcher.dispatch({"result": {"result": {"text": "x"}}})
+    assert future.result(timeout=0)["result"]["result"]["text"] == "x"
+
+
+def test_frame_without_request_id_is_dropped_with_several_pending():
+    dispatcher = ResponseDispatcher()
+    first, second = dispatcher.register("a"), dispatcher.register("b")
+    dispatcher.dispatch({"result": {"result": {"text": "x"}}})
+    assert not first.done() and not second.done()
+    assert dispatcher.pending == 2
+
+
+@pytest.mark.parametrize("echo", [False, True])
+def test_chunks_keep_order(echo):
+    server = StandInServer(jitter=0.05, echo_request_id=echo).start()
+    try:
+        with headless_client(server.port, {"chunk_max_chars": CHUNK_MAX_CHARS}) as (config, listener, _, _):
+            assert listener.client.pipelined is echo
+            text = make_text(40)
+            assert len(split_into_chunks(text, CHUNK_MAX_CHARS)) > config.server.chunk_window
+            for _ in range(3):
+                assert listener.client.translate_text(text, "yandex", "en") == expected_translation(text)
+    finally:
+        server.stop()
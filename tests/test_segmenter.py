@@ -0,0 +1,43 @@
+"""Деление длинного текста на куски и обратная склейка с исходными пробелами."""
+import pytest
+from module.segmenter import split_into_chunks, split_into_segments
+
+
+TEXTS = [
+    "First sentence. Second one!  Third?\n\nNew paragraph… «Quoted.» (Bracketed.) End",
+    "  \tLeading whitespace and trailing newlines.\n\n\n",
+    "Строка без точки\nи ещё одна строка\r\nи последняя",
+    "Word " * 60 + "and a tail.",
+    "x" * 250,
+    "一句话。第二句话！第三句话？",
+    "",
+]
+
+
+def joined(chunks) -> str:
+    return "".join(chunk.prefix + chunk.text + chunk.suffix for chunk in chunks)
+
+
+@pytest.mark.parametrize("split", [split_into_chunks, split_into_segments])
+@pytest.mark.parametrize("text", TEXTS)
+def test_reassembly_restores_original_text(split, text):
+    chunks = split(text, 40)
+    assert joined(chunks) == text
+    assert all(len(chunk.text) <= 40 for chunk in chunks)
+
+
+def test_chunks_pack_sentences_up_to_limit():
+    text = " ".join(f"Sentence {index}." for index in range(10))
+    chunks = split_into_chunks(text, 40)
+    assert [chunk.text for chunk in chunks] == [
+        "Sentence 0. Sentence 1. Sentence 2.",
+        "Sentence 3. Sentence 4. Sentence 5.",
+        "Sentence 6. Sentence 7. Sentence 8.",
+        "Sentence 9.",
+    ]
+
+
+def test_long_sentence_is_split_at_spaces():
+    text = "alpha bravo charlie delta echo foxtrot golf"
+    segments = split_into_segments(text, 12)
+    assert [segment.text for segment in segments] == ["alpha bravo", "charlie", "delta echo", "foxtrot golf"]
@@ -0,0 +1,83 @@
+"""Память переводов: одна запись на ключ шаблона в индексе и в базе, вытеснение старых записей."""
+import sqlite3
+from module.translation_memory import MinHashIndex, TranslationMemory
+
+
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet"]
+
+
+def ticket(number: int, team: str) -> str:
+    return f"Ticket {number} was assigned to the {team} support team and is waiting for review"
+
+
+def sentence(index: int) -> str:
+    return f"Sentence about {WORDS[index % 10]} {WORDS[index // 10 % 10]} and {WORDS[index // 100]} in a longer text"
+
+
+def open_memory(path, max_entries: int = 100) -> TranslationMemory:
+    memory = TranslationMemory(0.8, max_entries, str(path))
+    memory._TranslationMemory__load()  # Синхронно, без фонового потока load()
+    return memory
+
+
+def test_removed_entries_free_their_slots():
+    index = MinHashIndex()
+    texts = [sentence(i) for i in range(300)]
+    for text in texts[:150]:
+        index.add(text, text.upper())
+    for text in texts[:150]:
+        index.remove(text)
+    for text in texts[150:]:
+        index.add(text, text.upper())
+
+    assert len(index) == 150
+    assert len(index._MinHashIndex__entries) == 150
+    assert index.search(texts[200], 0.8).translation == texts[200].upper()
+    assert index.search(texts[20], 0.99) is None
+
+
+def test_table_and_index_share_template_key(tmp_path):
+    path = tmp_path / "tm.sqlite3"
+    memory = open_memory(path)
+    memory.add(ticket(1, "alpha"), "yandex", "ru", "first")
+    memory.add(ticket(2, "alpha"), "yandex", "ru", "second")
+    memory.close()
+
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM memory").fetchone() == (1,)
+    match = open_memory(path).search(ticket(3, "alpha"), "yandex", "ru")
+    assert (match.source, match.translation, match.similarity) == (ticket(2, "alpha"), "second", 1.0)
+
+
+def test_old_database_is_migrated(tmp_path):
+    path = tmp_path / "tm.sqlite3"
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE memory (id INTEGER PRIMARY KEY, source TEXT NOT NULL, translation TEXT NOT NULL, "
+        "translator TEXT NOT NULL, language TEXT NOT NULL, created REAL NOT NULL)"
+    )
+    db.execute("CREATE UNIQUE INDEX memory_key ON memory (translator, language, source)")
+    db.executemany(
+        "INSERT INTO memory (source, translation, translator, language, created) VALUES (?, ?, 'yandex', 'ru', 0)",
+        [(ticket(1, "alpha"), "old"), (ticket(2, "alpha"), "new"), (ticket(1, "bravo"), "other")]
+    )
+    db.commit()
+    db.close()
+
+    open_memory(path).close()
+    rows = sqlite3.connect(path).execute("SELECT translation FROM memory ORDER BY id").fetchall()
+    assert rows == [("new",), ("other",)]
+
+
+def test_max_entries_evicts_oldest(tmp_path):
+    path = tmp_path / "tm.sqlite3"
+    memory = open_memory(path, max_entries=10)
+    texts = [sentence(i * 11) for i in range(20)]
+    for text in texts:
+        memory.add(text, "yandex", "ru", text.upper())
+    assert memory.search(texts[0], "yandex", "ru") is None
+    assert memory.search(texts[-1], "yandex", "ru").translation == texts[-1].upper()
+    memory.close()
+
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM memory").fetchone() == (20,)
+    open_memory(path, max_entries=10).close()
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM memory").fetchone() == (10,)
\ No newline at end of file
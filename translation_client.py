@@ -0,0 +1,418 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from logging import getLogger
+from threading import Lock, Semaphore, Timer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+from uuid import uuid4
+from config_manager import ConfigurationManager
+from module.endpoints import Endpoint
+from module.glossary import Glossary, restore
+from module.log_pipeline import loggable
+from module.metrics import metrics
+from module.segment_cache import SegmentCache
+from module.segmenter import Chunk, split_into_chunks, split_into_segments
+from module.wire import (
+    TRANSPORT_HTTP, TRANSPORT_WEBSOCKET, WireFormat, encode_request, negotiate, negotiate_transport, result_format
+)
+from module.ws_session import WebSocketSession
+
+
+CANCEL_POLL_INTERVAL = 0.05  # Как часто ожидание результата проверяет отмену, секунды
+SEGMENT_SEPARATOR = "\n"  # Предложения одного запроса разделяются переводом строки, который переводчики сохраняют
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+logger = getLogger(__name__)
+
+
+class TranslationError(Exception):
+    def __init__(self, message: str, kind: str = "error"):
+        super().__init__(message)
+        self.kind = kind  # Тип сбоя для метрики failures_total
+
+
+class TranslationClient:
+    """Протокол перевода: POST на api/v1/translate и ожидание результата в WebSocket-сессии.
+
+    Если сервер предлагает в get_config транспорт "websocket", запрос отправляется кадром в ту же
+    сессию и HTTP не используется; без предложения (или с transport "http") остаётся POST.
+
+    Несколько запросов одновременно в сессии только у сервера, который объявил в get_config
+    "echo_request_id": результат без request_id сопоставляется лишь с единственным ожидающим
+    запросом, поэтому с другим сервером запросы перевода идут по одному.
+    """
+
+    def __init__(self, config_manager: ConfigurationManager):
+        self.__config = config_manager
+        self.ws = WebSocketSession(self.__config.server, self.__config.endpoints)
+        self.__chunk_executor = ThreadPoolExecutor(
+            max_workers=self.__config.server.chunk_window,
+            thread_name_prefix="chunk"
+        )
+        self.__in_flight = Semaphore(1)  # Единственный запрос в сессии, если сервер не возвращает request_id
+        self.__request_listeners: List[Callable[[str, float, bool], None]] = []
+        self.glossary = Glossary()
+        self.segments = SegmentCache(self.__config.user.segment_cache_max_entries)
+
+    def start(self) -> None:
+        self.glossary.load()
+        self.ws.start()
+
+    def stop(self) -> None:
+        self.ws.stop()
+        self.__chunk_executor.shutdown(wait=False, cancel_futures=True)
+
+    def add_request_listener(self, listener: Callable[[str, float, bool], None]) -> None:
+        """Подписывает listener на каждый отправленный запрос перевода: (переводчик, секунды от отправки,
+        получен ли результат). False — ожидание прервано отменой или таймаутом, задержка не меньше указанной."""
+        self.__request_listeners.append(listener)
+
+    @property
+    def pipelined(self) -> bool:
+        """Можно ли держать в сессии несколько запросов одновременно: сервер возвращает request_id."""
+        return self.__config.echoes_request_id
+
+    def translate(self, text: str, translator_code: str, target_lang: str,
+                  hint: Optional[Dict[str, Any]] = None,
+                  is_cancelled: Optional[Callable[[], bool]] = None) -> str:
+        """Переводит один кусок текста, не длиннее лимита сервера.
+
+        hint — похожий перевод из памяти переводов, передаётся серверу как подсказка.
+        Если is_cancelled() становится True, ожидание результата прекращается.
+        """
+        if not self.ws.wait_ready(self.__config.server.ws_ready_timeout):
+            raise TranslationError("WebSocket не подключен", "not_connected")
+        session_id = self.ws.session_id
+
+        payload = {
+            "text": text,
+            "translator_code": translator_code,
+            "target_lang": target_lang,
+        }
+        if hint:
+            payload["hint"] = hint
+
+        request_id = uuid4().hex
+        message = {
+            "method": "translate",
+            "request_id": request_id,
+            "payload": payload
+        }
+        wire = negotiate(self.__config.wire_offer, self.__config.server.wire_format)
+        requested_result = result_format(wire)
+        if requested_result:
+            message["result_format"] = requested_result
+        transport = negotiate_transport(self.__config.transport_offer, self.__config.server.transport)
+
+        gated = not self.pipelined
+        if gated:
+            self.__acquire_slot(is_cancelled)
+        deadline = time.monotonic() + self.__config.server.read_timeout
+        result = self.ws.expect(request_id)
+        submitted = False
+        started = time.perf_counter()
+        try:
+            try:
+                endpoint = self.__submit(transport, message, wire)
+            except TranslationError as e:
+                # Сервер сессии не принял запрос: супервизор переносит сессию на другой сервер,
+                # и запрос отправляется один раз заново, не дожидаясь, пока чтение заметит разрыв
+                if e.kind != "not_connected" or not self.ws.failover(session_id, self.__config.server.ws_ready_timeout):
+                    raise
+                logger.info(f"Запрос {request_id} отправляется заново после переноса сессии")
+                self.ws.discard(request_id)
+                result = self.ws.expect(request_id)
+                endpoint = self.__submit(transport, message, wire)
+            submitted = True
+
+            try:
+                with metrics.timer("stage_seconds", stage="ws_wait"):
+                    translated_text_data = self.__wait_result(result, is_cancelled)
+            except FutureTimeoutError:
+                # Сервер принял запрос, но результат в его сессию не пришёл: это отказ сервера
+                self.__config.endpoints.record(endpoint, ok=False)
+                self.__notify_request(translator_code, started, completed=False)
+                raise TranslationError(
+                    f"Не дождались результата перевода по WebSocket (request_id={request_id})", "timeout"
+                )
+            except TranslationError:
+                self.__notify_request(translator_code, started, completed=False)
+                raise
+            except ConnectionError as e:
+                raise TranslationError(f"{e} до получения результата (request_id={request_id})", "disconnected")
+            self.__notify_request(translator_code, started, completed=True)
+
+            if translated_text_data.get("status") == "error":
+                raise TranslationError(f"Ошибка от API: {loggable(translated_text_data)}", "api_error")
+
+            translated_text = translated_text_data.get("result", {}).get("result", {}).get("text")
+            if translated_text is None:
+                raise TranslationError(
+                    f"Не удалось извлечь переведенный текст из ответа: {loggable(translated_text_data)}", "bad_response"
+                )
+            return translated_text
+        finally:
+            if gated and submitted and not result.done():
+                self.__release_when_settled(request_id, result, deadline)
+            else:
+                self.ws.discard(request_id)
+                if gated:
+                    self.__in_flight.release()
+
+    def __notify_request(self, translator_code: str, started: float, completed: bool) -> None:
+        seconds = time.perf_counter() - started
+        for listener in list(self.__request_listeners):
+            try:
+                listener(translator_code, seconds, completed)
+            except Exception as e:
+                logger.error(f"Ошибка обработчика запроса перевода: {e}")
+
+    def __acquire_slot(self, is_cancelled: Optional[Callable[[], bool]]) -> None:
+        deadline = time.monotonic() + self.__config.server.read_timeout
+        while not self.__in_flight.acquire(timeout=CANCEL_POLL_INTERVAL):
+            if is_cancelled and is_cancelled():
+                raise TranslationError("Перевод отменён: ответ больше не нужен", "cancelled")
+            if time.monotonic() >= deadline:
+                raise TranslationError("Не дождались завершения предыдущего запроса в сессии", "timeout")
+
+    def __release_when_settled(self, request_id: str, result: Future, deadline: float) -> None:
+        """Освобождает сессию для следующего запроса, когда придёт результат брошенного или истечёт его срок.
+
+        Без request_id в ответе поздний результат брошенного запроса достался бы следующему.
+        """
+        lock = Lock()
+        settled = []
+
+        def settle(*_) -> None:
+            with lock:
+                if settled:
+                    return
+                settled.append(True)
+            self.ws.discard(request_id)
+            self.__in_flight.release()
+
+        timer = Timer(max(deadline - time.monotonic(), 0), settle)
+        timer.daemon = True
+        timer.start()
+        result.add_done_callback(settle)
+
+    def __submit(self, transport: str, message: Dict[str, Any], wire: WireFormat) -> Endpoint:
+        """Отправляет запрос выбранным транспортом; возвращает сервер, которому он отправлен."""
+        if transport == TRANSPORT_WEBSOCKET:
+            return self.__submit_frame(message, wire)
+        return self.__submit_post(message, wire)
+
+    def __submit_post(self, message: Dict[str, Any], wire: WireFormat) -> Endpoint:
+        """Отправляет запрос POST-ом; результат придёт в WebSocket-сессию с session_id из запроса."""
+        message["ws_session_id"] = self.ws.session_id
+        body, headers = encode_request(message, wire)
+
+        # room_id существует только на сервере, к которому подключена сессия, поэтому POST идёт туда же
+        endpoint = self.ws.endpoint
+        started = time.perf_counter()
+        try:
+            with metrics.timer("stage_seconds", stage="http_submit"):
+                response = self.__config.http.post(url=endpoint.translate_url, data=body, headers=headers)
+        except Exception as e:
+            self.__config.endpoints.record(endpoint, ok=False)
+            from requests.exceptions import ConnectionError as RequestsConnectionError
+
+            if isinstance(e, RequestsConnectionError):
+                raise TranslationError(f"Сервер недоступен: {e}", "not_connected") from e
+            raise
+        self.__config.endpoints.record(
+            endpoint, ok=response.status_code < 500, latency=time.perf_counter() - started
+        )
+        metrics.inc("requests_total", transport=TRANSPORT_HTTP)
+        metrics.inc("bytes_sent_total", len(body), encoding=wire.encoding, transport=TRANSPORT_HTTP)
+
+        if response.status_code != 200:
+            raise TranslationError(
+                f"Ошибка при отправке запроса: {response.status_code} - {loggable(response.text)}", "http_status"
+            )
+
+        if response.json().get("status") != "success":
+            raise TranslationError(f"Ошибка от API: {loggable(response.json())}", "api_error")
+        return endpoint
+
+    def __submit_frame(self, message: Dict[str, Any], wire: WireFormat) -> Endpoint:
+        """Отправляет запрос кадром в WebSocket-сессию; результат придёт в неё же, без HTTP-запроса.
+
+        Задержку сервера для EndpointPool здесь не измерить: отправка кадра только пишет в сокет, а время
+        до результата включает работу переводчика. Её измеряет сессия по ping, как проверка — по get_config.
+        """
+        endpoint = self.ws.endpoint
+        try:
+            with metrics.timer("stage_seconds", stage="ws_submit"):
+                size = self.ws.send(message, wire)
+        except ConnectionError as e:
+            if endpoint is not None:
+                self.__config.endpoints.record(endpoint, ok=False)
+            raise TranslationError(str(e), "not_connected") from e
+        self.__config.endpoints.record(endpoint, ok=True)
+        metrics.inc("requests_total", transport=TRANSPORT_WEBSOCKET)
+        metrics.inc("bytes_sent_total", size, encoding=wire.encoding, transport=TRANSPORT_WEBSOCKET)
+        return endpoint
+
+    def __wait_result(self, result: Future, is_cancelled: Optional[Callable[[], bool]]) -> Dict[str, Any]:
+        if is_cancelled is None:
+            return result.result(timeout=self.__config.server.read_timeout)
+        deadline = time.monotonic() + self.__config.server.read_timeout
+        while True:
+            try:
+                return result.result(timeout=min(CANCEL_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+            except FutureTimeoutError:
+                if time.monotonic() >= deadline:
+                    raise
+                if is_cancelled():
+                    raise TranslationError("Перевод отменён: ответ больше не нужен", "cancelled")
+
+    def translate_text(self, text: str, translator_code: str, target_lang: str,
+                       on_progress: Optional[Callable[[str], None]] = None,
+                       hint: Optional[Dict[str, Any]] = None,
+                       is_cancelled: Optional[Callable[[], bool]] = None) -> str:
+        """Переводит текст любой длины.
+
+        Текст делится на куски по границам предложений, куски переводятся параллельно (не больше
+        chunk_window одновременно, по одному без эха request_id) и собираются в исходном порядке с исходными пробелами. После
+        каждого готового по порядку куска on_progress получает уже переведённое начало текста.
+        Подсказка hint относится ко всему тексту и передаётся, только если кусок один.
+        Если is_cancelled() возвращает True, ещё не отправленные куски не отправляются,
+        а ожидание отправленных прекращается.
+        Термины глоссария заменяются заполнителями до отправки и восстанавливаются в переводе.
+        """
+        masked = self.glossary.mask(text, target_lang)
+        if masked.replacements:
+            text = masked.text
+            if on_progress:
+                progress = on_progress
+                on_progress = lambda partial: progress(restore(partial, masked.replacements, partial=True))
+        return restore(
+            self.__translate_masked(text, translator_code, target_lang, on_progress, hint, is_cancelled),
+            masked.replacements
+        )
+
+    def __translate_masked(self, text: str, translator_code: str, target_lang: str,
+                           on_progress: Optional[Callable[[str], None]],
+                           hint: Optional[Dict[str, Any]],
+                           is_cancelled: Optional[Callable[[], bool]]) -> str:
+        if self.__config.user.incremental_translation:
+            return self.__translate_segments(text, translator_code, target_lang, on_progress, hint, is_cancelled)
+        chunks = split_into_chunks(text, self.__config.server.chunk_max_chars)
+        if len(chunks) == 1 and chunks[0].text:
+            chunk = chunks[0]
+            return chunk.prefix + self.translate(chunk.text, translator_code, target_lang, hint, is_cancelled) + chunk.suffix
+
+        logger.info(f"Текст длиной {len(text)} символов разбит на {len(chunks)} кусков")
+
+        def translate_chunk(chunk: Chunk) -> str:
+            if not chunk.text:
+                return ""
+            if is_cancelled and is_cancelled():
+                raise TranslationError("Перевод отменён более новым запросом", "cancelled")
+            return self.translate(chunk.text, translator_code, target_lang, is_cancelled=is_cancelled)
+
+        parts = []
+        for chunk, translated in zip(chunks, self.__ordered(translate_chunk, chunks)):
+            parts.append(chunk.prefix + translated + chunk.suffix)
+            if on_progress and len(parts) < len(chunks):
+                on_progress("".join(parts))
+
+        return "".join(parts)
+
+    def __ordered(self, function: Callable[[T], R], items: Iterable[T]) -> Iterator[R]:
+        """Результаты function(item) в порядке items: не больше chunk_window одновременно, если
+        сервер возвращает request_id, иначе по одному."""
+        if not self.pipelined:
+            for item in items:
+                yield function(item)
+            return
+        futures = [self.__chunk_executor.submit(function, item) for item in items]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def __translate_segments(self, text: str, translator_code: str, target_lang: str,
+                             on_progress: Optional[Callable[[str], None]],
+                             hint: Optional[Dict[str, Any]],
+                             is_cancelled: Optional[Callable[[], bool]]) -> str:
+        """Переводит текст по предложениям, отправляя на сервер только те, перевода которых ещё нет.
+
+        Непереведённые предложения объединяются в запросы не длиннее chunk_max_chars
+        через SEGMENT_SEPARATOR; перевод запроса делится обратно по строкам и запоминается для каждого
+        предложения отдельно. Если число строк не совпало, предложения запроса переводятся по одному.
+        """
+        segments = split_into_segments(text, self.__config.server.chunk_max_chars)
+        translated: List[Optional[str]] = [
+            self.segments.get(segment.text, translator_code, target_lang) if segment.text else ""
+            for segment in segments
+        ]
+        # Одинаковые предложения внутри текста отправляются один раз
+        missing: Dict[str, List[int]] = {}
+        for index, translation in enumerate(translated):
+            if translation is None:
+                missing.setdefault(segments[index].text, []).append(index)
+        metrics.inc("segments_reused_total", sum(1 for translation in translated if translation))
+        metrics.inc("segments_sent_total", len(missing))
+        if missing and len(missing) < len(segments):
+            logger.info(f"Изменено предложений: {len(missing)} из {len(segments)}, остальные взяты из памяти")
+        if len(segments) != 1:
+            hint = None  # Подсказка относится ко всему тексту
+
+        batches = self.__make_batches(list(missing))
+
+        def translate_batch(texts: List[str]) -> List[str]:
+            if is_cancelled and is_cancelled():
+                raise TranslationError("Перевод отменён более новым запросом", "cancelled")
+            if len(texts) == 1:
+                results = [self.translate(texts[0], translator_code, target_lang, hint, is_cancelled)]
+            else:
+                lines = self.translate(SEGMENT_SEPARATOR.join(texts), translator_code, target_lang,
+                                       is_cancelled=is_cancelled).split(SEGMENT_SEPARATOR)
+                results = [line.strip() for line in lines]
+                if len(results) != len(texts):
+                    logger.warning(
+                        f"Перевод {len(texts)} предложений вернул {len(results)} строк, предложения переводятся по одному"
+                    )
+                    metrics.inc("segments_split_failed_total")
+                    results = [self.translate(text, translator_code, target_lang, is_cancelled=is_cancelled) for text in texts]
+            for segment_text, result in zip(texts, results):
+                self.segments.put(segment_text, translator_code, target_lang, result)
+            return results
+
+        for number, (batch, results) in enumerate(zip(batches, self.__ordered(translate_batch, batches))):
+            for segment_text, result in zip(batch, results):
+                for index in missing[segment_text]:
+                    translated[index] = result
+            if on_progress and number < len(batches) - 1:
+                on_progress(self.__join_ready(segments, translated))
+        return self.__join_ready(segments, translated)
+
+    def __make_batches(self, texts: List[str]) -> List[List[str]]:
+        """Группирует непереведённые предложения в порядке текста в запросы не длиннее chunk_max_chars."""
+        max_chars = self.__config.server.chunk_max_chars
+        batches: List[List[str]] = []
+        size = 0
+        for text in texts:
+            length = len(text) + len(SEGMENT_SEPARATOR)
+            if batches and size + length <= max_chars:
+                batches[-1].append(text)
+                size += length
+            else:
+                batches.append([text])
+                size = length
+        return batches
+
+    @staticmethod
+    def __join_ready(segments: List[Chunk], translated: List[Optional[str]]) -> str:
+        """Переведённое начало текста: сегменты до первого ещё не переведённого."""
+        parts = []
+        for segment, translation in zip(segments, translated):
+            if translation is None:
+                break
+            parts.append(segment.prefix + translation + segment.suffix)
+        return "".join(parts)
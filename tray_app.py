@@ -1,10 +1,18 @@
 from pystray import Icon, Menu, MenuItem as Item
+from module.translators import BaseEntity, CatalogDiff, Language, Registry, RegistryDiff, Translator
 from module.utils import create_app_icon
 from logging import getLogger
+from typing import TYPE_CHECKING, Callable, Dict
 from config_manager import ConfigurationManager
 from webbrowser import open as open_link
 from key_listener import KeyListener
+from textwrap import shorten
 
+if TYPE_CHECKING:
+    from module.outbox import OutboxEntry  # sqlite3 загружается в потоке KeyListener, а не при запуске
+
+
+OUTBOX_PREVIEW_CHARS = 100  # Сколько символов перевода показывать в уведомлении
 
 logger = getLogger(__name__)
 
@@ -13,8 +21,14 @@ class TrayApp:
     def __init__(self, config_manager: ConfigurationManager) -> None:
         logger.info("Starting TrayApp initialization")        
         self.__config = config_manager
+        self.__icon = None
+        self.__translator_items: Dict[str, Item] = {}
+        self.__language_items: Dict[str, Item] = {}
+        self.__config.add_catalog_listener(self.__on_catalog_update)
+        self.__config.user.add_listener(self.__on_user_config_change)
 
         self.__key_listener = KeyListener(self.__config)  # Инициализируем KeyListener
+        self.__key_listener.add_outbox_listener(self.__on_outbox_replayed)
         self.__key_listener.start()  # Запускаем KeyListener в отдельном потоке
 
         self.__icon = Icon(
@@ -29,37 +43,23 @@ class TrayApp:
         self.__run()
 
     def __create_menu(self) -> Menu:
-        translators = self.__config.translators
-        translator_menu = []
-
-        for translator in translators:
-            t_item = Item(
-                translator.name,
-                self.__on_translator_select(translator),
-                checked=lambda item, t=translator.code: self.__config.user.selected_translator == t
-            )
-            translator_menu.append(t_item)
-
-
-        languages = self.__config.languages
-        language_menu = []
-
-        for language in languages:
-            lang_item = Item(
-                language.name,
-                self.__on_language_select(language),
-                checked=lambda item, lang=language.code: self.__config.user.selected_language == lang
-            )
-            language_menu.append(lang_item)
-
+        self.__translator_items = {
+            translator.code: self.__create_translator_item(translator) for translator in self.__config.translators
+        }
+        self.__language_items = {
+            language.code: self.__create_language_item(language) for language in self.__config.languages
+        }
+
+        # Подменю строятся из текущих словарей при каждой отрисовке, поэтому изменения каталога
+        # применяются заменой отдельных пунктов, без пересоздания меню
         menu = Menu(
             Item(
                 "Переводчик",
-                Menu(*translator_menu)
+                Menu(lambda: tuple(self.__translator_items.values()))
             ),
             Item(
                 "Переводить на",
-                Menu(*language_menu)
+                Menu(lambda: tuple(self.__language_items.values()))
             ),
             Menu.SEPARATOR,
             Item("Информация", self.__on_info),
@@ -69,24 +69,96 @@ class TrayApp:
         logger.info("TrayApp menu initialized successfully")
         return menu
 
-    def __on_language_select(self, language):
+    def __create_translator_item(self, translator: Translator) -> Item:
+        # Название и отметка читаются из Registry при каждой отрисовке: переименование в каталоге
+        # видно без пересоздания пункта
+        translators = self.__config.translators
+        return Item(
+            lambda item, t=translator.code: self.__entity_name(translators, t),
+            self.__on_translator_select(translator.code),
+            checked=lambda item, t=translator.code: t in translators and self.__config.user.selected_translator == t
+        )
+
+    def __create_language_item(self, language: Language) -> Item:
+        languages = self.__config.languages
+        return Item(
+            lambda item, lang=language.code: self.__entity_name(languages, lang),
+            self.__on_language_select(language.code),
+            checked=lambda item, lang=language.code: lang in languages and self.__config.user.selected_language == lang
+        )
+
+    @staticmethod
+    def __entity_name(registry: Registry, code: str) -> str:
+        entity = registry.get(code)
+        return entity.name if entity is not None else code
+
+    @staticmethod
+    def __apply_diff(items: Dict[str, Item], diff: RegistryDiff, registry: Registry,
+                     create_item: Callable[[BaseEntity], Item]) -> Dict[str, Item]:
+        """Новый словарь пунктов в порядке каталога: пункты есть только у кодов из каталога.
+
+        Переименованные пункты не пересоздаются: название они читают из Registry.
+        """
+        if not diff:
+            return items
+        return {
+            entity.code: items[entity.code] if entity.code in items else create_item(entity)
+            for entity in registry
+        }
+
+    def __on_language_select(self, code: str):
         def handler():
+            language = self.__config.languages.get(code)
+            if language is None:
+                return
             logger.info(f'Translation language changed to "{language.name}"')
             self.__config.user.set_language(language)
             self.__icon.update_menu()
         return handler
 
-    def __on_translator_select(self, translator):
+    def __on_translator_select(self, code: str):
         def handler():
+            translator = self.__config.translators.get(code)
+            if translator is None:
+                return
             logger.info(f'Translator changed to "{translator.name}"')
             self.__config.user.set_translator(translator)
             self.__icon.update_menu()
         return handler
 
+    def __on_catalog_update(self, diff: CatalogDiff):
+        if self.__icon is None:
+            return  # Меню ещё не создано и сразу получит новый каталог
+        logger.info("Catalog updated, applying changes to TrayApp menu")
+        self.__translator_items = self.__apply_diff(
+            self.__translator_items, diff.translators, self.__config.translators, self.__create_translator_item
+        )
+        self.__language_items = self.__apply_diff(
+            self.__language_items, diff.languages, self.__config.languages, self.__create_language_item
+        )
+        self.__icon.update_menu()
+
+    def __on_user_config_change(self, changed):
+        if self.__icon is not None:
+            self.__icon.update_menu()  # Отметки выбранного переводчика и языка после правки файла
+
+    def __on_outbox_replayed(self, entry: "OutboxEntry", translated_text: str, copied: bool):
+        if self.__icon is None:
+            return
+        if copied:
+            message = "Отложенный перевод готов и скопирован в буфер обмена"
+        else:
+            message = f"Отложенный перевод готов: {shorten(translated_text, OUTBOX_PREVIEW_CHARS, placeholder='…')}"
+        try:
+            self.__icon.notify(message, self.__config.app.name)
+        except Exception as e:
+            logger.error(f"Не удалось показать уведомление: {e}")
+
     def __on_exit(self):
         logger.info('Button "Exit" clicked')        
         logger.info("KeyListener is shutting down...")
         self.__key_listener.stop()  # Остановка потока с KeyListener
+        self.__config.close()
 
         logger.info("TrayApp is shutting down...")
         self.__icon.stop()